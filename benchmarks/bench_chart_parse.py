@@ -0,0 +1,93 @@
+'''Micro-benchmark of the chart JSON -> data frame conversion used by get_data.
+
+Compares the current vectorized _parse_chart_data against the previous
+implementation (per-row floor via Index.map and column reindexing) on
+synthetic payloads.  No network access is needed.
+
+    python benchmarks/bench_chart_parse.py
+'''
+
+import os
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# running benchmarks/bench_chart_parse.py puts benchmarks/ on sys.path, not the
+# repository root holding yahoo_fin
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yahoo_fin.stock_info import _parse_chart_data
+
+
+def make_payload(n, step = 86400, seed = 0):
+
+    rng = np.random.default_rng(seed)
+
+    start = 946684800
+    timestamps = (start + np.arange(n) * step + 14 * 3600).tolist()
+    close = (100 + rng.standard_normal(n).cumsum()).tolist()
+
+    quote = {"open": close, "high": close, "low": close, "close": close,
+             "volume": rng.integers(1000, 10 ** 7, n).tolist()}
+
+    return {"chart": {"result": [{"timestamp": timestamps,
+                                  "indicators": {"quote": [quote],
+                                                 "adjclose": [{"adjclose": close}]}}]}}
+
+
+def legacy_parse_chart_data(data, ticker, interval = "1d", index_as_date = True):
+
+    frame = pd.DataFrame(data["chart"]["result"][0]["indicators"]["quote"][0])
+
+    temp_time = data["chart"]["result"][0]["timestamp"]
+
+    if interval != "1m":
+        frame["adjclose"] = data["chart"]["result"][0]["indicators"]["adjclose"][0]["adjclose"]
+        frame.index = pd.to_datetime(temp_time, unit = "s")
+        frame.index = frame.index.map(lambda dt: dt.floor("d"))
+        frame = frame[["open", "high", "low", "close", "adjclose", "volume"]]
+    else:
+        frame.index = pd.to_datetime(temp_time, unit = "s")
+        frame = frame[["open", "high", "low", "close", "volume"]]
+
+    frame['ticker'] = ticker.upper()
+
+    if not index_as_date:
+        frame = frame.reset_index()
+        frame.rename(columns = {"index": "date"}, inplace = True)
+
+    return frame
+
+
+def main():
+
+    # the legacy floor("d") alias is deprecated in recent pandas
+    warnings.simplefilter("ignore", FutureWarning)
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    print("%-10s %8s %12s %12s %8s" % ("interval", "rows", "legacy ms", "current ms", "speedup"))
+
+    for interval, step, n in [("1d", 86400, 250), ("1d", 86400, 6000),
+                              ("1d", 86400, 15000), ("1m", 60, 2000)]:
+
+        payload = make_payload(n, step)
+
+        expected = legacy_parse_chart_data(payload, "test", interval)
+        result = _parse_chart_data(payload, "test", interval)
+        pd.testing.assert_frame_equal(result, expected, check_index_type = False)
+
+        repeat = 20
+        legacy = min(timeit.repeat(lambda: legacy_parse_chart_data(payload, "test", interval),
+                                   number = 1, repeat = repeat))
+        current = min(timeit.repeat(lambda: _parse_chart_data(payload, "test", interval),
+                                    number = 1, repeat = repeat))
+
+        print("%-10s %8d %12.2f %12.2f %7.1fx" % (interval, n, legacy * 1000,
+                                                   current * 1000, legacy / current))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+'''End-to-end benchmark of the public functions against a local replay server.
+
+Every request goes through the real client stack (connection pool, gzip,
+parsing) to the fixture server in fixture_server.py, which answers with the
+deterministic payloads of fixtures.py after --latency-ms.  No network access
+is needed and repeated runs see identical responses.
+
+Single-call scenarios issue --calls calls from a pool of N threads, each for
+a different ticker (so neither the page cache nor request coalescing can
+short-circuit them).  Batch scenarios run the batch function itself with
+max_workers = N.  Throughput is calls per second and the latency columns are
+per call.
+
+    python benchmarks/bench_endpoints.py [--concurrency 1,4,16] [--calls 32]
+                                         [--latency-ms 20] [--only get_data]
+                                         [--rate-limit] [--json results.json]
+'''
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+# running benchmarks/bench_endpoints.py puts benchmarks/ on sys.path, not the
+# repository root holding yahoo_fin
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer, replay_session
+
+from yahoo_fin import client, news, options, ratelimit
+from yahoo_fin import stock_info as si
+from yahoo_fin.bulk import download_universe
+from yahoo_fin.cache import page_store_cache
+
+
+_counter = itertools.count()
+
+
+def next_ticker():
+
+    return "T%05d" % next(_counter)
+
+
+def tickers(count):
+
+    return [next_ticker() for _ in range(count)]
+
+
+def _download_universe(workers):
+
+    out_dir = tempfile.mkdtemp()
+
+    try:
+        download_universe(tickers(32), out_dir = out_dir, workers = workers, resume = False)
+    finally:
+        shutil.rmtree(out_dir)
+
+
+# name -> function of the ticker
+SINGLE = {"get_data": lambda t: si.get_data(t),
+          "get_quote_table": lambda t: si.get_quote_table(t),
+          "get_stats": lambda t: si.get_stats(t),
+          "get_holders": lambda t: si.get_holders(t),
+          "get_financials[api]": lambda t: si.get_financials(t, backend = "api"),
+          "get_financials[scrape]": lambda t: si.get_financials(t, backend = "scrape"),
+          "get_company_info[api]": lambda t: si.get_company_info(t, backend = "api"),
+          "get_company_info[scrape]": lambda t: si.get_company_info(t, backend = "scrape"),
+          "get_options_chain": lambda t: options.get_options_chain(t),
+          "get_live_prices[10]": lambda t: si.get_live_prices([t] + tickers(9)),
+          "get_yf_rss": lambda t: news.get_yf_rss(t)}
+
+# name -> function of the worker count
+BATCH = {"get_data_many[64]": lambda n: si.get_data_many(tickers(64), max_workers = n),
+         "get_live_prices[2000]": lambda n: si.get_live_prices(tickers(2000), max_workers = n),
+         "get_options_surface[8]": lambda n: options.get_options_surface(next_ticker(),
+                                                                          max_workers = n),
+         "download_universe[32]": _download_universe}
+
+
+def percentile(values, q):
+
+    values = sorted(values)
+
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run_single(func, concurrency, calls):
+
+    def timed(ticker):
+        start = time.perf_counter()
+        func(ticker)
+        return time.perf_counter() - start
+
+    names = tickers(calls)
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers = concurrency) as pool:
+        latencies = list(pool.map(timed, names))
+
+    return time.perf_counter() - start, latencies
+
+
+def run_batch(func, concurrency, calls):
+
+    latencies = []
+
+    start = time.perf_counter()
+
+    for _ in range(calls):
+        call_start = time.perf_counter()
+        func(concurrency)
+        latencies.append(time.perf_counter() - call_start)
+
+    return time.perf_counter() - start, latencies
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default = "1,4,16")
+    parser.add_argument("--calls", type = int, default = 32)
+    parser.add_argument("--batch-calls", type = int, default = 3)
+    parser.add_argument("--latency-ms", type = float, default = 20)
+    parser.add_argument("--only", default = None, help = "run scenarios containing this text")
+    parser.add_argument("--rate-limit", action = "store_true",
+                        help = "keep the default rate limiter instead of disabling it")
+    parser.add_argument("--json", default = None, help = "also write the results to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    if not args.rate_limit:
+        ratelimit.disable_rate_limit()
+
+    # the live price lookups of unknown symbols are expected to warn
+    warnings.simplefilter("ignore")
+
+    scenarios = [(name, func, run_single, args.calls) for name, func in SINGLE.items()]
+    scenarios += [(name, func, run_batch, args.batch_calls) for name, func in BATCH.items()]
+
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if args.only in scenario[0]]
+
+    results = []
+
+    with FixtureServer(latency = args.latency_ms / 1000) as server:
+
+        client.set_session(replay_session(server, pool_maxsize = max(levels) * 2))
+
+        print("fixture server %s, latency %.0f ms" % (server.url, args.latency_ms))
+        print("%-24s %5s %6s %9s %10s %9s %9s" % ("scenario", "conc", "calls", "requests",
+                                                  "calls/s", "p50 ms", "p95 ms"))
+
+        for name, func, runner, calls in scenarios:
+
+            # warm up lazy imports and the connection pool
+            runner(func, 1, 1)
+
+            for concurrency in levels:
+
+                page_store_cache.clear()
+                requests_before = server.requests
+
+                elapsed, latencies = runner(func, concurrency, calls)
+
+                result = {"scenario": name, "concurrency": concurrency, "calls": calls,
+                          "requests": server.requests - requests_before,
+                          "seconds": elapsed, "throughput": calls / elapsed,
+                          "p50_ms": statistics.median(latencies) * 1000,
+                          "p95_ms": percentile(latencies, 0.95) * 1000}
+                results.append(result)
+
+                print("%-24s %5d %6d %9d %10.1f %9.1f %9.1f" % (
+                      name, concurrency, calls, result["requests"], result["throughput"],
+                      result["p50_ms"], result["p95_ms"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "results": results}, f, indent = 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+'''Cold-start benchmark for `import yahoo_fin.stock_info`.
+
+Each run imports the package in a fresh interpreter.  The script checks that
+none of the optional dependencies is imported eagerly, and that the import
+costs at most --budget-ms milliseconds on top of importing pandas and
+requests, which yahoo_fin cannot avoid.  It exits with status 1 when either
+check fails, so it can guard the startup budget in CI.
+
+    python benchmarks/bench_import.py [--runs 10] [--budget-ms 150]
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = ["yahoo_fin.stock_info", "yahoo_fin.options", "yahoo_fin.news"]
+
+# pyarrow is left out since recent pandas versions import it themselves
+LAZY_DEPENDENCIES = ["Crypto", "feedparser", "requests_html", "pyppeteer",
+                     "httpx", "lxml", "bs4", "html5lib"]
+
+BASELINE = "import pandas, requests"
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+%s
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+'''
+
+
+def time_import(statement):
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH = root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+    out = subprocess.run([sys.executable, "-c", PROBE % statement], env = env,
+                         capture_output = True, text = True, check = True).stdout
+
+    return json.loads(out)
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type = int, default = 10)
+    parser.add_argument("--budget-ms", type = float, default = 150)
+    args = parser.parse_args()
+
+    statement = "; ".join("import " + module for module in MODULES)
+
+    # warm the OS file cache so the first timed run is not an outlier
+    time_import(statement)
+
+    baseline = [time_import(BASELINE)["seconds"] for _ in range(args.runs)]
+    results = [time_import(statement) for _ in range(args.runs)]
+    package = [result["seconds"] for result in results]
+
+    baseline_ms = statistics.median(baseline) * 1000
+    package_ms = statistics.median(package) * 1000
+    overhead_ms = package_ms - baseline_ms
+
+    print("import pandas, requests:  %8.1f ms (median of %d)" % (baseline_ms, args.runs))
+    print("import yahoo_fin modules: %8.1f ms (median of %d)" % (package_ms, args.runs))
+    print("yahoo_fin overhead:       %8.1f ms (budget %.0f ms)" % (overhead_ms, args.budget_ms))
+
+    loaded = set(results[0]["modules"])
+    eager = [name for name in LAZY_DEPENDENCIES
+             if any(module == name or module.startswith(name + ".") for module in loaded)]
+
+    failed = False
+
+    if eager:
+        print("FAIL: imported eagerly: " + ", ".join(eager))
+        failed = True
+
+    if overhead_ms > args.budget_ms:
+        print("FAIL: import overhead over budget")
+        failed = True
+
+    if not failed:
+        print("OK")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
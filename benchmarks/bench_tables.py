@@ -0,0 +1,80 @@
+'''Micro-benchmark of the HTML table extraction used by the scraping functions.
+
+Compares pandas.read_html on the whole page followed by each function's
+table selection (the previous approach) against yahoo_fin.tables, which
+parses the page once with lxml and converts only the selected tables.  The
+pages are the synthetic fixtures of fixtures.py, so no network access is
+needed.  Both sides must return identical frames.
+
+    python benchmarks/bench_tables.py
+'''
+
+import io
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+# running benchmarks/bench_tables.py puts benchmarks/ on sys.path, not the
+# repository root holding yahoo_fin
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures
+
+from yahoo_fin import tables
+from yahoo_fin.options import _chain_tables
+from yahoo_fin.stock_info import _first_table, _holders_tables, _stats_tables, \
+                                 _summary_tables, _valuation_tables
+
+
+# name -> (page, selection of the read_html frames, table selector)
+CASES = {"get_quote_table": ("quote_page", lambda frames: frames[:2], _summary_tables),
+         "get_stats": ("stats_page",
+                       lambda frames: [frame for frame in frames[1:] if frame.shape[1] == 2],
+                       _stats_tables),
+         "get_stats_valuation": ("stats_page",
+                                 lambda frames: [frame for frame in frames
+                                                 if "Trailing P/E" in frame.iloc[:,0].tolist()],
+                                 _valuation_tables),
+         "get_holders": ("holders_page", lambda frames: frames[:4], _holders_tables),
+         "get_analysts_info": ("analysts_page", lambda frames: frames, None),
+         "get_options_chain": ("options_page", lambda frames: frames[:2], _chain_tables),
+         "get_currencies": ("currencies_page", lambda frames: frames[:1], _first_table),
+         "get_futures": ("futures_page", lambda frames: frames[:1], _first_table)}
+
+
+def main():
+
+    pages = fixtures.build_fixtures()
+
+    # warm up the lazy lxml import
+    tables.read_tables("<table><tr><td>1</td></tr></table>")
+
+    print("%-20s %8s %14s %12s %8s" % ("function", "KB", "read_html ms", "tables ms", "speedup"))
+
+    for name, (page, legacy_select, select) in CASES.items():
+
+        html = pages[page]
+
+        legacy = lambda: legacy_select(pd.read_html(io.StringIO(html)))
+        current = lambda: tables.read_tables(html, select)
+
+        expected = legacy()
+        result = current()
+
+        assert len(result) == len(expected), name
+        for frame, expected_frame in zip(result, expected):
+            pd.testing.assert_frame_equal(frame, expected_frame)
+
+        repeat = 10
+        legacy_time = min(timeit.repeat(legacy, number = 1, repeat = repeat))
+        current_time = min(timeit.repeat(current, number = 1, repeat = repeat))
+
+        print("%-20s %8.0f %14.2f %12.2f %7.1fx" % (name, len(html) / 1024,
+                                                    legacy_time * 1000, current_time * 1000,
+                                                    legacy_time / current_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+'''Local HTTP stand-in for Yahoo Finance, serving the payloads in fixtures.py.
+
+The server listens on 127.0.0.1 and answers every request after a fixed
+delay that stands in for the network round trip.  replay_session() returns a
+requests.Session that rewrites the https://<host>/<path> URLs yahoo_fin
+builds to http://127.0.0.1:<port>/<host>/<path>, so the whole HTTP stack
+(connection pool, gzip, response parsing) is exercised without any network
+access:
+
+    with FixtureServer(latency = 0.02) as server:
+        client.set_session(replay_session(server))
+        stock_info.get_data("aapl")
+'''
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import fixtures
+
+
+def _route(path, query):
+
+    '''Returns (content type, payload name, body) for a request path of the
+       form /<host>/<path>, or None if nothing matches.  Static payloads
+       are returned by name with a body of None.'''
+
+    path = "/" + path.lstrip("/").partition("/")[2]
+
+    if path.startswith("/v8/finance/chart/"):
+        return "application/json", "chart", None
+
+    if path.startswith("/v7/finance/quote"):
+        symbols = ",".join(query.get("symbols", [""])).split(",")
+        return "application/json", None, fixtures.quote_json([s for s in symbols if s])
+
+    if path.startswith("/v10/finance/quoteSummary/"):
+        modules = ",".join(query.get("modules", [""])).split(",")
+        return "application/json", None, fixtures.quote_summary_json(
+            tuple(module for module in modules if module))
+
+    if path.startswith("/rss/"):
+        return "application/rss+xml", "rss", None
+
+    if path == "/currencies":
+        return "text/html", "currencies_page", None
+
+    if path == "/commodities":
+        return "text/html", "futures_page", None
+
+    if path.startswith("/quote/"):
+
+        parts = path.split("/")
+
+        page = parts[3] if len(parts) > 3 else ""
+
+        pages = {"": "quote_page", "key-statistics": "stats_page",
+                 "holders": "holders_page", "analysts": "analysts_page",
+                 "options": "options_page", "financials": "financials_page",
+                 "balance-sheet": "financials_page", "cash-flow": "financials_page",
+                 "profile": "financials_page"}
+
+        if page in pages:
+            return "text/html", pages[page], None
+
+    return None
+
+
+class FixtureServer(object):
+
+    '''Threaded HTTP server replaying the fixture payloads.
+
+       @param: latency = 0.02, seconds added to every response
+       @param: payloads = None, defaults to fixtures.build_fixtures()
+    '''
+
+    def __init__(self, latency = 0.02, payloads = None):
+
+        if payloads is None:
+            payloads = fixtures.build_fixtures()
+
+        self.latency = latency
+        self.payloads = {name: body.encode("utf-8") for name, body in payloads.items()}
+        self.compressed = {name: gzip.compress(body, 6) for name, body in self.payloads.items()}
+        self.requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+
+                url = urlsplit(self.path)
+                route = _route(url.path, parse_qs(url.query))
+
+                with server._lock:
+                    server.requests += 1
+
+                time.sleep(server.latency)
+
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                content_type, name, body = route
+                use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+
+                if body is not None:
+                    body = body.encode("utf-8")
+                    if use_gzip:
+                        body = gzip.compress(body, 6)
+                elif use_gzip:
+                    body = server.compressed[name]
+                else:
+                    body = server.payloads[name]
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type + "; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if use_gzip:
+                    self.send_header("Content-Encoding", "gzip")
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._server.request_queue_size = 256
+        self._thread = None
+
+
+    @property
+    def url(self):
+
+        host, port = self._server.server_address[:2]
+
+        return "http://%s:%d" % (host, port)
+
+
+    def start(self):
+
+        self._thread = threading.Thread(target = self._server.serve_forever, daemon = True)
+        self._thread.start()
+
+        return self
+
+
+    def stop(self):
+
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def __enter__(self):
+
+        return self.start()
+
+
+    def __exit__(self, *exc):
+
+        self.stop()
+
+
+class ReplayAdapter(HTTPAdapter):
+
+    '''Transport adapter sending https://<host>/<path> requests to the
+       fixture server instead'''
+
+    def __init__(self, base_url, **kwargs):
+
+        self.base_url = base_url
+
+        super().__init__(**kwargs)
+
+
+    def send(self, request, **kwargs):
+
+        url = urlsplit(request.url)
+        request.url = "%s/%s%s" % (self.base_url, url.netloc,
+                                   url.path + ("?" + url.query if url.query else ""))
+
+        return super().send(request, **kwargs)
+
+
+def replay_session(server, pool_maxsize = 64):
+
+    '''requests.Session routed to server, with yahoo_fin's default headers'''
+
+    from yahoo_fin.client import default_headers
+
+    session = requests.Session()
+    session.headers.update(default_headers)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    adapter = ReplayAdapter(server.url, pool_connections = 4, pool_maxsize = pool_maxsize)
+    session.mount("https://", adapter)
+
+    return session
@@ -0,0 +1,495 @@
+'''Deterministic stand-ins for the Yahoo Finance responses yahoo_fin parses.
+
+The payloads mirror the structure (and roughly the size) of the live
+responses: chart and v7 quote JSON, quoteSummary JSON, the quote,
+statistics, holders, analysts, options, currencies and commodities HTML
+pages padded with the inline script bulk of the real pages, an encrypted
+root.App.main page and the headline RSS feed.  Everything is generated from
+a fixed seed, so every run serves byte-identical responses.
+'''
+
+import base64
+import functools
+import hashlib
+import json
+
+import numpy as np
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
+
+
+SEED = 1492
+
+# the live quote pages carry several hundred KB of inline scripts and markup
+PAGE_PADDING = 400 * 1024
+
+
+def _rng(salt = 0):
+
+    return np.random.default_rng(SEED + salt)
+
+
+def _padding(size = PAGE_PADDING):
+
+    rng = _rng(99)
+    words = ["var", "function", "return", "window", "data", "module", "render",
+             "this", "props", "state", "null", "true", "false", "0", "1"]
+    chunk = " ".join(rng.choice(words, 4096)) + ";\n"
+
+    script = (chunk * (size // len(chunk) + 1))[:size]
+
+    return "<script>" + script + "</script>"
+
+
+def _page(body, padding = PAGE_PADDING):
+
+    return ("<!DOCTYPE html><html><head><title>Yahoo Finance</title>" +
+            _padding(padding // 2) + "</head><body><div id='app'>" + body +
+            "</div>" + _padding(padding // 2) + "</body></html>")
+
+
+def _table(columns, rows, attrs = ""):
+
+    head = "".join("<th>%s</th>" % col for col in columns)
+    body = "".join("<tr>" + "".join("<td><span>%s</span></td>" % val for val in row) + "</tr>"
+                   for row in rows)
+
+    return "<table %s><thead><tr>%s</tr></thead><tbody>%s</tbody></table>" % (attrs, head, body)
+
+
+def _fmt(value):
+
+    value = float(value)
+
+    for suffix, scale in (("T", 1e12), ("B", 1e9), ("M", 1e6), ("k", 1e3)):
+        if abs(value) >= scale:
+            return "%.2f%s" % (value / scale, suffix)
+
+    return "%.2f" % value
+
+
+def chart_json(rows = 2520):
+
+    '''v8 chart response with rows daily bars'''
+
+    rng = _rng(1)
+
+    start = 1262304000
+    timestamps = (start + np.arange(rows) * 86400 + 14 * 3600).tolist()
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows))), 4)
+
+    quote = {"open": np.round(close * 0.995, 4).tolist(),
+             "high": np.round(close * 1.01, 4).tolist(),
+             "low": np.round(close * 0.99, 4).tolist(),
+             "close": close.tolist(),
+             "volume": rng.integers(10 ** 5, 10 ** 8, rows).tolist()}
+
+    result = {"meta": {"currency": "USD", "symbol": "TEST", "exchangeName": "NMS",
+                       "instrumentType": "EQUITY", "regularMarketPrice": float(close[-1]),
+                       "dataGranularity": "1d", "range": ""},
+              "timestamp": timestamps,
+              "events": {"dividends": {str(t): {"amount": 0.25, "date": t}
+                                       for t in timestamps[::63]}},
+              "indicators": {"quote": [quote], "adjclose": [{"adjclose": close.tolist()}]}}
+
+    return json.dumps({"chart": {"result": [result], "error": None}})
+
+
+_quote_fields = None
+
+
+def quote_record(symbol):
+
+    '''One entry of the v7 quote response, with the ~70 fields Yahoo sends'''
+
+    global _quote_fields
+
+    if _quote_fields is None:
+
+        rng = _rng(2)
+        names = ["regularMarketPrice", "regularMarketChange", "regularMarketChangePercent",
+                 "regularMarketDayHigh", "regularMarketDayLow", "regularMarketVolume",
+                 "regularMarketPreviousClose", "regularMarketOpen", "bid", "ask",
+                 "bidSize", "askSize", "fiftyTwoWeekLow", "fiftyTwoWeekHigh",
+                 "fiftyDayAverage", "twoHundredDayAverage", "trailingPE", "forwardPE",
+                 "epsTrailingTwelveMonths", "epsForward", "bookValue", "priceToBook",
+                 "marketCap", "sharesOutstanding", "averageDailyVolume3Month",
+                 "averageDailyVolume10Day", "preMarketPrice", "postMarketPrice",
+                 "trailingAnnualDividendRate", "trailingAnnualDividendYield"]
+        names += ["field%02d" % i for i in range(70 - len(names))]
+
+        _quote_fields = {name: round(float(val), 4)
+                         for name, val in zip(names, rng.uniform(1, 500, len(names)))}
+        _quote_fields.update({"language": "en-US", "region": "US", "quoteType": "EQUITY",
+                              "currency": "USD", "marketState": "REGULAR",
+                              "exchange": "NMS", "tradeable": False})
+
+    record = dict(_quote_fields)
+    record["symbol"] = symbol
+    record["shortName"] = symbol + " Inc."
+
+    return record
+
+
+def quote_json(symbols):
+
+    return json.dumps({"quoteResponse": {"result": [quote_record(s) for s in symbols],
+                                         "error": None}})
+
+
+_statement_items = ["totalRevenue", "costOfRevenue", "grossProfit", "researchDevelopment",
+                    "sellingGeneralAdministrative", "totalOperatingExpenses",
+                    "operatingIncome", "interestExpense", "totalOtherIncomeExpenseNet",
+                    "incomeBeforeTax", "incomeTaxExpense", "netIncome",
+                    "netIncomeApplicableToCommonShares", "ebit", "cash",
+                    "shortTermInvestments", "netReceivables", "inventory",
+                    "totalCurrentAssets", "propertyPlantEquipment", "goodWill",
+                    "totalAssets", "accountsPayable", "shortLongTermDebt",
+                    "totalCurrentLiabilities", "longTermDebt", "totalLiab",
+                    "commonStock", "retainedEarnings", "totalStockholderEquity"]
+
+
+def _statements(key, count, salt):
+
+    rng = _rng(salt)
+    end = 1672444800
+
+    statements = []
+
+    for i in range(count):
+
+        statement = {"maxAge": 1, "endDate": {"raw": end - i * 31536000 // (4 if count > 4 else 1),
+                                              "fmt": "2022-12-31"}}
+
+        for item in _statement_items:
+            value = int(rng.integers(-10 ** 9, 10 ** 11))
+            statement[item] = {"raw": value, "fmt": _fmt(value), "longFmt": "{:,}".format(value)}
+
+        statements.append(statement)
+
+    return {key: statements, "maxAge": 86400}
+
+
+def _raw(value):
+
+    return {"raw": value, "fmt": _fmt(value)}
+
+
+def _earnings():
+
+    rng = _rng(16)
+
+    quarters = ["%dQ2022" % q for q in range(1, 5)]
+    estimates = rng.uniform(0.5, 2, 4).round(2)
+
+    return {"maxAge": 86400,
+            "earningsChart": {"quarterly": [{"date": date, "actual": _raw(float(est + 0.05)),
+                                             "estimate": _raw(float(est))}
+                                            for date, est in zip(quarters, estimates)],
+                              "currentQuarterEstimate": _raw(1.5)},
+            "financialsChart": {"yearly": [{"date": year,
+                                            "revenue": _raw(int(rng.integers(10 ** 10, 10 ** 11))),
+                                            "earnings": _raw(int(rng.integers(10 ** 9, 10 ** 10)))}
+                                           for year in range(2019, 2023)],
+                                "quarterly": [{"date": date,
+                                               "revenue": _raw(int(rng.integers(10 ** 9, 10 ** 10))),
+                                               "earnings": _raw(int(rng.integers(10 ** 8, 10 ** 9)))}
+                                              for date in quarters]}}
+
+
+def _asset_profile():
+
+    rng = _rng(17)
+
+    officers = [{"maxAge": 1, "name": "Officer %d" % i, "age": int(rng.integers(40, 70)),
+                 "title": title, "yearBorn": int(rng.integers(1953, 1983)),
+                 "totalPay": _raw(int(rng.integers(10 ** 6, 10 ** 8)))}
+                for i, title in enumerate(["CEO", "CFO", "COO", "General Counsel"])]
+
+    return {"address1": "1 Fixture Way", "city": "Testville", "state": "CA", "zip": "90000",
+            "country": "United States", "website": "https://example.com",
+            "industry": "Software", "sector": "Technology",
+            "longBusinessSummary": "A deterministic company used by the benchmarks.",
+            "fullTimeEmployees": 12000, "companyOfficers": officers, "maxAge": 86400}
+
+
+def quote_summary_store(modules = None):
+
+    '''The quoteSummary modules in the {raw, fmt} form Yahoo uses: the
+       financial statements, earnings and asset profile, or only the ones
+       named in modules'''
+
+    store = {"incomeStatementHistory": _statements("incomeStatementHistory", 4, 10),
+             "incomeStatementHistoryQuarterly": _statements("incomeStatementHistory", 4, 11),
+             "balanceSheetHistory": _statements("balanceSheetStatements", 4, 12),
+             "balanceSheetHistoryQuarterly": _statements("balanceSheetStatements", 4, 13),
+             "cashflowStatementHistory": _statements("cashflowStatements", 4, 14),
+             "cashflowStatementHistoryQuarterly": _statements("cashflowStatements", 4, 15),
+             "earnings": _earnings(),
+             "assetProfile": _asset_profile()}
+
+    if modules is None:
+        return store
+
+    return {module: store[module] for module in modules if module in store}
+
+
+@functools.lru_cache(maxsize = 16)
+def quote_summary_json(modules = None):
+
+    '''quoteSummary response for a tuple of module names (all if None)'''
+
+    return json.dumps({"quoteSummary": {"result": [quote_summary_store(modules)],
+                                        "error": None}})
+
+
+def _raw_values(obj):
+
+    if isinstance(obj, dict):
+        if "raw" in obj:
+            return obj["raw"]
+        return {key: _raw_values(val) for key, val in obj.items()}
+
+    if isinstance(obj, list):
+        return [_raw_values(elt) for elt in obj]
+
+    return obj
+
+
+def _evp_kdf(password, salt, size = 48):
+
+    key_iv = b""
+    block = b""
+
+    while len(key_iv) < size:
+        block = hashlib.md5(block + password + salt).digest()
+        key_iv += block
+
+    return key_iv[:32], key_iv[32:48]
+
+
+def encrypted_page():
+
+    '''Quote page whose root.App.main script holds the CryptoJS encrypted
+       stores, as decoded by stock_info._decrypt_yblob_aes'''
+
+    words = [int(w) for w in _rng(3).integers(-2 ** 31, 2 ** 31, 4)]
+    _cr = json.dumps({"words": words, "sigBytes": 16})
+    _cs = "benchmark-fixture"
+
+    cr_bytes = b"".join(int.to_bytes(w, length = 4, byteorder = "big", signed = True)
+                        for w in words)
+    password = hashlib.pbkdf2_hmac("sha1", _cs.encode("utf8"), cr_bytes, 1, dklen = 32).hex()
+
+    salt = bytes(_rng(4).integers(0, 256, 8).tolist())
+    key, iv = _evp_kdf(password.encode("utf-8"), salt)
+
+    # the page stores hold plain values where quoteSummary sends {raw, fmt}
+    stores = {"QuoteSummaryStore": _raw_values(quote_summary_store()),
+              "StreamDataStore": {"padding": "x" * 50000}}
+    plaintext = pad(json.dumps(stores).encode("utf-8"), 16, style = "pkcs7")
+    ciphertext = AES.new(key, AES.MODE_CBC, iv = iv).encrypt(plaintext)
+
+    data = {"context": {"dispatcher": {"stores": base64.b64encode(b"Salted__" + salt +
+                                                                  ciphertext).decode()}},
+            "plugins": {}, "_cs": _cs, "_cr": _cr}
+
+    script = ("<script>(function (root) {\nroot.App || (root.App = {});\n"
+              "root.App.main = " + json.dumps(data) + ";\n}(this));</script>")
+
+    return _page(script)
+
+
+def quote_page():
+
+    '''Summary page: two attribute / value tables'''
+
+    left = [["Previous Close", "171.27"], ["Open", "171.60"], ["Bid", "170.25 x 1000"],
+            ["Ask", "170.39 x 1200"], ["Day's Range", "169.02 - 172.10"],
+            ["52 Week Range", "124.17 - 199.62"], ["Volume", "48,530,131"],
+            ["Avg. Volume", "57,112,983"]]
+    right = [["Market Cap", "2.68T"], ["Beta (5Y Monthly)", "1.29"],
+             ["PE Ratio (TTM)", "28.14"], ["EPS (TTM)", "6.07"],
+             ["Earnings Date", "Oct 26, 2023"],
+             ["Forward Dividend & Yield", "0.96 (0.56%)"],
+             ["Ex-Dividend Date", "Aug 11, 2023"], ["1y Target Est", "198.59"]]
+
+    return _page(_table(["", ""], left) + _table(["", ""], right))
+
+
+def stats_page():
+
+    '''Statistics page: the valuation measures table followed by nine
+       attribute / value tables'''
+
+    rng = _rng(5)
+
+    valuation = [[name] + [_fmt(v) for v in rng.uniform(1, 3e12, 6)]
+                 for name in ["Market Cap (intraday)", "Enterprise Value", "Trailing P/E",
+                              "Forward P/E", "PEG Ratio (5 yr expected)",
+                              "Price/Sales (ttm)", "Price/Book (mrq)",
+                              "Enterprise Value/Revenue", "Enterprise Value/EBITDA"]]
+
+    columns = ["", "Current", "6/30/2023", "3/31/2023", "12/31/2022", "9/30/2022", "6/30/2022"]
+
+    body = _table(columns, valuation)
+
+    for t in range(9):
+        rows = [["Statistic %d.%d" % (t, i), _fmt(v)] for i, v in enumerate(rng.uniform(0, 1e10, 7))]
+        rows[0][1] = "%.2f%%" % rng.uniform(0, 50)
+        body += _table(["", ""], rows)
+
+    return _page(body)
+
+
+def holders_page():
+
+    rng = _rng(6)
+
+    major = [["%.2f%%" % v, name] for v, name in
+             zip(rng.uniform(0, 80, 4), ["% of Shares Held by All Insider",
+                                         "% of Shares Held by Institutions",
+                                         "% of Float Held by Institutions",
+                                         "Number of Institutions Holding Shares"])]
+
+    def holders(n, salt):
+        r = _rng(salt)
+        return [["Holder %d" % i, "{:,}".format(int(s)), "Jun 29, 2023",
+                 "%.2f%%" % p, "{:,}".format(int(v))]
+                for i, (s, p, v) in enumerate(zip(r.integers(10 ** 6, 10 ** 9, n),
+                                                  r.uniform(0, 10, n),
+                                                  r.integers(10 ** 8, 10 ** 11, n)))]
+
+    columns = ["Holder", "Shares", "Date Reported", "% Out", "Value"]
+
+    body = (_table(["", ""], major) + _table(columns, holders(10, 7)) +
+            _table(columns, holders(10, 8)) + _table(columns, holders(10, 9)))
+
+    return _page(body)
+
+
+def analysts_page():
+
+    rng = _rng(16)
+
+    names = ["Earnings Estimate", "Revenue Estimate", "Earnings History",
+             "EPS Trend", "EPS Revisions", "Growth Estimates"]
+
+    body = ""
+
+    for name in names:
+        rows = [["Row %d" % i] + ["%.2f" % v for v in rng.uniform(0, 100, 4)] for i in range(5)]
+        body += _table([name, "Current Qtr.", "Next Qtr.", "Current Year", "Next Year"], rows)
+
+    return _page(body)
+
+
+def _option_rows(ticker, count, salt, kind):
+
+    rng = _rng(salt)
+    strikes = 50 + 5 * np.arange(count)
+
+    rows = []
+
+    for i, strike in enumerate(strikes):
+        last, bid, ask = sorted(rng.uniform(0.05, 60, 3))
+        rows.append(["%s231020%s%08d" % (ticker, kind, strike * 1000),
+                     "2023-10-13 3:59PM EDT", "%.2f" % strike, "%.2f" % last,
+                     "%.2f" % bid, "%.2f" % ask, "%+.2f" % rng.normal(),
+                     "%+.2f%%" % rng.normal(0, 5),
+                     "-" if i % 7 == 0 else "{:,}".format(int(rng.integers(1, 50000))),
+                     "{:,}".format(int(rng.integers(0, 90000))),
+                     "%.2f%%" % rng.uniform(10, 120)])
+
+    return rows
+
+
+def options_page(ticker = "TEST", expirations = 8, strikes = 60):
+
+    columns = ["Contract Name", "Last Trade Date", "Strike", "Last Price", "Bid", "Ask",
+               "Change", "% Change", "Volume", "Open Interest", "Implied Volatility"]
+
+    dates = ["October %d, 2023" % (20 + 7 * i) if i < 2 else "November %d, 2023" % (3 + 7 * (i - 2))
+             for i in range(min(expirations, 6))]
+    dates += ["January %d, 2024" % (19 + i) for i in range(expirations - len(dates))]
+
+    select = "<select>" + "".join("<option value='%d'>%s</option>" % (i, d)
+                                  for i, d in enumerate(dates)) + "</select>"
+
+    body = (select + _table(columns, _option_rows(ticker, strikes, 17, "C")) +
+            _table(columns, _option_rows(ticker, strikes, 18, "P")))
+
+    # _parse_expiration_dates reads the text after the last ">" of every
+    # "</option>" split, so the page must not end in a newline
+    return _page(body)
+
+
+def _market_page(names, salt):
+
+    rng = _rng(salt)
+
+    columns = ["Symbol", "Name", "Last Price", "Change", "% Change", "Volume"]
+    rows = [[name, name + " Name", "%.4f" % p, "%+.4f" % c, "%+.2f%%" % pc,
+             "{:,}".format(int(v)) if v > 10 ** 5 else "-"]
+            for name, p, c, pc, v in zip(names, rng.uniform(0.5, 2000, len(names)),
+                                         rng.normal(0, 1, len(names)),
+                                         rng.normal(0, 2, len(names)),
+                                         rng.integers(0, 10 ** 7, len(names)))]
+
+    return _page(_table(columns, rows))
+
+
+def currencies_page():
+
+    pairs = ["EURUSD=X", "JPY=X", "GBPUSD=X", "AUDUSD=X", "NZDUSD=X", "EURJPY=X",
+             "GBPJPY=X", "EURGBP=X", "EURCAD=X", "EURSEK=X", "EURCHF=X", "EURHUF=X",
+             "CNY=X", "HKD=X", "SGD=X", "INR=X", "MXN=X", "PHP=X", "IDR=X", "THB=X",
+             "MYR=X", "ZAR=X", "RUB=X", "GBP=X"]
+
+    return _market_page(pairs, 19)
+
+
+def futures_page():
+
+    names = ["ES=F", "YM=F", "NQ=F", "RTY=F", "ZB=F", "ZN=F", "ZF=F", "ZT=F", "GC=F",
+             "MGC=F", "SI=F", "SIL=F", "PL=F", "HG=F", "PA=F", "CL=F", "HO=F", "NG=F",
+             "RB=F", "BZ=F", "B0=F", "ZC=F", "ZO=F", "KE=F", "ZR=F", "ZM=F", "ZL=F",
+             "ZS=F", "GF=F", "HE=F", "LE=F", "CC=F", "KC=F", "CT=F", "LBS=F", "OJ=F",
+             "SB=F"]
+
+    return _market_page(names, 20)
+
+
+def rss_feed(items = 20):
+
+    entries = "".join("""<item><title>Headline %d</title><link>https://finance.yahoo.com/news/story-%d.html</link>
+<description>Summary of story %d.</description><guid isPermaLink="false">story-%d</guid>
+<pubDate>Fri, 13 Oct 2023 %02d:00:00 +0000</pubDate></item>""" % (i, i, i, i, i % 24)
+                      for i in range(items))
+
+    return ("""<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>
+<title>Yahoo! Finance: RSS feed</title><link>https://finance.yahoo.com</link>
+<description>Latest Financial News</description>%s</channel></rss>""" % entries)
+
+
+def build_fixtures():
+
+    '''Returns the static payloads keyed by route name'''
+
+    return {"chart": chart_json(),
+            "quote_page": quote_page(),
+            "stats_page": stats_page(),
+            "holders_page": holders_page(),
+            "analysts_page": analysts_page(),
+            "financials_page": encrypted_page(),
+            "options_page": options_page(),
+            "currencies_page": currencies_page(),
+            "futures_page": futures_page(),
+            "rss": rss_feed()}
+
+
+if __name__ == "__main__":
+
+    for name, payload in build_fixtures().items():
+        print("%-16s %9d bytes" % (name, len(payload.encode("utf-8"))))
@@ -0,0 +1,242 @@
+'''Checks of yahoo_fin.aio against a mocked httpx transport'''
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from yahoo_fin import aio, ratelimit
+from yahoo_fin.cache import page_store_cache
+
+
+@pytest.fixture
+def quotes_client(monkeypatch):
+
+    '''Async client whose quote endpoint fails for any chunk holding "BAD"'''
+
+    def handler(request):
+
+        symbols = request.url.params["symbols"].split(",")
+
+        if "BAD" in symbols:
+            return httpx.Response(500, json = {"error": "server error"})
+
+        return httpx.Response(200, json = {"quoteResponse": {"result": [
+            {"symbol": symbol, "regularMarketPrice": 1.0} for symbol in symbols]}})
+
+    # no throttling, and no retries of the 500 responses
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.RateLimiter(rate = None,
+                                                                     max_retries = 0))
+
+    session = httpx.AsyncClient(transport = httpx.MockTransport(handler))
+    aio.set_client(aio.AsyncYahooClient(session = session))
+
+    yield
+
+    aio.set_client(None)
+
+
+def test_failed_chunk_only_drops_its_symbols(quotes_client):
+
+    tickers = ["A", "B", "BAD", "C"]
+
+    with pytest.warns(UserWarning, match = "BAD"):
+        prices = asyncio.run(aio.aget_live_prices(tickers, chunk_size = 2))
+
+    assert prices == {"A": 1.0, "B": 1.0}
+
+
+def test_every_chunk_failing_raises(quotes_client):
+
+    with pytest.raises(AssertionError):
+        asyncio.run(aio.aget_live_prices(["BAD"], chunk_size = 2))
+
+
+PROFILE = {"assetProfile": {"city": {"raw": "Testville"}, "sector": "Technology",
+                            "companyOfficers": [{"name": "A", "title": "CEO",
+                                                 "totalPay": {"raw": 10, "fmt": "10"}}]}}
+
+
+@pytest.fixture
+def summary_client(monkeypatch):
+
+    '''Async client whose quoteSummary endpoint returns PROFILE, or fails
+       for the ticker "BAD"; quote pages hold a stand-in page store'''
+
+    pages = []
+
+    def handler(request):
+
+        if "/quoteSummary/" in request.url.path:
+            if request.url.path.endswith("/BAD"):
+                return httpx.Response(500, json = {"error": "server error"})
+            return httpx.Response(200, json = {"quoteSummary": {"result": [PROFILE]}})
+
+        pages.append(str(request.url))
+        return httpx.Response(200, text = "page")
+
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.RateLimiter(rate = None,
+                                                                     max_retries = 0))
+    monkeypatch.setattr(aio, "_parse_page_store",
+                        lambda html: {"assetProfile": {"city": "Pagetown",
+                                                       "companyOfficers": []}})
+    page_store_cache.clear()
+
+    session = httpx.AsyncClient(transport = httpx.MockTransport(handler))
+    aio.set_client(aio.AsyncYahooClient(session = session))
+
+    yield pages
+
+    aio.set_client(None)
+    page_store_cache.clear()
+
+
+def test_company_info_from_the_api(summary_client):
+
+    info = asyncio.run(aio.aget_company_info("abc", backend = "api"))
+    officers = asyncio.run(aio.aget_company_officers("abc", backend = "api"))
+
+    assert info.loc["city", "Value"] == "Testville"
+    assert officers.loc["A", "totalPay"] == 10
+    assert summary_client == []
+
+
+def test_failed_api_call_falls_back_on_the_page(summary_client):
+
+    info = asyncio.run(aio.aget_company_info("BAD", backend = "api"))
+
+    assert info.loc["city", "Value"] == "Pagetown"
+    assert len(summary_client) == 1
+
+
+@pytest.fixture
+def quote_server(monkeypatch):
+
+    '''Local HTTP server answering quote requests, with keep-alive
+       connections like the real endpoint'''
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = json.dumps({"quoteResponse": {"result": [{"symbol": "A"}]}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+
+    monkeypatch.setattr(aio, "quotes_url",
+                        "http://127.0.0.1:%d/v7/finance/quote?symbols=" % server.server_address[1])
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.RateLimiter(rate = None,
+                                                                     max_retries = 0))
+    aio.configure()
+
+    yield
+
+    aio.configure()
+    server.shutdown()
+    server.server_close()
+
+
+def test_each_event_loop_gets_its_own_client(quote_server):
+
+    # asyncio.run closes its loop, which the first client's connections belong to
+    assert asyncio.run(aio.aget_quote_data("A")) == {"symbol": "A"}
+    assert asyncio.run(aio.aget_quote_data("A")) == {"symbol": "A"}
+
+
+def test_timed_out_caller_does_not_cancel_a_shared_request(monkeypatch):
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json = {"quoteResponse": {"result": [{"symbol": "A"}]}})
+
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.RateLimiter(rate = None,
+                                                                     max_retries = 0))
+
+    async def main():
+        aio.set_client(aio.AsyncYahooClient(
+            session = httpx.AsyncClient(transport = httpx.MockTransport(handler))))
+        first = asyncio.ensure_future(asyncio.wait_for(aio.aget_quote_data("A"), 0.02))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(aio.aget_quote_data("A"))
+        return await asyncio.gather(first, second, return_exceptions = True)
+
+    try:
+        first, second = asyncio.run(main())
+    finally:
+        aio.set_client(None)
+
+    assert isinstance(first, asyncio.TimeoutError)
+    assert second == {"symbol": "A"}
+
+
+@pytest.fixture
+def scripted_quotes(monkeypatch):
+
+    '''Async client serving one scripted poll per request: a dictionary of
+       prices, or None for a poll that fails'''
+
+    script = []
+
+    def handler(request):
+        prices = script.pop(0)
+        if prices is None:
+            return httpx.Response(503, json = {"error": "unavailable"})
+        return httpx.Response(200, json = {"quoteResponse": {"result": [
+            {"symbol": symbol, "regularMarketPrice": price, "regularMarketVolume": 100}
+            for symbol, price in prices.items()]}})
+
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.RateLimiter(rate = None,
+                                                                     max_retries = 0))
+
+    session = httpx.AsyncClient(transport = httpx.MockTransport(handler))
+    aio.set_client(aio.AsyncYahooClient(session = session))
+
+    yield script
+
+    aio.set_client(None)
+
+
+def collect(stream):
+
+    async def main():
+        return [update async for update in stream]
+
+    return asyncio.run(main())
+
+
+def test_stream_yields_only_the_watched_changes(scripted_quotes):
+
+    scripted_quotes.extend([{"A": 1.0}, {"A": 1.0}, {"A": 1.5}])
+
+    updates = collect(aio.astream_quotes(["A"], interval_s = 0, max_polls = 3,
+                                         fields = ["regularMarketPrice"]))
+
+    assert updates == [{"A": {"regularMarketPrice": 1.0}},
+                       {"A": {"regularMarketPrice": 1.5}}]
+
+
+def test_stream_survives_a_failed_poll(scripted_quotes):
+
+    scripted_quotes.extend([{"A": 1.0}, None, {"A": 2.0}])
+
+    with pytest.warns(UserWarning, match = "Quote poll failed"):
+        updates = collect(aio.astream_quotes(["A"], interval_s = 0, max_polls = 3,
+                                             fields = ["regularMarketPrice"]))
+
+    assert updates == [{"A": {"regularMarketPrice": 1.0}},
+                       {"A": {"regularMarketPrice": 2.0}}]
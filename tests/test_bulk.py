@@ -0,0 +1,102 @@
+'''Checks of the resumable bulk download, with stock_info.get_data replaced
+by a fake that records the tickers it was asked for'''
+
+import os
+
+import pandas as pd
+import pytest
+
+from yahoo_fin import bulk
+from yahoo_fin import stock_info as si
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+
+    '''Tickers passed to get_data, in order; tickers added to the failing
+       set raise instead'''
+
+    requested = []
+    failing = set()
+
+    def get_data(ticker, **kwargs):
+        requested.append(ticker)
+        if ticker in failing:
+            raise AssertionError("no data for " + ticker)
+        return pd.DataFrame({"date": ["2024-01-02"], "close": [1.0], "ticker": [ticker]})
+
+    monkeypatch.setattr(si, "get_data", get_data)
+
+    return requested, failing
+
+
+def download(out_dir, tickers = ("AAA", "BBB", "CCC"), **kwargs):
+
+    return bulk.download_universe(list(tickers), start_date = "2024-01-01",
+                                  out_dir = str(out_dir), workers = 2, **kwargs)
+
+
+def test_finished_tickers_are_skipped(downloads, tmp_path):
+
+    requested, _ = downloads
+
+    paths, errors = download(tmp_path)
+
+    assert errors == {}
+    assert sorted(requested) == ["AAA", "BBB", "CCC"]
+    assert list(paths) == ["AAA", "BBB", "CCC"]
+    assert all(os.path.exists(path) for path in paths.values())
+
+    requested.clear()
+    paths, errors = download(tmp_path, ("AAA", "BBB", "CCC", "DDD"))
+
+    assert requested == ["DDD"]
+    assert list(paths) == ["AAA", "BBB", "CCC", "DDD"]
+
+
+def test_failures_are_recorded_and_retried(downloads, tmp_path):
+
+    requested, failing = downloads
+    failing.add("BBB")
+
+    paths, errors = download(tmp_path)
+
+    assert list(errors) == ["BBB"]
+    assert list(paths) == ["AAA", "CCC"]
+    assert "BBB" in bulk.load_manifest(str(tmp_path))["failed"]
+
+    failing.clear()
+    requested.clear()
+    paths, errors = download(tmp_path)
+
+    assert requested == ["BBB"]
+    assert errors == {}
+    assert bulk.load_manifest(str(tmp_path))["failed"] == {}
+
+
+def test_manifest_with_other_params_is_rejected(downloads, tmp_path):
+
+    download(tmp_path)
+
+    with pytest.raises(AssertionError):
+        download(tmp_path, interval = "1wk")
+
+    # starting over is allowed explicitly
+    paths, errors = download(tmp_path, interval = "1wk", resume = False)
+
+    assert len(paths) == 3
+    assert bulk.load_manifest(str(tmp_path))["params"]["interval"] == "1wk"
+
+
+def test_deleted_file_is_downloaded_again(downloads, tmp_path):
+
+    requested, _ = downloads
+
+    paths, _ = download(tmp_path)
+    os.remove(paths["BBB"])
+
+    requested.clear()
+    paths, _ = download(tmp_path)
+
+    assert requested == ["BBB"]
+    assert os.path.exists(paths["BBB"])
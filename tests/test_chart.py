@@ -0,0 +1,114 @@
+'''Checks that the chart based functions share one download, against a fake
+chart endpoint'''
+
+import pytest
+
+from yahoo_fin import client
+from yahoo_fin import stock_info as si
+from yahoo_fin.cache import chart_cache, disable_chart_cache, enable_chart_cache
+
+
+PAYLOAD = {"chart": {"result": [{
+    "timestamp": [1704205800, 1704292200],
+    "indicators": {"quote": [{"open": [1.0, 2.0], "high": [1.0, 2.0], "low": [1.0, 2.0],
+                              "close": [1.0, 2.0], "volume": [10, 20]}],
+                   "adjclose": [{"adjclose": [0.5, 1.0]}]},
+    "events": {"dividends": {"1704205800": {"amount": 0.25, "date": 1704205800}},
+               "splits": {"1704292200": {"date": 1704292200, "numerator": 2,
+                                         "denominator": 1, "splitRatio": "2:1"}}}}]}}
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, payload):
+
+        self.ok = status_code < 400
+        self.payload = payload
+
+    def json(self):
+
+        return self.payload
+
+
+@pytest.fixture
+def requests_made(monkeypatch):
+
+    made = []
+
+    def get(url, params = None, headers = None, **kwargs):
+        made.append(url)
+        if url.endswith("/BAD"):
+            return FakeResponse(404, {"chart": {"error": "Not Found"}})
+        return FakeResponse(200, PAYLOAD)
+
+    monkeypatch.setattr(client, "get", get)
+    enable_chart_cache()
+
+    yield made
+
+    disable_chart_cache()
+
+
+def test_data_dividends_and_splits_share_one_request(requests_made):
+
+    prices = si.get_data("ABC", "2024-01-01", "2024-01-05")
+    dividends = si.get_dividends("ABC", "2024-01-01", "2024-01-05")
+    splits = si.get_splits("ABC", "2024-01-01", "2024-01-05")
+    chart = si.get_chart("ABC", "2024-01-01", "2024-01-05")
+
+    assert len(requests_made) == 1
+
+    assert prices.close.tolist() == [1.0, 2.0]
+    assert dividends.dividend.tolist() == [0.25]
+    assert splits.splitRatio.tolist() == ["2:1"]
+    assert chart["prices"].equals(prices)
+
+
+def test_other_ranges_are_downloaded(requests_made):
+
+    si.get_data("ABC", "2024-01-01", "2024-01-05")
+    si.get_dividends("ABC", "2024-01-01", "2024-01-06")
+
+    assert len(requests_made) == 2
+
+
+def test_disabled_cache_downloads_every_call(requests_made):
+
+    disable_chart_cache()
+
+    si.get_data("ABC", "2024-01-01", "2024-01-05")
+    si.get_splits("ABC", "2024-01-01", "2024-01-05")
+
+    assert len(requests_made) == 2
+
+
+def test_errors_are_unchanged_and_not_cached(requests_made):
+
+    assert si.get_dividends("BAD").empty
+
+    with pytest.raises(AssertionError):
+        si.get_data("BAD")
+
+    with pytest.raises(AssertionError):
+        si.get_splits("BAD")
+
+    assert len(requests_made) == 3
+
+
+def test_cache_is_off_by_default(monkeypatch):
+
+    made = []
+
+    def get(url, params = None, headers = None, **kwargs):
+        made.append(url)
+        return FakeResponse(200, PAYLOAD)
+
+    monkeypatch.setattr(client, "get", get)
+
+    assert chart_cache.ttl == 0
+
+    # polling without an end date must see new bars every time
+    si.get_data("ABC", interval = "1m")
+    si.get_data("ABC", interval = "1m")
+
+    assert len(made) == 2
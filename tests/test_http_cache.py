@@ -0,0 +1,148 @@
+'''Checks of the conditional requests made by client.get_parsed and of the
+memory and disk backends of the HTTP cache, run against a fake client.get'''
+
+import os
+import time
+
+import pytest
+
+from yahoo_fin import client
+from yahoo_fin.cache import DiskHTTPCache, MemoryHTTPCache, disable_http_cache, \
+                            enable_http_cache
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, headers = None, content = b"page"):
+
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.content = content
+
+
+class FakeServer(object):
+
+    '''Answers 304 when the request revalidates the current ETag, else the
+       next queued response; records the headers of every request'''
+
+    def __init__(self, *responses):
+
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params = None, headers = None, **kwargs):
+
+        headers = headers or {}
+        self.requests.append(headers)
+
+        if headers.get("If-None-Match") == "v1":
+            return FakeResponse(304)
+
+        return self.responses.pop(0)
+
+
+def parse(resp):
+
+    return {"rows": [resp.status_code]}
+
+
+@pytest.fixture(params = ["memory", "disk"])
+def http_cache(request, tmp_path):
+
+    if request.param == "memory":
+        yield enable_http_cache()
+    else:
+        yield enable_http_cache(str(tmp_path))
+
+    disable_http_cache()
+
+
+def test_validators_are_sent_and_304_reuses_the_parsed_value(monkeypatch, http_cache):
+
+    server = FakeServer(FakeResponse(200, {"ETag": "v1",
+                                           "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}))
+    monkeypatch.setattr(client, "get", server.get)
+
+    first = client.get_parsed("https://example.com/page", parse)
+    first["rows"].append("changed by the caller")
+
+    second = client.get_parsed("https://example.com/page", parse)
+
+    assert server.requests[0] == {}
+    assert server.requests[1] == {"If-None-Match": "v1",
+                                  "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    # the stored value, untouched by the caller's change to the first result
+    assert second == {"rows": [200]}
+
+    second["rows"].append("changed again")
+    assert client.get_parsed("https://example.com/page", parse) == {"rows": [200]}
+
+
+def test_error_responses_are_not_stored(monkeypatch, http_cache):
+
+    server = FakeServer(FakeResponse(500, {"ETag": "v1"}), FakeResponse(200))
+    monkeypatch.setattr(client, "get", server.get)
+
+    assert client.get_parsed("https://example.com/page", parse) == {"rows": [500]}
+    assert client.get_parsed("https://example.com/page", parse) == {"rows": [200]}
+
+    assert server.requests == [{}, {}]
+
+
+def test_responses_without_validators_are_not_stored(monkeypatch, http_cache):
+
+    server = FakeServer(FakeResponse(200), FakeResponse(200))
+    monkeypatch.setattr(client, "get", server.get)
+
+    client.get_parsed("https://example.com/page", parse)
+    client.get_parsed("https://example.com/page", parse)
+
+    assert server.requests == [{}, {}]
+    assert http_cache.get(client.request_key("https://example.com/page", None)) is None
+
+
+def test_memory_cache_evicts_the_least_recently_used():
+
+    cache = MemoryHTTPCache(max_bytes = 10)
+
+    cache.set("a", {"value": 1}, 4)
+    cache.set("b", {"value": 2}, 4)
+    cache.get("a")
+    cache.set("c", {"value": 3}, 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+    assert cache.size == 8
+
+    # larger than the whole cache: not stored at all
+    cache.set("d", {"value": 4}, 11)
+
+    assert cache.get("d") is None
+    assert len(cache) == 2
+
+
+def test_disk_cache_evicts_the_least_recently_used(tmp_path):
+
+    value = "x" * 1000
+    probe = DiskHTTPCache(str(tmp_path / "probe"))
+    probe.set("a", {"value": value}, 0)
+    entry_size = os.path.getsize(probe._path("a"))
+
+    cache = DiskHTTPCache(str(tmp_path / "cache"), max_bytes = int(entry_size * 2.5))
+
+    now = time.time()
+    cache.set("a", {"value": value}, 0)
+    os.utime(cache._path("a"), (now - 100, now - 100))
+    cache.set("b", {"value": value}, 0)
+    os.utime(cache._path("b"), (now - 50, now - 50))
+
+    # reading "a" makes "b" the least recently used
+    assert cache.get("a") == {"value": value}
+
+    cache.set("c", {"value": value}, 0)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": value}
+    assert cache.get("c") == {"value": value}
@@ -0,0 +1,80 @@
+'''Checks of the instrumentation hooks'''
+
+import asyncio
+
+import pytest
+
+from yahoo_fin import instrument
+from yahoo_fin.instrument import instrumented
+
+
+@pytest.fixture
+def events():
+
+    received = []
+    instrument.add_observer(received.append)
+
+    yield received
+
+    instrument.clear_observers()
+
+
+@instrumented
+def numbers(count):
+
+    for i in range(count):
+        instrument.emit("cache", name = "test", hit = True)
+        yield i
+
+
+@instrumented
+async def anumbers(count):
+
+    for i in range(count):
+        instrument.emit("cache", name = "test", hit = True)
+        await asyncio.sleep(0)
+        yield i
+
+
+def test_generator_steps_are_tagged(events):
+
+    assert list(numbers(2)) == [0, 1]
+
+    assert [event["kind"] for event in events] == ["cache", "cache", "call"]
+    assert all(event["function"] == "test_instrument.numbers" for event in events)
+    assert events[-1]["error"] is None
+
+
+def test_closed_generator_reports_its_call(events):
+
+    gen = numbers(5)
+    next(gen)
+    gen.close()
+
+    assert [event["kind"] for event in events] == ["cache", "call"]
+    assert instrument._function.get() is None
+
+
+def test_async_generator_steps_are_tagged(events):
+
+    async def consume():
+        return [i async for i in anumbers(2)]
+
+    assert asyncio.run(consume()) == [0, 1]
+
+    assert [event["kind"] for event in events] == ["cache", "cache", "call"]
+    assert all(event["function"] == "test_instrument.anumbers" for event in events)
+
+
+def test_phases_are_timed_inside_the_function(events):
+
+    @instrumented
+    def work():
+        with instrument.phase("frame"):
+            pass
+
+    work()
+
+    assert [(event["kind"], event.get("name")) for event in events] == [("phase", "frame"),
+                                                                         ("call", None)]
+    assert events[0]["function"] == "test_instrument.work"
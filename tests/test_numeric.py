@@ -0,0 +1,72 @@
+'''Checks of the vectorized parsing of scraped numbers in stock_info'''
+
+import numpy as np
+import pandas as pd
+
+from yahoo_fin import options
+from yahoo_fin import stock_info as si
+from yahoo_fin.stock_info import _convert_numeric_columns, _parse_numeric
+
+
+def test_suffixes_scale_the_number():
+
+    values = pd.Series(["1.5K", "1.2k", "3M", "2.41B", "1T", "7"])
+
+    np.testing.assert_allclose(_parse_numeric(values),
+                               [1500, 1200, 3e6, 2.41e9, 1e12, 7])
+
+
+def test_commas_signs_and_percentages():
+
+    values = pd.Series(["1,234", "+5.5%", "-0.25", "-1,000.5", "20.00%", ".5"])
+
+    np.testing.assert_allclose(_parse_numeric(values),
+                               [1234, 5.5, -0.25, -1000.5, 20, 0.5])
+
+
+def test_placeholders_become_nan():
+
+    values = pd.Series(["N/A", "-", "--", "", "abc", None])
+
+    assert _parse_numeric(values).isna().all()
+
+
+def test_keep_unparsed_leaves_text_as_is():
+
+    values = pd.Series(["1.5M", "N/A", "Mar 15, 2024"])
+
+    assert _parse_numeric(values, keep_unparsed = True).tolist() == \
+           [1.5e6, "N/A", "Mar 15, 2024"]
+
+
+def test_numeric_series_are_only_cast():
+
+    values = pd.Series([1, 2, 3])
+
+    assert _parse_numeric(values).tolist() == [1.0, 2.0, 3.0]
+
+
+def test_only_fully_numeric_columns_are_converted():
+
+    table = pd.DataFrame({"Symbol": ["1", "2", "3"],
+                          "Volume": ["1,234", "N/A", "2.5M"],
+                          "Change": ["+1.5%", "-", "-0.5%"],
+                          "Earnings Date": ["Jan 1, 2024", "5", "-"],
+                          "Note": ["-", "N/A", "-"]})
+
+    result = _convert_numeric_columns(table.copy())
+
+    np.testing.assert_allclose(result["Volume"], [1234, np.nan, 2.5e6])
+    np.testing.assert_allclose(result["Change"], [1.5, np.nan, -0.5])
+    # names, a column where "Jan 1, 2024" does not parse, and one with no numbers at all
+    assert result["Symbol"].tolist() == ["1", "2", "3"]
+    assert result["Earnings Date"].tolist() == ["Jan 1, 2024", "5", "-"]
+    assert result["Note"].tolist() == ["-", "N/A", "-"]
+
+
+def test_force_float_is_still_available():
+
+    assert si.force_float("1.5") == 1.5
+    assert si.force_float("N/A") == "N/A"
+    assert si.force_float(None) is None
+    assert options.force_float("2") == 2.0
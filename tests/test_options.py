@@ -0,0 +1,111 @@
+'''Checks of the Black-Scholes pricing, implied volatility and chain
+cleaning in yahoo_fin.options'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from yahoo_fin.options import _clean_chain, add_greeks, black_scholes, implied_volatility
+
+
+def test_put_call_parity():
+
+    spot, strike, years, vol = 100.0, np.array([80.0, 100.0, 120.0]), 0.5, 0.3
+    rate, dividend_yield = 0.04, 0.01
+
+    call = black_scholes(spot, strike, years, vol, rate, dividend_yield, is_call = True)
+    put = black_scholes(spot, strike, years, vol, rate, dividend_yield, is_call = False)
+
+    # C - P = S e^(-qT) - K e^(-rT)
+    expected = spot * np.exp(-dividend_yield * years) - strike * np.exp(-rate * years)
+
+    np.testing.assert_allclose(call["price"] - put["price"], expected, atol = 1e-5)
+    np.testing.assert_allclose(call["delta"] - put["delta"],
+                               np.exp(-dividend_yield * years), atol = 1e-6)
+
+
+def test_textbook_reference_values():
+
+    # S = K = 100, one year, 20% vol, 5% rate: the standard worked example
+    call = black_scholes(100, 100, 1.0, 0.2, rate = 0.05)
+
+    assert call["price"] == pytest.approx(10.4506, abs = 1e-4)
+    assert call["delta"] == pytest.approx(0.6368, abs = 1e-4)
+    assert call["gamma"] == pytest.approx(0.018762, abs = 1e-6)
+    # per vol point and per calendar day
+    assert call["vega"] == pytest.approx(0.37524, abs = 1e-5)
+    assert call["theta"] == pytest.approx(-6.4140 / 365, abs = 1e-6)
+
+
+def test_implied_volatility_round_trip():
+
+    strike = np.array([80.0, 100.0, 120.0])
+    is_call = np.array([False, True, True])
+
+    prices = black_scholes(100, strike, 0.25, 0.2, 0.03, is_call = is_call)["price"]
+    vol = implied_volatility(prices, 100, strike, 0.25, 0.03, is_call = is_call)
+
+    np.testing.assert_allclose(vol, 0.2, atol = 1e-6)
+
+
+def test_prices_outside_the_bounds_give_nan():
+
+    # a call worth more than the stock, one below its intrinsic value, and a put
+    # worth more than its strike
+    vol = implied_volatility([150.0, 5.0, 120.0], 100, [100.0, 80.0, 100.0], 0.5,
+                             is_call = [True, True, False])
+
+    assert np.isnan(vol).all()
+
+
+def chain_table():
+
+    return pd.DataFrame({"Contract Name": ["ABC240119C00100000", "ABC240119C00110000"],
+                         "Strike": ["100.00", "1,100.00"],
+                         "Last Price": ["5.00", "-"],
+                         "Bid": ["4.90", "0.00"],
+                         "Ask": ["5.10", "0.00"],
+                         "Change": ["+0.50", "-"],
+                         "% Change": ["+20.00%", "-"],
+                         "Volume": ["1,234", "-"],
+                         "Open Interest": ["5,000", "-"],
+                         "Implied Volatility": ["20.00%", "0.00%"]})
+
+
+def test_clean_chain_parses_every_numeric_column():
+
+    chain = _clean_chain(chain_table())
+
+    assert chain["Strike"].tolist() == [100.0, 1100.0]
+    assert chain["Change"].iloc[0] == 0.5
+    assert chain["% Change"].tolist() == [0.2, 0.0]
+    assert chain["Volume"].tolist() == [1234.0, 0.0]
+    assert chain["Open Interest"].tolist() == [5000.0, 0.0]
+    assert chain["Implied Volatility"].iloc[0] == pytest.approx(0.2)
+    assert np.isnan(chain["Last Price"].iloc[1])
+
+
+def test_add_greeks_uses_the_mid_price():
+
+    chain = _clean_chain(chain_table()).iloc[:1]
+
+    result = add_greeks(chain, spot = 100, option_type = "call", expiration = "2024-01-19",
+                        now = "2023-12-19 16:00")
+
+    assert result["Mid"].iloc[0] == pytest.approx(5.0)
+
+    years = (pd.Timestamp("2024-01-19 21:00") - pd.Timestamp("2023-12-19 16:00")) / \
+            pd.Timedelta(days = 365)
+    price = black_scholes(100, 100, years, result["IV"].iloc[0])["price"]
+
+    assert price == pytest.approx(5.0, abs = 1e-6)
+
+
+def test_expired_contracts_give_nan():
+
+    chain = _clean_chain(chain_table())
+
+    result = add_greeks(chain, spot = 100, option_type = "call", expiration = "2024-01-19",
+                        now = "2024-01-22")
+
+    assert result[["IV", "Delta", "Gamma", "Vega", "Theta"]].isna().all().all()
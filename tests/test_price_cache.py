@@ -0,0 +1,173 @@
+'''Checks of the incremental price cache behind get_data, run against a fake
+chart endpoint so no network access is needed.'''
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from yahoo_fin import client
+from yahoo_fin import stock_info as si
+from yahoo_fin.cache import PriceCache, chart_cache
+
+
+class FakeResponse(object):
+
+    ok = True
+
+    def __init__(self, payload):
+
+        self.payload = payload
+
+    def json(self):
+
+        return self.payload
+
+
+class FakeChart(object):
+
+    '''Serves daily bars (stamped 14:30 UTC like Yahoo's) for the requested
+       period1 / period2 and records every requested period'''
+
+    def __init__(self, start = "2023-10-02", end = "2024-03-29"):
+
+        self.dates = pd.bdate_range(start, end)
+        self.close = 100 + np.arange(len(self.dates), dtype = float)
+        self.adjclose = self.close * 0.5
+        self.periods = []
+
+    def get(self, url, params = None, headers = None, **kwargs):
+
+        period1, period2 = params["period1"], params["period2"]
+        self.periods.append((pd.Timestamp(period1, unit = "s"),
+                             pd.Timestamp(period2, unit = "s")))
+
+        stamps = np.asarray((self.dates + pd.Timedelta(hours = 14, minutes = 30) -
+                             pd.Timestamp(0)) // pd.Timedelta(seconds = 1))
+        keep = (stamps >= period1) & (stamps < period2)
+
+        result = {"indicators": {"quote": [{}], "adjclose": [{}]}}
+
+        if keep.any():
+            close = self.close[keep].tolist()
+            result["timestamp"] = stamps[keep].tolist()
+            result["indicators"]["quote"][0] = {"open": close, "high": close, "low": close,
+                                                "close": close,
+                                                "volume": [1000] * len(close)}
+            result["indicators"]["adjclose"][0] = {"adjclose": self.adjclose[keep].tolist()}
+
+        return FakeResponse({"chart": {"result": [result]}})
+
+
+@pytest.fixture
+def chart(monkeypatch):
+
+    fake = FakeChart()
+    monkeypatch.setattr(client, "get", fake.get)
+    chart_cache.clear()
+
+    yield fake
+
+    chart_cache.clear()
+
+
+@pytest.fixture
+def cache(tmp_path):
+
+    return PriceCache(str(tmp_path))
+
+
+def uncached(start_date, end_date):
+
+    return si.get_data("abc", start_date, end_date, cache = False)
+
+
+def assert_same(frame, expected):
+
+    # the parquet round trip changes the index resolution and drops its frequency
+    pd.testing.assert_frame_equal(frame, expected, check_index_type = False,
+                                  check_freq = False, check_dtype = False)
+
+
+def test_first_call_downloads_and_stores(chart, cache):
+
+    frame = si.get_data("abc", "2024-01-02", "2024-01-20", cache = cache)
+
+    assert len(chart.periods) == 1
+    assert len(frame) == 14
+    assert_same(frame, uncached("2024-01-02", "2024-01-20"))
+
+    stored, covered_from = cache.load("abc", "1d")
+    assert covered_from == pd.Timestamp("2024-01-02")
+    assert_same(stored, frame)
+
+
+def test_later_end_downloads_only_from_last_bar(chart, cache):
+
+    si.get_data("abc", "2024-01-02", "2024-01-20", cache = cache)
+    chart.periods.clear()
+
+    frame = si.get_data("abc", "2024-01-02", "2024-02-10", cache = cache)
+
+    # the last stored bar (Friday 19th) is downloaded again as it may have been partial
+    assert chart.periods == [(pd.Timestamp("2024-01-19"), pd.Timestamp("2024-02-10"))]
+    assert_same(frame, uncached("2024-01-02", "2024-02-10"))
+
+
+def test_covered_range_is_served_from_disk(chart, cache):
+
+    si.get_data("abc", "2024-01-02", "2024-01-20", cache = cache)
+    chart.periods.clear()
+
+    frame = si.get_data("abc", "2024-01-08", "2024-01-13", cache = cache)
+
+    assert chart.periods == []
+    assert_same(frame, uncached("2024-01-08", "2024-01-13"))
+
+
+def test_earlier_start_downloads_the_head(chart, cache):
+
+    si.get_data("abc", "2024-01-02", "2024-01-20", cache = cache)
+    chart.periods.clear()
+
+    frame = si.get_data("abc", "2023-11-01", "2024-01-20", cache = cache)
+
+    assert chart.periods[0] == (pd.Timestamp("2023-11-01"), pd.Timestamp("2024-01-02"))
+    assert_same(frame, uncached("2023-11-01", "2024-01-20"))
+    assert not frame.index.duplicated().any()
+
+    assert cache.load("abc", "1d")[1] == pd.Timestamp("2023-11-01")
+
+
+def test_adjclose_change_downloads_the_full_series(chart, cache):
+
+    si.get_data("abc", "2024-01-02", "2024-01-20", cache = cache)
+
+    # a dividend rescales every adjusted close
+    chart.adjclose = chart.adjclose * 0.9
+    chart.periods.clear()
+
+    frame = si.get_data("abc", "2024-01-02", "2024-02-10", cache = cache)
+
+    assert chart.periods[-1] == (pd.Timestamp("2024-01-02"), pd.Timestamp("2024-02-10"))
+    assert_same(frame, uncached("2024-01-02", "2024-02-10"))
+
+
+def test_unchanged_adjclose_is_not_downloaded_again(chart, cache):
+
+    si.get_data("abc", "2024-01-02", "2024-01-20", cache = cache)
+    chart.periods.clear()
+
+    si.get_data("abc", "2024-01-02", "2024-02-10", cache = cache)
+
+    assert len(chart.periods) == 1
+
+
+def test_empty_first_download_is_extended(chart, cache):
+
+    # a weekend: no bars at all
+    frame = si.get_data("abc", "2024-01-06", "2024-01-08", cache = cache)
+    assert frame.empty
+
+    frame = si.get_data("abc", "2024-01-06", "2024-01-20", cache = cache)
+
+    assert_same(frame, uncached("2024-01-06", "2024-01-20"))
@@ -0,0 +1,55 @@
+'''Checks of the quoteSummary backend's fall back on the scraped page'''
+
+import pytest
+
+from yahoo_fin import stock_info as si
+from yahoo_fin.cache import page_store_cache
+
+
+PROFILE = {"assetProfile": {"city": "Testville", "sector": "Technology",
+                            "companyOfficers": [{"name": "A", "title": "CEO"}]}}
+
+
+@pytest.fixture
+def scraped(monkeypatch):
+
+    pages = []
+
+    def parse_json(url, headers = None):
+        pages.append(url)
+        return PROFILE
+
+    monkeypatch.setattr(si, "_parse_json", parse_json)
+    page_store_cache.clear()
+
+    yield pages
+
+    page_store_cache.clear()
+
+
+def test_complete_api_response_is_used(monkeypatch, scraped):
+
+    monkeypatch.setattr(si, "_get_summary_modules", lambda ticker, modules: PROFILE)
+
+    assert si.get_company_info("abc", backend = "api").loc["city", "Value"] == "Testville"
+    assert scraped == []
+
+
+@pytest.mark.parametrize("response", [{}, {"price": {"regularMarketPrice": 1.0}}])
+def test_missing_module_falls_back_on_the_page(monkeypatch, scraped, response):
+
+    monkeypatch.setattr(si, "_get_summary_modules", lambda ticker, modules: response)
+
+    assert si.get_company_info("abc", backend = "api").loc["city", "Value"] == "Testville"
+    assert len(scraped) == 1
+
+
+def test_failed_api_call_falls_back_on_the_page(monkeypatch, scraped):
+
+    def fail(ticker, modules):
+        raise AssertionError("Unauthorized")
+
+    monkeypatch.setattr(si, "_get_summary_modules", fail)
+
+    assert si.get_company_officers("abc", backend = "api").loc["A", "title"] == "CEO"
+    assert len(scraped) == 1
@@ -0,0 +1,182 @@
+'''Checks of the rate limiter and retries in yahoo_fin.ratelimit, run
+against a fake request() so no network access is needed'''
+
+import asyncio
+import email.utils
+import time
+
+import pytest
+
+from yahoo_fin import ratelimit
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, headers = None):
+
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def responses(*statuses, headers = None):
+
+    '''request() answering with the given statuses in turn, recording each call'''
+
+    calls = []
+    queue = list(statuses)
+
+    def request():
+        calls.append(time.monotonic())
+        return FakeResponse(queue.pop(0), headers)
+
+    return request, calls
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+
+    '''Records the retry delays instead of sleeping'''
+
+    delays = []
+    monkeypatch.setattr(ratelimit.time, "sleep", delays.append)
+
+    return delays
+
+
+def use(monkeypatch, **kwargs):
+
+    limiter = ratelimit.RateLimiter(**kwargs)
+    monkeypatch.setattr(ratelimit, "_limiter", limiter)
+
+    return limiter
+
+
+def test_token_bucket_caps_the_rate():
+
+    limiter = ratelimit.RateLimiter(rate = 10, burst = 2)
+
+    # the burst goes straight through, then a token takes 1 / rate to refill
+    assert limiter._try_acquire() == 0
+    assert limiter._try_acquire() == 0
+    assert limiter._try_acquire() == pytest.approx(0.1, abs = 0.01)
+
+    time.sleep(0.12)
+
+    assert limiter._try_acquire() == 0
+
+
+def test_full_concurrency_limit_waits_for_a_release():
+
+    limiter = ratelimit.RateLimiter(rate = None, max_concurrency = 1)
+
+    assert limiter._try_acquire() == 0
+    assert limiter._try_acquire() is None
+
+    limiter.release()
+
+    assert limiter._try_acquire() == 0
+
+
+def test_429_halves_the_concurrency_limit(monkeypatch, sleeps):
+
+    limiter = use(monkeypatch, rate = None, max_concurrency = 32, backoff_base = 0)
+    request, calls = responses(429, 429, 200)
+
+    resp = ratelimit.send(request)
+
+    assert resp.status_code == 200
+    assert len(calls) == 3
+    # halved twice, then grown by 1 / limit on the success
+    assert limiter.limit == pytest.approx(8 + 1 / 8)
+    assert limiter.active == 0
+
+
+def test_5xx_retries_keep_the_concurrency_limit(monkeypatch, sleeps):
+
+    limiter = use(monkeypatch, rate = None, max_concurrency = 32)
+    request, calls = responses(503, 200)
+
+    ratelimit.send(request)
+
+    assert len(calls) == 2
+    assert limiter.limit == 32
+
+
+def test_retry_after_seconds_is_honoured(monkeypatch, sleeps):
+
+    use(monkeypatch, rate = None, backoff_base = 0.001)
+    request, calls = responses(429, 200, headers = {"Retry-After": "7"})
+
+    ratelimit.send(request)
+
+    assert sleeps == [7.0]
+
+
+def test_retry_after_http_date_is_honoured(monkeypatch, sleeps):
+
+    use(monkeypatch, rate = None, backoff_base = 0.001)
+    when = email.utils.formatdate(time.time() + 30, usegmt = True)
+    request, calls = responses(503, 200, headers = {"Retry-After": when})
+
+    ratelimit.send(request)
+
+    assert sleeps[0] == pytest.approx(30, abs = 1.5)
+
+
+def test_parse_retry_after():
+
+    assert ratelimit.parse_retry_after("12") == 12.0
+    assert ratelimit.parse_retry_after("-3") == 0.0
+    assert ratelimit.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert ratelimit.parse_retry_after("soon") is None
+    assert ratelimit.parse_retry_after(None) is None
+
+
+def test_last_response_is_returned_once_retries_run_out(monkeypatch, sleeps):
+
+    use(monkeypatch, rate = None, max_retries = 2)
+    request, calls = responses(503, 429, 503)
+
+    resp = ratelimit.send(request)
+
+    assert resp.status_code == 503
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_exception_releases_the_slot(monkeypatch):
+
+    limiter = use(monkeypatch, rate = None, max_concurrency = 1)
+
+    def request():
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        ratelimit.send(request)
+
+    assert limiter.active == 0
+    # the slot is free again, so this does not block
+    request, calls = responses(200)
+    assert ratelimit.send(request).status_code == 200
+
+
+def test_async_send_retries_and_releases(monkeypatch):
+
+    limiter = use(monkeypatch, rate = None, backoff_base = 0, max_concurrency = 4)
+    statuses = [429, 200]
+
+    async def request():
+        return FakeResponse(statuses.pop(0))
+
+    async def failing():
+        raise ConnectionError("reset")
+
+    resp = asyncio.run(ratelimit.asend(request))
+
+    assert resp.status_code == 200
+    assert limiter.limit == pytest.approx(2 + 1 / 2)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(ratelimit.asend(failing))
+
+    assert limiter.active == 0
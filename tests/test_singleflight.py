@@ -0,0 +1,90 @@
+'''Checks of the single flight groups'''
+
+import asyncio
+import threading
+import time
+
+from yahoo_fin.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_leader_and_followers_all_see_shared():
+
+    flight = SingleFlight()
+    results = []
+
+    def work():
+        time.sleep(0.1)
+        return {"a": 1}
+
+    def call():
+        results.append(flight.do("key", work))
+
+    threads = [threading.Thread(target = call) for _ in range(3)]
+
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+
+    for thread in threads:
+        thread.join()
+
+    assert all(shared for _, shared in results)
+    assert flight.do("key", lambda: 1) == (1, False)
+
+
+def test_async_calls_share_one_run():
+
+    flight = AsyncSingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return 1
+
+    async def main():
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work))
+
+    assert asyncio.run(main()) == [(1, True), (1, True)]
+    assert len(runs) == 1
+
+
+def test_cancelled_first_caller_does_not_cancel_the_others():
+
+    flight = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(asyncio.wait_for(flight.do("key", work), 0.02))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("key", work))
+        return await asyncio.gather(first, second, return_exceptions = True)
+
+    first, second = asyncio.run(main())
+
+    assert isinstance(first, asyncio.TimeoutError)
+    assert second == ("done", True)
+
+
+def test_work_is_cancelled_once_every_caller_is_gone():
+
+    flight = AsyncSingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.1)
+        finished.append(1)
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.sleep(0.15)
+        return len(flight)
+
+    assert asyncio.run(main()) == 0
+    assert finished == []
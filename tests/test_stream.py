@@ -0,0 +1,104 @@
+'''Checks of stock_info.stream_quotes against a fake quote endpoint that
+serves a scripted sequence of polls'''
+
+import time
+
+import pytest
+
+from yahoo_fin import client
+from yahoo_fin import stock_info as si
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, payload):
+
+        self.ok = status_code < 400
+        self.payload = payload
+
+    def json(self):
+
+        return self.payload
+
+
+def quote_payload(prices):
+
+    return {"quoteResponse": {"result": [
+        {"symbol": symbol, "regularMarketPrice": price, "regularMarketVolume": 100}
+        for symbol, price in prices.items()]}}
+
+
+@pytest.fixture
+def polls(monkeypatch):
+
+    '''Polls to serve, in order: a dictionary of prices, or None for a poll
+       that fails; records the time of every request'''
+
+    script = []
+    times = []
+
+    def get(url, params = None, headers = None, **kwargs):
+        times.append(time.monotonic())
+        prices = script.pop(0)
+        if prices is None:
+            return FakeResponse(503, {"error": "unavailable"})
+        return FakeResponse(200, quote_payload(prices))
+
+    monkeypatch.setattr(client, "get", get)
+
+    return script, times
+
+
+def test_only_changes_are_yielded(polls):
+
+    script, _ = polls
+    script.extend([{"A": 1.0, "B": 2.0}, {"A": 1.0, "B": 2.0}, {"A": 1.5, "B": 2.0}])
+
+    updates = list(si.stream_quotes(["A", "B"], interval_s = 0, max_polls = 3))
+
+    # the unchanged second poll yields nothing
+    assert len(updates) == 2
+    assert updates[0]["A"] == {"symbol": "A", "regularMarketPrice": 1.0,
+                               "regularMarketVolume": 100}
+    assert updates[1] == {"A": {"regularMarketPrice": 1.5}}
+
+
+def test_fields_limit_what_is_watched(polls):
+
+    script, _ = polls
+    script.extend([{"A": 1.0}, {"A": 1.5}])
+
+    updates = list(si.stream_quotes(["A"], interval_s = 0, max_polls = 2,
+                                    fields = ["regularMarketPrice"]))
+
+    assert updates == [{"A": {"regularMarketPrice": 1.0}},
+                       {"A": {"regularMarketPrice": 1.5}}]
+
+
+def test_failed_poll_keeps_the_previous_snapshot(polls):
+
+    script, _ = polls
+    script.extend([{"A": 1.0}, None, {"A": 1.0}, {"A": 2.0}])
+
+    with pytest.warns(UserWarning, match = "Quote poll failed"):
+        updates = list(si.stream_quotes(["A"], interval_s = 0, max_polls = 4,
+                                        fields = ["regularMarketPrice"]))
+
+    # the poll after the failure is compared with the snapshot before it
+    assert updates == [{"A": {"regularMarketPrice": 1.0}},
+                       {"A": {"regularMarketPrice": 2.0}}]
+
+
+def test_slow_consumer_does_not_cause_a_burst_of_polls(polls):
+
+    script, times = polls
+    script.extend([{"A": 1.0}, {"A": 2.0}, {"A": 3.0}, {"A": 4.0}])
+
+    for update in si.stream_quotes(["A"], interval_s = 0.05, max_polls = 4):
+        if len(times) == 1:
+            time.sleep(0.2)
+
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+
+    # the cadence restarts after the slow item instead of catching up
+    assert min(gaps[1:]) >= 0.04
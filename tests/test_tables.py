@@ -0,0 +1,49 @@
+'''Checks that yahoo_fin.tables matches pandas.read_html'''
+
+import io
+
+import pandas as pd
+import pytest
+
+from yahoo_fin import tables
+
+
+PAGE = """<html><body>
+<table><tr><td>Previous Close</td><td>1,234.50</td></tr>
+       <tr><td>Volume</td><td>48,530,131</td></tr></table>
+<table style="display: none"><tr><td>hidden</td></tr></table>
+<table><thead><tr><th>Name</th><th colspan="2">Range</th></tr></thead>
+       <tbody><tr><td rowspan="2">A<br>B</td><td>1</td><td>2</td></tr>
+              <tr><td>3</td><td>4</td></tr></tbody>
+       <tfoot><tr><td>Total</td><td>4</td><td>6</td></tr></tfoot></table>
+</body></html>"""
+
+
+def test_frames_match_read_html():
+
+    expected = pd.read_html(io.StringIO(PAGE))
+    result = tables.read_tables(PAGE)
+
+    assert len(result) == len(expected)
+
+    for frame, expected_frame in zip(result, expected):
+        pd.testing.assert_frame_equal(frame, expected_frame)
+
+
+def test_select_converts_only_chosen_tables():
+
+    result = tables.read_tables(PAGE, lambda found: found[1:])
+
+    pd.testing.assert_frame_equal(result[0], pd.read_html(io.StringIO(PAGE))[1])
+    assert len(result) == 1
+
+
+def test_page_without_tables_raises_like_read_html():
+
+    page = "<html><body><p>Symbols similar to 'XXXX'</p></body></html>"
+
+    with pytest.raises(ValueError, match = "No tables found"):
+        pd.read_html(io.StringIO(page))
+
+    with pytest.raises(ValueError, match = "No tables found"):
+        tables.read_tables(page)
@@ -0,0 +1,62 @@
+'''Checks that the NASDAQ symbol files share FTP sessions, against a fake
+download'''
+
+import pytest
+
+from yahoo_fin import cache
+from yahoo_fin import stock_info as si
+
+
+FILES = {"nasdaqlisted.txt": b"Symbol|Security Name\r\nAAPL|Apple Inc.\r\n"
+                             b"File Creation Time: 0101202400:00|\r\n",
+         "otherlisted.txt": b"ACT Symbol|Security Name\r\nIBM|IBM Corp.\r\n"
+                            b"File Creation Time: 0101202400:00|\r\n"}
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+
+    made = []
+
+    def download(file_names):
+        made.append(list(file_names))
+        return {file_name: FILES[file_name] for file_name in file_names}
+
+    monkeypatch.setattr(si, "_download_nasdaq_files", download)
+    cache.disable_tickers_cache()
+
+    yield made
+
+    cache.disable_tickers_cache()
+
+
+def test_combined_lists_use_one_session_without_cache(sessions):
+
+    nasdaq, other = si.tickers_nasdaq_and_other()
+
+    assert nasdaq == si.tickers_nasdaq()
+    assert other == si.tickers_other()
+    assert sessions[0] == ["nasdaqlisted.txt", "otherlisted.txt"]
+
+
+def test_single_lists_without_cache_fetch_one_file(sessions):
+
+    si.tickers_nasdaq()
+    si.tickers_other()
+
+    assert sessions == [["nasdaqlisted.txt"], ["otherlisted.txt"]]
+
+
+def test_cache_fetches_both_files_once(sessions, tmp_path):
+
+    cache.enable_tickers_cache(str(tmp_path))
+
+    si.tickers_nasdaq()
+    si.tickers_other()
+    si.tickers_nasdaq_and_other()
+
+    assert sessions == [["nasdaqlisted.txt", "otherlisted.txt"]]
+
+    si.tickers_other(refresh = True)
+
+    assert len(sessions) == 2
@@ -1,12 +0,0 @@
-
-import requests
-import pandas as pd
-import ftplib
-import io
-import re
-import json
-
-try:
-    from requests_html import HTMLSession
-except Exception:
-    pass
@@ -0,0 +1,51 @@
+'''Command line entry point.
+
+    python -m yahoo_fin download sp500 --start 2020-01-01 --out-dir data
+    python -m yahoo_fin download AAPL,MSFT,AMZN --interval 1wk
+'''
+
+import argparse
+import sys
+
+from .bulk import download_universe, formats, universes
+
+
+def main(argv = None):
+
+    parser = argparse.ArgumentParser(prog = "python -m yahoo_fin")
+    commands = parser.add_subparsers(dest = "command")
+    commands.required = True
+
+    download = commands.add_parser("download", help = "download price history for a ticker universe")
+    download.add_argument("universe", help = "one of %s, or a comma separated list of tickers" %
+                                             ", ".join(universes))
+    download.add_argument("--start", default = None)
+    download.add_argument("--end", default = None)
+    download.add_argument("--interval", default = "1d", choices = ["1d", "1wk", "1mo", "1m"])
+    download.add_argument("--out-dir", default = "yahoo_fin_data")
+    download.add_argument("--workers", type = int, default = 8)
+    download.add_argument("--format", default = "csv", choices = formats)
+    download.add_argument("--no-resume", dest = "resume", action = "store_false")
+
+    args = parser.parse_args(argv)
+
+    universe = args.universe
+
+    if universe.lower() not in universes:
+        universe = [ticker.strip() for ticker in universe.split(",")]
+
+    paths, errors = download_universe(universe, start_date = args.start, end_date = args.end,
+                                      interval = args.interval, out_dir = args.out_dir,
+                                      workers = args.workers, format = args.format,
+                                      resume = args.resume)
+
+    print("downloaded %d tickers to %s" % (len(paths), args.out_dir))
+
+    for ticker, error in errors.items():
+        print("failed %s: %s" % (ticker, error), file = sys.stderr)
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,460 @@
+'''asyncio counterparts of the chart, quote, quoteSummary (financials and
+company profile) and options functions.
+
+Requires httpx (pip install httpx, or httpx[http2] for HTTP/2 multiplexing).
+Responses are parsed with the same helpers as the synchronous functions, so
+both paths return identical results.
+'''
+
+import asyncio
+import threading
+import time
+import warnings
+
+from . import instrument, ratelimit, stock_info
+from .cache import page_store_cache
+from .client import default_headers, default_timeout
+from .instrument import instrumented
+from .singleflight import AsyncSingleFlight, request_key
+from .tables import read_tables
+from .options import build_options_url, _chain_tables, _parse_options_chain
+from .stock_info import build_url, quotes_url, summary_url, summary_modules, \
+                        _parse_chart_data, _parse_quote_data, _parse_quotes, \
+                        _parse_live_prices, _chunk_symbols, _diff_quotes, \
+                        _report_missing_symbols, _parse_summary_modules, \
+                        _has_summary_modules, _summary_page_url, _parse_page_store, \
+                        _parse_financials, _parse_company_info, _parse_company_officers
+
+
+class AsyncYahooClient(object):
+
+    '''Keep-alive async HTTP client shared by every function in yahoo_fin.aio.
+       Shares the process-wide rate limiter with the synchronous client.
+
+       @param: session = None, an existing httpx.AsyncClient to route calls through
+       @param: headers = None, extra headers sent with every request
+       @param: timeout = default_timeout
+       @param: http2 = False, multiplex requests over HTTP/2 (needs httpx[http2])
+       @param: max_connections = 100
+       @param: max_keepalive_connections = 32
+       @param: coalesce = True, identical requests sent while one is still in
+               flight wait for it and share its response
+    '''
+
+    def __init__(self, session = None, headers = None, timeout = default_timeout,
+                 http2 = False, max_connections = 100,
+                 max_keepalive_connections = 32, coalesce = True):
+
+        if session is None:
+
+            try:
+                import httpx
+            except ImportError:
+                raise ImportError("""yahoo_fin.aio requires httpx.  Install using:
+                                     pip install httpx""")
+
+            if isinstance(timeout, tuple):
+                connect, read = timeout
+                timeout = httpx.Timeout(read, connect = connect)
+
+            limits = httpx.Limits(max_connections = max_connections,
+                                  max_keepalive_connections = max_keepalive_connections)
+
+            session = httpx.AsyncClient(headers = default_headers, timeout = timeout,
+                                        limits = limits, http2 = http2,
+                                        follow_redirects = True)
+
+        if headers is not None:
+            session.headers.update(headers)
+
+        self.session = session
+        self.flight = AsyncSingleFlight() if coalesce else None
+
+
+    async def get(self, url, params = None, headers = None, **kwargs):
+
+        async def request():
+
+            start = time.perf_counter()
+            resp = await self.session.get(url, params = params, headers = headers, **kwargs)
+
+            if instrument.enabled():
+                instrument.emit("request", url = url, status = resp.status_code,
+                                bytes = len(resp.content),
+                                seconds = time.perf_counter() - start)
+
+            return resp
+
+        def send():
+            return ratelimit.asend(request, url)
+
+        key = None if self.flight is None else request_key(url, params, headers, **kwargs)
+
+        if key is None:
+            return await send()
+
+        return (await self.flight.do(key, send))[0]
+
+
+    async def aclose(self):
+
+        await self.session.aclose()
+
+
+# httpx.AsyncClient connections belong to the event loop that opened them,
+# so every running loop gets a client of its own (asyncio.run starts a new
+# loop each time)
+_clients = {}
+_client_settings = {}
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+
+    '''Returns the async client of the running event loop, creating it on
+       first use, or the client passed to set_client'''
+
+    if _client is not None:
+        return _client
+
+    loop = asyncio.get_running_loop()
+
+    with _client_lock:
+
+        # forget the clients of loops that have been closed
+        for old_loop in [old_loop for old_loop in _clients if old_loop.is_closed()]:
+            del _clients[old_loop]
+
+        if loop not in _clients:
+            _clients[loop] = AsyncYahooClient(**_client_settings)
+
+        return _clients[loop]
+
+
+def set_client(client):
+
+    '''Routes every yahoo_fin.aio request through client, whatever loop is
+       running (so client must only be used from one loop), or goes back to
+       one default client per loop if client is None.  The previous client
+       is not closed, since closing it requires an event loop; use aclose()
+       for that.'''
+
+    global _client
+
+    with _client_lock:
+        _client = client
+
+    return client
+
+
+def set_session(session):
+
+    '''Routes every yahoo_fin.aio request through a user supplied httpx.AsyncClient'''
+
+    return set_client(AsyncYahooClient(session = session))
+
+
+def configure(**kwargs):
+
+    '''Sets up the per loop async clients with new settings, e.g.
+       configure(http2 = True, max_connections = 200).  Clients created
+       before are dropped without being closed.'''
+
+    global _client, _client_settings
+
+    with _client_lock:
+        _client_settings = dict(kwargs)
+        _client = None
+        _clients.clear()
+
+
+async def aclose():
+
+    '''Closes the connection pool of the running loop's async client (or of
+       the client passed to set_client)'''
+
+    global _client
+
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+        return
+
+    with _client_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+
+    if client is not None:
+        await client.aclose()
+
+
+@instrumented
+async def aget_data(ticker, start_date = None, end_date = None, index_as_date = True,
+                    interval = "1d", headers = default_headers):
+
+    '''Async version of stock_info.get_data
+
+       @param: ticker
+       @param: start_date = None
+       @param: end_date = None
+       @param: index_as_date = True
+       @param: interval = "1d"
+    '''
+
+    if interval not in ("1d", "1wk", "1mo", "1m"):
+        raise AssertionError("interval must be of of '1d', '1wk', '1mo', or '1m'")
+
+    site, params = build_url(ticker, start_date, end_date, interval)
+    resp = await get_client().get(site, params = params, headers = headers)
+
+    if resp.is_error:
+        raise AssertionError(resp.json())
+
+    with instrument.phase("json"):
+        data = resp.json()
+
+    with instrument.phase("frame"):
+        return _parse_chart_data(data, ticker, interval, index_as_date)
+
+
+@instrumented
+async def aget_quote_data(ticker, headers = default_headers):
+
+    '''Async version of stock_info.get_quote_data
+
+       @param: ticker
+    '''
+
+    site = quotes_url + ticker
+
+    resp = await get_client().get(site, headers = headers)
+
+    if resp.is_error:
+        raise AssertionError("""Invalid response from server.  Check if ticker is
+                              valid.""")
+
+    with instrument.phase("json"):
+        data = resp.json()
+
+    return _parse_quote_data(data)
+
+
+@instrumented
+async def aget_live_prices(ticker_list, chunk_size = 200, headers = default_headers):
+
+    '''Async version of stock_info.get_live_prices
+
+       @param: ticker_list
+       @param: chunk_size = 200
+    '''
+
+    quotes = await _aget_quotes(ticker_list, chunk_size, headers)
+
+    results = _parse_live_prices(quotes)
+
+    _report_missing_symbols(ticker_list, results)
+
+    return results
+
+
+@instrumented
+async def astream_quotes(ticker_list, interval_s = 5, fields = None, max_polls = None,
+                         chunk_size = 200, headers = default_headers):
+
+    '''Async iterator version of stock_info.stream_quotes
+
+       @param: ticker_list
+       @param: interval_s = 5
+       @param: fields = None
+       @param: max_polls = None
+    '''
+
+    loop = asyncio.get_running_loop()
+
+    previous = {}
+    polls = 0
+    next_poll = loop.time()
+
+    while max_polls is None or polls < max_polls:
+
+        try:
+            quotes = await _aget_quotes(ticker_list, chunk_size, headers)
+        except Exception as error:
+            warnings.warn("Quote poll failed, keeping the previous quotes: %r" % (error,))
+            quotes = {}
+
+        polls += 1
+
+        changes = _diff_quotes(previous, quotes, fields)
+        previous.update(quotes)
+
+        if changes:
+            yield changes
+
+        if max_polls is not None and polls >= max_polls:
+            break
+
+        next_poll = max(next_poll + interval_s, loop.time())
+        await asyncio.sleep(max(0, next_poll - loop.time()))
+
+
+async def _aget_quotes(ticker_list, chunk_size = 200, headers = default_headers):
+
+    async def fetch(chunk):
+        resp = await get_client().get(quotes_url + ','.join(chunk), headers = headers)
+
+        if resp.is_error:
+            raise AssertionError(resp.json())
+
+        with instrument.phase("json"):
+            return _parse_quotes(resp.json())
+
+    chunks = _chunk_symbols(ticker_list, chunk_size)
+    outcomes = await asyncio.gather(*[fetch(chunk) for chunk in chunks],
+                                    return_exceptions = True)
+
+    # like stock_info._get_quotes, a failed chunk only drops its own symbols,
+    # which the callers then report as missing
+    quotes = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+
+    for error in errors:
+        if not isinstance(error, Exception):
+            raise error
+
+    if errors and not quotes:
+        raise errors[0]
+
+    results = {}
+
+    for chunk_quotes in quotes:
+        results.update(chunk_quotes)
+
+    return results
+
+
+async def _aget_quote_summary(ticker, page, backend = None):
+
+    '''Async version of stock_info._get_quote_summary, sharing its cache
+       of module and page data'''
+
+    if backend is None:
+        backend = stock_info.summary_backend
+
+    if backend not in ("api", "scrape"):
+        raise AssertionError("backend must be one of 'api' or 'scrape'")
+
+    if backend == "api":
+
+        modules = summary_modules[page]
+        key = (ticker.upper(), tuple(modules))
+        json_info = page_store_cache.get(key)
+
+        instrument.emit("cache", name = "page_store", hit = json_info is not None)
+
+        if json_info is None:
+
+            try:
+                resp = await get_client().get(summary_url + ticker,
+                                              params = {"modules": ",".join(modules)})
+
+                if resp.is_error:
+                    raise AssertionError(resp.json())
+
+                with instrument.phase("json"):
+                    json_info = _parse_summary_modules(resp.json())
+
+            except Exception:
+                json_info = None
+
+            if json_info:
+                page_store_cache.set(key, json_info)
+
+        if _has_summary_modules(json_info, page):
+            return json_info
+
+    url = _summary_page_url(ticker, page)
+    json_info = page_store_cache.get(url)
+
+    instrument.emit("cache", name = "page_store", hit = json_info is not None)
+
+    if json_info is not None:
+        return json_info
+
+    resp = await get_client().get(url, headers = {'User-agent': 'Mozilla/5.0'})
+
+    json_info = _parse_page_store(resp.text)
+
+    if isinstance(json_info, dict):
+        page_store_cache.set(url, json_info)
+
+    return json_info
+
+
+@instrumented
+async def aget_financials(ticker, yearly = True, quarterly = True, backend = None):
+
+    '''Async version of stock_info.get_financials
+
+       @param: ticker
+       @param: yearly = True
+       @param: quarterly = True
+       @param: backend = None, "api" or "scrape" (see stock_info.set_summary_backend)
+    '''
+
+    if not yearly and not quarterly:
+        raise AssertionError("yearly or quarterly must be True")
+
+    json_info = await _aget_quote_summary(ticker, "financials", backend)
+
+    return _parse_financials(json_info, yearly, quarterly)
+
+
+@instrumented
+async def aget_company_info(ticker, backend = None):
+
+    '''Async version of stock_info.get_company_info
+
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see stock_info.set_summary_backend)
+    '''
+
+    json_info = await _aget_quote_summary(ticker, "profile", backend)
+
+    return _parse_company_info(json_info)
+
+
+@instrumented
+async def aget_company_officers(ticker, backend = None):
+
+    '''Async version of stock_info.get_company_officers
+
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see stock_info.set_summary_backend)
+    '''
+
+    json_info = await _aget_quote_summary(ticker, "profile", backend)
+
+    return _parse_company_officers(json_info)
+
+
+@instrumented
+async def aget_options_chain(ticker, date = None, raw = True,
+                             headers = {'User-agent': 'Mozilla/5.0'}):
+
+    '''Async version of options.get_options_chain
+
+       @param: ticker
+       @param: date = None
+       @param: raw = True
+    '''
+
+    site = build_options_url(ticker, date)
+
+    resp = await get_client().get(site, headers = headers)
+
+    with instrument.phase("read_html"):
+        tables = read_tables(resp.text, _chain_tables)
+
+    with instrument.phase("frame"):
+        return _parse_options_chain(tables, raw)
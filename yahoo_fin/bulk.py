@@ -0,0 +1,182 @@
+'''Resumable bulk download of price history for a whole ticker universe.
+
+Each ticker is written to its own file as soon as it arrives, and a
+manifest.json in the output directory records which tickers are done and
+which failed.  Running the same download again skips the finished tickers
+and retries the rest, so an interrupted run picks up where it stopped.
+'''
+
+import json
+import os
+import re
+import threading
+
+from . import client
+from .client import default_headers
+from .instrument import instrumented
+from . import stock_info
+
+
+universes = {"sp500": stock_info.tickers_sp500,
+             "nasdaq": stock_info.tickers_nasdaq,
+             "other": stock_info.tickers_other,
+             "dow": stock_info.tickers_dow,
+             "ibovespa": stock_info.tickers_ibovespa,
+             "nifty50": stock_info.tickers_nifty50,
+             "niftybank": stock_info.tickers_niftybank,
+             "ftse100": stock_info.tickers_ftse100,
+             "ftse250": stock_info.tickers_ftse250}
+
+formats = ("csv", "parquet", "feather")
+
+manifest_name = "manifest.json"
+
+
+def resolve_universe(universe):
+
+    '''Returns the list of tickers for a universe name (a key of universes)
+       or an iterable of tickers'''
+
+    if isinstance(universe, str):
+
+        if universe.lower() not in universes:
+            raise AssertionError("universe must be a list of tickers or one of " +
+                                 ", ".join("'%s'" % name for name in universes))
+
+        return universes[universe.lower()]()
+
+    return list(universe)
+
+
+def _partition_path(out_dir, ticker, format):
+
+    file_name = re.sub(r"[^A-Za-z0-9.=^-]", "_", ticker.upper()) + "." + format
+
+    return os.path.join(out_dir, file_name)
+
+
+def _write_partition(frame, path, format):
+
+    if format == "csv":
+        frame.to_csv(path + ".tmp", index = False)
+    elif format == "parquet":
+        frame.to_parquet(path + ".tmp", index = False)
+    else:
+        frame.to_feather(path + ".tmp")
+
+    os.replace(path + ".tmp", path)
+
+
+def load_manifest(out_dir):
+
+    '''Returns the manifest of a download directory, or None if there is none'''
+
+    path = os.path.join(out_dir, manifest_name)
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(out_dir, manifest):
+
+    path = os.path.join(out_dir, manifest_name)
+
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent = 1, sort_keys = True)
+
+    os.replace(path + ".tmp", path)
+
+
+@instrumented
+def download_universe(universe, start_date = None, end_date = None, interval = "1d",
+                      out_dir = "yahoo_fin_data", workers = 8, format = "csv",
+                      resume = True, headers = default_headers):
+
+    '''Downloads historical price data for every ticker in a universe into
+       one file per ticker in out_dir.  Returns a (paths, errors) tuple:
+       paths maps each downloaded ticker to its file and errors maps each
+       ticker that failed in this run to the exception it raised.
+
+       @param: universe, a name such as "sp500" or "nasdaq", or a list of tickers
+       @param: start_date = None
+       @param: end_date = None
+       @param: interval = "1d"
+       @param: out_dir = "yahoo_fin_data"
+       @param: workers = 8
+       @param: format = "csv", or "parquet" / "feather" (both need pyarrow)
+       @param: resume = True, skip the tickers a previous run already finished
+    '''
+
+    if interval not in ("1d", "1wk", "1mo", "1m"):
+        raise AssertionError("interval must be of of '1d', '1wk', '1mo', or '1m'")
+
+    if format not in formats:
+        raise AssertionError("format must be one of 'csv', 'parquet' or 'feather'")
+
+    tickers = [ticker.upper() for ticker in resolve_universe(universe) if ticker]
+
+    os.makedirs(out_dir, exist_ok = True)
+
+    params = {"start_date": None if start_date is None else str(start_date),
+              "end_date": None if end_date is None else str(end_date),
+              "interval": interval,
+              "format": format}
+
+    manifest = load_manifest(out_dir) if resume else None
+
+    if manifest is not None and manifest["params"] != params:
+        raise AssertionError("""%s holds a download with different parameters.  Use
+                             another out_dir or pass resume = False.""" % out_dir)
+
+    if manifest is None:
+        manifest = {"params": params, "done": {}, "failed": {}}
+
+    manifest["tickers"] = tickers
+
+    paths = {ticker: path for ticker, path in manifest["done"].items()
+             if os.path.exists(os.path.join(out_dir, path))}
+
+    manifest["done"] = dict(paths)
+
+    pending = [ticker for ticker in tickers if ticker not in paths]
+
+    _save_manifest(out_dir, manifest)
+
+    lock = threading.Lock()
+
+    def fetch(ticker):
+
+        try:
+            frame = stock_info.get_data(ticker, start_date = start_date,
+                                        end_date = end_date, index_as_date = False,
+                                        interval = interval, headers = headers)
+
+            path = _partition_path(out_dir, ticker, format)
+            _write_partition(frame, path, format)
+
+        except Exception as e:
+
+            with lock:
+                manifest["failed"][ticker] = repr(e)
+                _save_manifest(out_dir, manifest)
+
+            raise
+
+        with lock:
+            manifest["done"][ticker] = os.path.basename(path)
+            manifest["failed"].pop(ticker, None)
+            _save_manifest(out_dir, manifest)
+
+        return path
+
+    results, errors = client.map_concurrent(fetch, pending, workers)
+
+    paths = {ticker: os.path.join(out_dir, path) for ticker, path in paths.items()}
+    paths.update(results)
+
+    paths = {ticker: paths[ticker] for ticker in tickers if ticker in paths}
+
+    return paths, errors
@@ -0,0 +1,604 @@
+import copy
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class PriceCache(object):
+
+    '''On-disk store of price history frames keyed by (ticker, interval).
+       Each series is kept in a columnar file (Parquet or Feather, both need
+       pyarrow) next to a small JSON file recording the earliest date the
+       stored history covers.
+
+       @param: directory
+       @param: format = "parquet", or "feather"
+    '''
+
+    def __init__(self, directory, format = "parquet"):
+
+        if format not in ("parquet", "feather"):
+            raise AssertionError("format must be one of 'parquet' or 'feather'")
+
+        os.makedirs(directory, exist_ok = True)
+
+        self.directory = directory
+        self.format = format
+
+
+    def _name(self, ticker):
+
+        return re.sub(r"[^A-Z0-9.=-]", "_", ticker.upper())
+
+
+    def _path(self, ticker, interval, ext):
+
+        file_name = "%s_%s.%s" % (self._name(ticker), interval, ext)
+
+        return os.path.join(self.directory, file_name)
+
+
+    def load(self, ticker, interval):
+
+        '''Returns (frame, covered_from) for the stored series, or (None, None)
+           if nothing is cached yet'''
+
+        data_path = self._path(ticker, interval, self.format)
+        meta_path = self._path(ticker, interval, "json")
+
+        if not os.path.exists(data_path) or not os.path.exists(meta_path):
+            return None, None
+
+        if self.format == "parquet":
+            frame = pd.read_parquet(data_path)
+        else:
+            frame = pd.read_feather(data_path)
+
+        frame = frame.set_index("date")
+        frame.index.name = None
+
+        with open(meta_path) as f:
+            covered_from = pd.Timestamp(json.load(f)["covered_from"])
+
+        return frame, covered_from
+
+
+    def save(self, ticker, interval, frame, covered_from):
+
+        '''Atomically replaces the stored series for (ticker, interval)'''
+
+        data_path = self._path(ticker, interval, self.format)
+        meta_path = self._path(ticker, interval, "json")
+
+        out = frame.rename_axis("date").reset_index()
+
+        if self.format == "parquet":
+            out.to_parquet(data_path + ".tmp")
+        else:
+            out.to_feather(data_path + ".tmp")
+
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"covered_from": pd.Timestamp(covered_from).isoformat()}, f)
+
+        os.replace(data_path + ".tmp", data_path)
+        os.replace(meta_path + ".tmp", meta_path)
+
+
+    def clear(self, ticker = None, interval = None):
+
+        '''Deletes stored series, optionally only for one ticker and / or interval'''
+
+        for file_name in os.listdir(self.directory):
+
+            path = os.path.join(self.directory, file_name)
+            stem, ext = os.path.splitext(file_name)
+
+            if ext not in (".parquet", ".feather", ".json"):
+                continue
+
+            name, _, stored_interval = stem.rpartition("_")
+
+            if ticker is not None and name != self._name(ticker):
+                continue
+
+            if interval is not None and stored_interval != interval:
+                continue
+
+            os.remove(path)
+
+
+_price_cache = None
+
+
+def enable_price_cache(directory, format = "parquet"):
+
+    '''Turns on the price history cache for every get_data call
+
+       @param: directory
+       @param: format = "parquet"
+    '''
+
+    global _price_cache
+
+    _price_cache = PriceCache(directory, format)
+
+    return _price_cache
+
+
+def disable_price_cache():
+
+    global _price_cache
+
+    _price_cache = None
+
+
+def get_price_cache(cache = None):
+
+    '''Resolves the cache argument of get_data: None uses the globally enabled
+       cache (if any), False disables caching for the call, and a directory
+       or PriceCache is used as given'''
+
+    if cache is None:
+        return _price_cache
+
+    if cache is False:
+        return None
+
+    if isinstance(cache, PriceCache):
+        return cache
+
+    return PriceCache(cache)
+
+
+class TTLCache(object):
+
+    '''Thread-safe in-memory LRU cache whose entries expire ttl seconds
+       after they were stored.
+
+       @param: maxsize = 128
+       @param: ttl = 300, in seconds; 0 disables the cache
+    '''
+
+    def __init__(self, maxsize = 128, ttl = 300):
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key, default = None):
+
+        with self._lock:
+
+            if key not in self._data:
+                return default
+
+            expires, value = self._data[key]
+
+            if time.monotonic() >= expires:
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+
+            return value
+
+
+    def set(self, key, value):
+
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last = False)
+
+
+    def clear(self):
+
+        with self._lock:
+            self._data.clear()
+
+
+    def __len__(self):
+
+        return len(self._data)
+
+
+# decrypted QuoteSummaryStore objects of the quote pages, keyed by page URL
+page_store_cache = TTLCache(maxsize = 256, ttl = 300)
+
+
+def configure_page_cache(maxsize = 256, ttl = 300):
+
+    '''Resizes the in-memory cache of decrypted quote page data shared by
+       the financials, earnings and company profile functions
+
+       @param: maxsize = 256
+       @param: ttl = 300, in seconds; 0 disables the cache
+    '''
+
+    with page_store_cache._lock:
+        page_store_cache.maxsize = maxsize
+        page_store_cache.ttl = ttl
+        page_store_cache._data.clear()
+
+
+# chart endpoint responses keyed by (ticker, start, end, interval), so that
+# get_data, get_dividends, get_splits and get_chart calls for the same range
+# can share one download; off (ttl = 0) unless enable_chart_cache is called
+chart_cache = TTLCache(maxsize = 64, ttl = 0)
+
+
+def enable_chart_cache(ttl = 60, maxsize = 64):
+
+    '''Keeps chart endpoint responses in memory for ttl seconds, so that
+       get_data, get_dividends, get_splits and get_chart calls for the same
+       range share one download.  While an entry is fresh, calls without an
+       end date return the data as of the first download, so leave the cache
+       off when polling get_data for new bars.
+
+       @param: ttl = 60, in seconds
+       @param: maxsize = 64
+    '''
+
+    with chart_cache._lock:
+        chart_cache.maxsize = maxsize
+        chart_cache.ttl = ttl
+        chart_cache._data.clear()
+
+
+def disable_chart_cache():
+
+    with chart_cache._lock:
+        chart_cache.ttl = 0
+        chart_cache._data.clear()
+
+
+class DiskCache(object):
+
+    '''Pickled objects stored on disk by key, optionally expiring ttl
+       seconds after they were written.
+
+       @param: directory
+       @param: ttl = None, in seconds; None keeps entries forever
+    '''
+
+    def __init__(self, directory, ttl = None):
+
+        os.makedirs(directory, exist_ok = True)
+
+        self.directory = directory
+        self.ttl = ttl
+
+
+    def _path(self, key):
+
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9.=_-]", "_", key) + ".pkl")
+
+
+    def get(self, key, default = None, ttl = None):
+
+        '''Returns the stored value, or default if it is missing or older
+           than ttl (which defaults to the cache's own ttl)'''
+
+        path = self._path(key)
+        ttl = self.ttl if ttl is None else ttl
+
+        try:
+            if ttl is not None and time.time() - os.path.getmtime(path) >= ttl:
+                return default
+
+            with open(path, "rb") as f:
+                return pickle.load(f)
+
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+
+
+    def set(self, key, value):
+
+        path = self._path(key)
+
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(value, f)
+
+        os.replace(path + ".tmp", path)
+
+
+    def delete(self, key):
+
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+    def clear(self):
+
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".pkl"):
+                os.remove(os.path.join(self.directory, file_name))
+
+
+_earnings_cache = None
+
+
+def enable_earnings_cache(directory):
+
+    '''Keeps the earnings calendar of past dates on disk, so that
+       get_earnings_in_date_range only downloads dates it has not seen or
+       that are not over yet
+
+       @param: directory
+    '''
+
+    global _earnings_cache
+
+    _earnings_cache = DiskCache(directory)
+
+    return _earnings_cache
+
+
+def disable_earnings_cache():
+
+    global _earnings_cache
+
+    _earnings_cache = None
+
+
+def get_earnings_cache(cache = None):
+
+    '''Resolves the cache argument of get_earnings_in_date_range the same
+       way get_price_cache does'''
+
+    if cache is None:
+        return _earnings_cache
+
+    if cache is False:
+        return None
+
+    if isinstance(cache, DiskCache):
+        return cache
+
+    return DiskCache(cache)
+
+
+_tickers_cache = None
+
+
+def enable_tickers_cache(directory, ttl = 86400):
+
+    '''Keeps the index constituent lists returned by the tickers_* functions
+       on disk for ttl seconds (a day by default).  Pass refresh = True to a
+       tickers_* function to force a new download.
+
+       @param: directory
+       @param: ttl = 86400
+    '''
+
+    global _tickers_cache
+
+    _tickers_cache = DiskCache(directory, ttl)
+
+    return _tickers_cache
+
+
+def disable_tickers_cache():
+
+    global _tickers_cache
+
+    _tickers_cache = None
+
+
+def get_tickers_cache():
+
+    return _tickers_cache
+
+
+class MemoryHTTPCache(object):
+
+    '''In-memory store of HTTP validators (ETag / Last-Modified) and the
+       parsed objects they belong to, evicting the least recently used
+       entries once the responses they came from add up to max_bytes.
+
+       @param: max_bytes = 64 MB
+    '''
+
+    def __init__(self, max_bytes = 64 * 2 ** 20):
+
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key):
+
+        with self._lock:
+
+            if key not in self._data:
+                return None
+
+            self._data.move_to_end(key)
+            size, entry = self._data[key]
+
+        # hand out a copy, since callers may modify the parsed object
+        return copy.deepcopy(entry)
+
+
+    def set(self, key, entry, size):
+
+        if size > self.max_bytes:
+            return
+
+        entry = copy.deepcopy(entry)
+
+        with self._lock:
+
+            if key in self._data:
+                self.size -= self._data.pop(key)[0]
+
+            self._data[key] = (size, entry)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                self.size -= self._data.popitem(last = False)[1][0]
+
+
+    def clear(self):
+
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+
+    def __len__(self):
+
+        return len(self._data)
+
+
+class DiskHTTPCache(object):
+
+    '''On-disk version of MemoryHTTPCache.  Entries are pickled one per
+       file and the least recently used files are deleted once the directory
+       grows past max_bytes.
+
+       @param: directory
+       @param: max_bytes = 512 MB
+    '''
+
+    def __init__(self, directory, max_bytes = 512 * 2 ** 20):
+
+        os.makedirs(directory, exist_ok = True)
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+
+    def _path(self, key):
+
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+        return os.path.join(self.directory, digest + ".pkl")
+
+
+    def get(self, key):
+
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as f:
+                stored_key, entry = pickle.load(f)
+
+            # the modification time doubles as the last access time
+            os.utime(path)
+
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        return entry if stored_key == key else None
+
+
+    def set(self, key, entry, size):
+
+        path = self._path(key)
+
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump((key, entry), f)
+
+        os.replace(path + ".tmp", path)
+
+        self._evict()
+
+
+    def _evict(self):
+
+        with self._lock:
+
+            files = []
+
+            for file_name in os.listdir(self.directory):
+
+                if not file_name.endswith(".pkl"):
+                    continue
+
+                path = os.path.join(self.directory, file_name)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+
+            for _, size, path in sorted(files):
+
+                if total <= self.max_bytes:
+                    break
+
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+                total -= size
+
+
+    def clear(self):
+
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(".pkl"):
+                os.remove(os.path.join(self.directory, file_name))
+
+
+_http_cache = None
+
+
+def enable_http_cache(directory = None, max_bytes = None):
+
+    '''Turns on conditional requests for the pages and feeds yahoo_fin
+       parses (constituent lists, quote / statistics pages, news feeds).
+       Responses carrying an ETag or Last-Modified header are kept with
+       their parsed result; later calls send If-None-Match /
+       If-Modified-Since and reuse the parsed result on a 304.
+
+       @param: directory = None, keeps entries in memory if None
+       @param: max_bytes = None, 64 MB in memory or 512 MB on disk
+    '''
+
+    global _http_cache
+
+    if directory is None:
+        _http_cache = MemoryHTTPCache(max_bytes or 64 * 2 ** 20)
+    else:
+        _http_cache = DiskHTTPCache(directory, max_bytes or 512 * 2 ** 20)
+
+    return _http_cache
+
+
+def disable_http_cache():
+
+    global _http_cache
+
+    _http_cache = None
+
+
+def get_http_cache():
+
+    return _http_cache
@@ -0,0 +1,293 @@
+import contextvars
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import instrument, ratelimit, tables
+from .cache import get_http_cache
+from .singleflight import SingleFlight, request_key
+
+
+default_headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.95 Safari/537.36'}
+
+# (connect, read) timeouts in seconds
+default_timeout = (5, 30)
+
+
+def _accept_encoding():
+
+    '''Advertise brotli only when urllib3 is able to decode it'''
+
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+
+    return "gzip, deflate, br"
+
+
+class YahooClient(object):
+
+    '''Keep-alive HTTP client shared by every network call in yahoo_fin.
+       Requests go through the process-wide rate limiter (see
+       yahoo_fin.ratelimit), which also retries 429 and 5xx responses.
+
+       @param: session = None, an existing requests.Session to route calls through
+       @param: headers = None, extra headers sent with every request
+       @param: timeout = default_timeout
+       @param: pool_connections = 10, number of hosts kept in the pool
+       @param: pool_maxsize = 32, connections kept open per host
+       @param: coalesce = True, identical requests sent while one is still in
+               flight wait for it and share its response
+    '''
+
+    def __init__(self, session = None, headers = None, timeout = default_timeout,
+                 pool_connections = 10, pool_maxsize = 32, coalesce = True):
+
+        if session is None:
+            session = requests.Session()
+
+            adapter = HTTPAdapter(pool_connections = pool_connections,
+                                  pool_maxsize = pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            session.headers.update(default_headers)
+            session.headers["Accept-Encoding"] = _accept_encoding()
+
+        if headers is not None:
+            session.headers.update(headers)
+
+        self.session = session
+        self.timeout = timeout
+        self.flight = SingleFlight() if coalesce else None
+
+
+    def get(self, url, params = None, headers = None, **kwargs):
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        def request():
+
+            start = time.perf_counter()
+            resp = self.session.get(url, params = params, headers = headers, **kwargs)
+
+            if instrument.enabled():
+                instrument.emit("request", url = url, status = resp.status_code,
+                                bytes = len(resp.content),
+                                seconds = time.perf_counter() - start)
+
+            return resp
+
+        def send():
+            return ratelimit.send(request, url)
+
+        key = None if self.flight is None else request_key(url, params, headers, **kwargs)
+
+        if key is None:
+            return send()
+
+        return self.flight.do(key, send)[0]
+
+
+    def close(self):
+
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+
+    '''Returns the module-level client, creating it on first use'''
+
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = YahooClient()
+
+    return _client
+
+
+def set_client(client):
+
+    '''Replaces the module-level client used by every yahoo_fin function
+
+       @param: client, a YahooClient (or any object with a compatible get method)
+    '''
+
+    global _client
+
+    with _client_lock:
+        old, _client = _client, client
+
+    if old is not None and old is not client:
+        old.close()
+
+    return client
+
+
+def set_session(session, **kwargs):
+
+    '''Routes every yahoo_fin request through a user supplied requests.Session
+
+       @param: session
+    '''
+
+    return set_client(YahooClient(session = session, **kwargs))
+
+
+def configure(**kwargs):
+
+    '''Rebuilds the module-level client with new settings, e.g.
+       configure(timeout = 10, pool_maxsize = 64, headers = {...})'''
+
+    return set_client(YahooClient(**kwargs))
+
+
+def get(url, params = None, headers = None, **kwargs):
+
+    '''Sends a GET request through the module-level client'''
+
+    return get_client().get(url, params = params, headers = headers, **kwargs)
+
+
+def get_parsed(url, parse, params = None, headers = None, key = None, **kwargs):
+
+    '''Downloads url and returns parse(response).  If the HTTP cache is
+       enabled (see yahoo_fin.cache.enable_http_cache), a stored result is
+       revalidated with If-None-Match / If-Modified-Since and returned as is
+       when the server answers 304 Not Modified.
+
+       @param: url
+       @param: parse, a function of the response
+       @param: params = None
+       @param: headers = None
+       @param: key = None, identifies the parsed result; defaults to the URL
+               and params, so pass one if parse depends on anything else
+    '''
+
+    http_cache = get_http_cache()
+
+    if http_cache is None:
+        return parse(get(url, params = params, headers = headers, **kwargs))
+
+    if key is None:
+        key = request_key(url, params)
+
+    entry = http_cache.get(key)
+
+    if entry is not None:
+
+        headers = dict(headers or {})
+
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = get(url, params = params, headers = headers, **kwargs)
+
+    hit = resp.status_code == 304 and entry is not None
+
+    instrument.emit("cache", name = "http", hit = hit)
+
+    if hit:
+        return entry["value"]
+
+    value = parse(resp)
+
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+
+    if resp.ok and (etag or last_modified):
+        http_cache.set(key, {"etag": etag, "last_modified": last_modified,
+                             "value": value}, len(resp.content))
+
+    return value
+
+
+def read_html(url, headers = None, **kwargs):
+
+    '''Downloads url through the module-level client and parses its tables
+       with pandas.read_html'''
+
+    def parse(resp):
+        with instrument.phase("read_html"):
+            return pd.read_html(io.StringIO(resp.text), **kwargs)
+
+    return get_parsed(url, parse, headers = headers,
+                      key = request_key(url, None, None, **kwargs))
+
+
+def read_tables(url, select = None, headers = None):
+
+    '''Downloads url through the module-level client and converts only the
+       tables chosen by select into data frames (see tables.read_tables).
+       Use a module-level function for select, since its name is part of
+       the HTTP cache key.'''
+
+    def parse(resp):
+        with instrument.phase("read_html"):
+            return tables.read_tables(resp.text, select)
+
+    name = None if select is None else select.__module__ + "." + select.__qualname__
+
+    return get_parsed(url, parse, headers = headers,
+                      key = request_key(url, None, None, select = name))
+
+
+def map_concurrent(func, items, max_workers = 8):
+
+    '''Calls func on every item using a bounded thread pool.  Returns a
+       (results, errors) tuple of dictionaries keyed by item: results holds
+       the return values of the calls that succeeded (in input order) and
+       errors holds the exception raised by each call that failed.
+
+       @param: func
+       @param: items, hashable inputs; duplicates are only fetched once
+       @param: max_workers = 8
+    '''
+
+    items = list(dict.fromkeys(items))
+
+    results = {}
+    errors = {}
+
+    if not items:
+        return results, errors
+
+    workers = max(1, min(max_workers, len(items)))
+
+    with ThreadPoolExecutor(max_workers = workers) as pool:
+
+        # run each call in a copy of the caller's context, so instrumentation
+        # events from the workers are attributed to the calling function
+        futures = {pool.submit(contextvars.copy_context().run, func, item): item
+                   for item in items}
+
+        for future in as_completed(futures):
+
+            item = futures[future]
+
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                errors[item] = e
+
+    results = {item: results[item] for item in items if item in results}
+
+    return results, errors
@@ -0,0 +1,241 @@
+'''Instrumentation hooks.
+
+Observers are callables that receive one dictionary per event.  Every event
+has a "kind" and the name of the innermost yahoo_fin "function" it happened
+in; the other keys depend on the kind:
+
+    call      a public function returned (a generator finished or was
+              closed): seconds, error (None on success)
+    phase     one step of a function: name ("read_html", "split" of the
+              root.App.main script, "json", "decrypt", "frame"), seconds
+    request   one HTTP round trip: url, status, bytes, seconds
+    retry     a 429 / 5xx response that will be retried: url, status,
+              attempt, delay
+    cache     a cache lookup: name ("page_store", "chart", "http", "price",
+              "tickers", "earnings", "singleflight"), hit
+
+Nothing is registered by default, and with no observers every hook returns
+right away, so instrumentation costs next to nothing unless it is used.
+
+    from yahoo_fin import instrument
+    instrument.add_observer(print)
+'''
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import time
+
+
+_observers = []
+
+_function = contextvars.ContextVar("yahoo_fin_function", default = None)
+
+
+def add_observer(observer):
+
+    '''Registers observer, a callable taking one event dictionary'''
+
+    global _observers
+
+    # copy on write, so emit never needs a lock
+    _observers = _observers + [observer]
+
+    return observer
+
+
+def remove_observer(observer):
+
+    global _observers
+
+    _observers = [obs for obs in _observers if obs is not observer]
+
+
+def clear_observers():
+
+    global _observers
+
+    _observers = []
+
+
+def enabled():
+
+    return bool(_observers)
+
+
+def emit(kind, **fields):
+
+    '''Sends an event to every observer.  Exceptions raised by observers
+       are swallowed so they can never break a download.'''
+
+    observers = _observers
+
+    if not observers:
+        return
+
+    fields["kind"] = kind
+    fields["function"] = _function.get()
+
+    for observer in observers:
+        try:
+            observer(fields)
+        except Exception:
+            pass
+
+
+@contextlib.contextmanager
+def _timed_phase(name, fields):
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        emit("phase", name = name, seconds = time.perf_counter() - start, **fields)
+
+
+def phase(name, **fields):
+
+    '''Context manager timing one step of a function as a "phase" event'''
+
+    if not _observers:
+        return contextlib.nullcontext()
+
+    return _timed_phase(name, fields)
+
+
+def _emit_call(name, start, error):
+
+    token = _function.set(name)
+
+    try:
+        emit("call", seconds = time.perf_counter() - start, error = error)
+    finally:
+        _function.reset(token)
+
+
+def instrumented(func):
+
+    '''Decorator emitting a "call" event for func and tagging the events
+       emitted while it runs with its name.  For generators the events of
+       every step are tagged, and the call event is sent once the generator
+       is exhausted, closed or fails.'''
+
+    name = func.__module__.rpartition(".")[2] + "." + func.__name__
+
+    if inspect.isgeneratorfunction(func):
+
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+
+            start = time.perf_counter()
+            error = None
+            gen = func(*args, **kwargs)
+
+            try:
+                while True:
+
+                    # the caller may switch contexts between steps, so the
+                    # name is set for each step rather than held across yields
+                    token = _function.set(name)
+
+                    try:
+                        item = next(gen)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        _function.reset(token)
+
+                    yield item
+
+            except GeneratorExit:
+                raise
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                gen.close()
+                if _observers:
+                    _emit_call(name, start, error)
+
+        return generator_wrapper
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def async_generator_wrapper(*args, **kwargs):
+
+            start = time.perf_counter()
+            error = None
+            agen = func(*args, **kwargs)
+
+            try:
+                while True:
+
+                    token = _function.set(name)
+
+                    try:
+                        item = await agen.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        _function.reset(token)
+
+                    yield item
+
+            except GeneratorExit:
+                raise
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                await agen.aclose()
+                if _observers:
+                    _emit_call(name, start, error)
+
+        return async_generator_wrapper
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+
+            if not _observers:
+                return await func(*args, **kwargs)
+
+            token = _function.set(name)
+            start = time.perf_counter()
+            error = None
+
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                emit("call", seconds = time.perf_counter() - start, error = error)
+                _function.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        if not _observers:
+            return func(*args, **kwargs)
+
+        token = _function.set(name)
+        start = time.perf_counter()
+        error = None
+
+        try:
+            return func(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            emit("call", seconds = time.perf_counter() - start, error = error)
+            _function.reset(token)
+
+    return wrapper
@@ -1,10 +1,16 @@
 
-import feedparser
+from . import client
+from .instrument import instrumented
 
 yf_rss_url = 'https://feeds.finance.yahoo.com/rss/2.0/headline?s=%s&region=US&lang=en-US'
 
+@instrumented
 def get_yf_rss(ticker):
     
-    feed = feedparser.parse(yf_rss_url % ticker)
+    # imported on first use to keep `import yahoo_fin` fast
+    import feedparser
+    
+    feed = client.get_parsed(yf_rss_url % ticker,
+                             lambda resp: feedparser.parse(resp.content))
     
     return feed.entries
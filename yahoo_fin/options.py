@@ -1,128 +1,406 @@
-
-
-import pandas as pd
-import numpy as np
-import requests
-
-try:
-    from requests_html import HTMLSession
-except Exception:
-    pass
-
-
-def force_float(elt):
-    
-    try:
-        return float(elt)
-    except:
-        return elt
-
-def build_options_url(ticker, date = None):
-    
-    """Constructs the URL pointing to options chain"""
-       
-    url = "https://finance.yahoo.com/quote/" + ticker + "/options?p=" + ticker
-
-    if date is not None:
-        url = url + "&date=" + str(int(pd.Timestamp(date).timestamp()))
-
-    return url
-
-def get_options_chain(ticker, date = None, raw = True, headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    """Extracts call / put option tables for input ticker and expiration date.  If
-       no date is input, the default result will be the earliest expiring
-       option chain from the current date.
-    
-       @param: ticker
-       @param: date"""    
-    
-    site = build_options_url(ticker, date)
-    
-    tables = pd.read_html(requests.get(site, headers=headers).text)
-    
-    if len(tables) == 1:
-        calls = tables[0].copy()
-        puts = pd.DataFrame(columns = calls.columns)
-    else:
-        calls = tables[0].copy()
-        puts = tables[1].copy()
-    
-    if not raw:
-        calls["% Change"] = calls["% Change"].str.strip("%").map(force_float)
-        calls["% Change"] = calls["% Change"].map(lambda num: num / 100 if isinstance(num, float) else 0)
-        calls["Volume"] = calls["Volume"].str.replace("-", "0").map(force_float)
-        calls["Open Interest"] = calls["Open Interest"].str.replace("-", "0").map(force_float)
-        
-        
-        puts["% Change"] = puts["% Change"].str.strip("%").map(force_float)
-        puts["% Change"] = puts["% Change"].map(lambda num: num / 100 if isinstance(num, float) else 0)
-        puts["Volume"] =puts["Volume"].str.replace("-", "0").map(force_float)
-        puts["Open Interest"] = puts["Open Interest"].str.replace("-", "0").map(force_float)
-        
-    
-    
-    return {"calls": calls, "puts":puts}    
-    
-    
-def get_calls(ticker, date = None):
-
-    """Extracts call option table for input ticker and expiration date
-    
-       @param: ticker
-       @param: date"""
-       
-    options_chain = get_options_chain(ticker, date)
-    
-    return options_chain["calls"]
-    
-    
-
-def get_puts(ticker, date = None):
-
-    """Extracts put option table for input ticker and expiration date
-    
-       @param: ticker
-       @param: date"""
-    
-    options_chain = get_options_chain(ticker, date)
-    
-    return options_chain["puts"]    
-
-    
-def get_expiration_dates(ticker):
-
-    """Scrapes the expiration dates from each option chain for input ticker
-    
-       @param: ticker"""
-    
-    site = build_options_url(ticker)
-    
-    session = HTMLSession()
-    resp = session.get(site)
-    
-    html = resp.html.raw_html.decode()
-    
-    splits = html.split("</option>")
-    
-    dates = [elt[elt.rfind(">"):].strip(">") for elt in splits]
-    
-    dates = [elt for elt in dates if elt != '']
-    
-    session.close()
-    
-    return dates
-    
-
-
-
-    
-    
-    
-    
-    
-    
-    
-    
-
-    
+
+
+import warnings
+
+import pandas as pd
+import numpy as np
+
+from . import client, instrument
+from .instrument import instrumented
+from .tables import read_tables
+# force_float is re-exported for code that imported it from here
+from .stock_info import force_float, get_live_price, _parse_numeric
+
+
+def build_options_url(ticker, date = None):
+    
+    """Constructs the URL pointing to options chain"""
+       
+    url = "https://finance.yahoo.com/quote/" + ticker + "/options?p=" + ticker
+
+    if date is not None:
+        url = url + "&date=" + str(int(pd.Timestamp(date).timestamp()))
+
+    return url
+
+@instrumented
+def get_options_chain(ticker, date = None, raw = True, headers = {'User-agent': 'Mozilla/5.0'},
+                      greeks = False, spot = None, rate = 0.0, dividend_yield = 0.0):
+    
+    """Extracts call / put option tables for input ticker and expiration date.  If
+       no date is input, the default result will be the earliest expiring
+       option chain from the current date.
+       
+       With greeks = True the tables are cleaned as with raw = False and get
+       Mid, IV, Delta, Gamma, Vega and Theta columns (see add_greeks).  spot
+       defaults to the live price of ticker.
+    
+       @param: ticker
+       @param: date
+       @param: raw = True
+       @param: greeks = False
+       @param: spot = None
+       @param: rate = 0.0, continuously compounded risk-free rate
+       @param: dividend_yield = 0.0"""    
+    
+    site = build_options_url(ticker, date)
+    
+    html = client.get(site, headers = headers).text
+    
+    with instrument.phase("read_html"):
+        tables = read_tables(html, _chain_tables)
+    
+    with instrument.phase("frame"):
+        chain = _parse_options_chain(tables, raw and not greeks)
+    
+    if greeks:
+        
+        if date is None:
+            date = _parse_expiration_dates(html)[0]
+        
+        if spot is None:
+            spot = get_live_price(ticker)
+            
+        for option_type in ("calls", "puts"):
+            chain[option_type] = add_greeks(chain[option_type], spot, rate, dividend_yield,
+                                            option_type = option_type[:-1],
+                                            expiration = date)
+    
+    return chain
+
+
+def _chain_tables(tables):
+    
+    """The calls and puts tables of an options page"""
+    
+    return tables[:2]
+
+
+def _parse_options_chain(tables, raw = True):
+    
+    """Splits the tables scraped from an options page into calls / puts"""
+    
+    if len(tables) == 1:
+        calls = tables[0].copy()
+        puts = pd.DataFrame(columns = calls.columns)
+    else:
+        calls = tables[0].copy()
+        puts = tables[1].copy()
+    
+    if not raw:
+        calls = _clean_chain(calls)
+        puts = _clean_chain(puts)
+    
+    return {"calls": calls, "puts":puts}    
+
+
+def _clean_chain(chain):
+    
+    """Converts every numeric column of a calls / puts table to floats"""
+    
+    chain = chain.copy()
+    
+    for column in ("Strike", "Last Price", "Bid", "Ask", "Change"):
+        if column in chain.columns:
+            chain[column] = _parse_numeric(chain[column])
+    
+    # no trades is shown as "-"
+    for column in ("Volume", "Open Interest"):
+        if column in chain.columns:
+            chain[column] = _parse_numeric(chain[column]).fillna(0)
+    
+    if "% Change" in chain.columns:
+        chain["% Change"] = (_parse_numeric(chain["% Change"]) / 100).fillna(0)
+    
+    if "Implied Volatility" in chain.columns:
+        chain["Implied Volatility"] = _parse_numeric(chain["Implied Volatility"]) / 100
+    
+    return chain
+
+
+def _norm_pdf(x):
+    
+    return np.exp(-0.5 * x ** 2) / np.sqrt(2 * np.pi)
+
+
+def _norm_cdf(x):
+    
+    """Standard normal CDF via the Abramowitz & Stegun 7.1.26 erf
+       approximation (absolute error below 1.5e-7)"""
+    
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 +
+           t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z ** 2)
+    
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def black_scholes(spot, strike, years, vol, rate = 0.0, dividend_yield = 0.0,
+                  is_call = True):
+    
+    """Vectorized Black-Scholes-Merton prices and greeks.  All inputs may be
+       NumPy arrays (broadcast together).  Returns a dictionary of arrays:
+       price, delta, gamma, vega (per 1 vol point, i.e. 0.01) and theta (per
+       calendar day)."""
+    
+    spot, strike, years, vol, is_call = np.broadcast_arrays(
+        np.asarray(spot, dtype = float), np.asarray(strike, dtype = float),
+        np.asarray(years, dtype = float), np.asarray(vol, dtype = float),
+        np.asarray(is_call, dtype = bool))
+    
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        
+        sqrt_t = np.sqrt(years)
+        d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * vol ** 2) * years) / (vol * sqrt_t)
+        d2 = d1 - vol * sqrt_t
+        
+        spot_disc = spot * np.exp(-dividend_yield * years)
+        strike_disc = strike * np.exp(-rate * years)
+        pdf_d1 = _norm_pdf(d1)
+        
+        call_price = spot_disc * _norm_cdf(d1) - strike_disc * _norm_cdf(d2)
+        put_price = strike_disc * _norm_cdf(-d2) - spot_disc * _norm_cdf(-d1)
+        
+        common_theta = -spot_disc * pdf_d1 * vol / (2 * sqrt_t)
+        call_theta = common_theta - rate * strike_disc * _norm_cdf(d2) + \
+                     dividend_yield * spot_disc * _norm_cdf(d1)
+        put_theta = common_theta + rate * strike_disc * _norm_cdf(-d2) - \
+                    dividend_yield * spot_disc * _norm_cdf(-d1)
+        
+        result = {"price": np.where(is_call, call_price, put_price),
+                  "delta": np.where(is_call, np.exp(-dividend_yield * years) * _norm_cdf(d1),
+                                    -np.exp(-dividend_yield * years) * _norm_cdf(-d1)),
+                  "gamma": np.exp(-dividend_yield * years) * pdf_d1 / (spot * vol * sqrt_t),
+                  "vega": spot_disc * pdf_d1 * sqrt_t / 100,
+                  "theta": np.where(is_call, call_theta, put_theta) / 365}
+    
+    return result
+
+
+def implied_volatility(price, spot, strike, years, rate = 0.0, dividend_yield = 0.0,
+                       is_call = True, low = 1e-4, high = 5.0, iterations = 60):
+    
+    """Vectorized implied volatility by bisection over [low, high].  Prices
+       outside the no-arbitrage bounds of that range give NaN."""
+    
+    price = np.asarray(price, dtype = float)
+    
+    args = (spot, strike, years)
+    kwargs = {"rate": rate, "dividend_yield": dividend_yield, "is_call": is_call}
+    
+    lo = np.full(np.broadcast(price, *args).shape, low)
+    hi = np.full_like(lo, high)
+    
+    valid = (black_scholes(*args, lo, **kwargs)["price"] <= price) & \
+            (black_scholes(*args, hi, **kwargs)["price"] >= price)
+    
+    for _ in range(iterations):
+        
+        mid = (lo + hi) / 2
+        too_high = black_scholes(*args, mid, **kwargs)["price"] > price
+        
+        hi = np.where(too_high, mid, hi)
+        lo = np.where(too_high, lo, mid)
+    
+    return np.where(valid, (lo + hi) / 2, np.nan)
+
+
+def add_greeks(chain, spot, rate = 0.0, dividend_yield = 0.0, option_type = None,
+               expiration = None, now = None):
+    
+    """Adds Mid, IV, Delta, Gamma, Vega and Theta columns to a cleaned options
+       table (raw = False) or surface in one batched NumPy pass.  Mid is the
+       bid / ask midpoint (last price when there is no two-sided quote) and IV
+       is re-derived from it.  The option type and expiration come from the
+       Type / Expiration columns if present, otherwise from option_type
+       ("call" / "put") and expiration.  Expiry is taken as 4pm New York time.
+    
+       @param: chain
+       @param: spot
+       @param: rate = 0.0
+       @param: dividend_yield = 0.0
+       @param: option_type = None
+       @param: expiration = None
+       @param: now = None, valuation time (defaults to the current time)"""
+    
+    chain = chain.copy()
+    
+    if now is None:
+        now = pd.Timestamp.now(tz = "UTC")
+    else:
+        now = pd.Timestamp(now)
+        now = now.tz_localize("UTC") if now.tz is None else now
+    
+    if "Expiration" in chain.columns:
+        expirations = pd.to_datetime(chain["Expiration"])
+    else:
+        expirations = pd.Series(pd.Timestamp(expiration), index = chain.index)
+    
+    expiry_times = expirations.dt.tz_localize("America/New_York") + pd.Timedelta(hours = 16)
+    years = (expiry_times - now).dt.total_seconds().to_numpy() / (365 * 86400)
+    years = np.where(years > 0, years, np.nan)
+    
+    if "Type" in chain.columns:
+        is_call = (chain["Type"] == "call").to_numpy()
+    else:
+        is_call = np.full(len(chain), option_type == "call")
+    
+    bid = _parse_numeric(chain["Bid"]).to_numpy()
+    ask = _parse_numeric(chain["Ask"]).to_numpy()
+    last = _parse_numeric(chain["Last Price"]).to_numpy()
+    strike = _parse_numeric(chain["Strike"]).to_numpy()
+    
+    mid = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, last)
+    
+    vol = implied_volatility(mid, spot, strike, years, rate, dividend_yield, is_call)
+    greeks = black_scholes(spot, strike, years, vol, rate, dividend_yield, is_call)
+    
+    chain["Mid"] = mid
+    chain["IV"] = vol
+    chain["Delta"] = greeks["delta"]
+    chain["Gamma"] = greeks["gamma"]
+    chain["Vega"] = greeks["vega"]
+    chain["Theta"] = greeks["theta"]
+    
+    return chain
+    
+    
+@instrumented
+def get_calls(ticker, date = None):
+
+    """Extracts call option table for input ticker and expiration date
+    
+       @param: ticker
+       @param: date"""
+       
+    options_chain = get_options_chain(ticker, date)
+    
+    return options_chain["calls"]
+    
+    
+
+@instrumented
+def get_puts(ticker, date = None):
+
+    """Extracts put option table for input ticker and expiration date
+    
+       @param: ticker
+       @param: date"""
+    
+    options_chain = get_options_chain(ticker, date)
+    
+    return options_chain["puts"]    
+
+    
+@instrumented
+def get_expiration_dates(ticker):
+
+    """Scrapes the expiration dates from each option chain for input ticker
+    
+       @param: ticker"""
+    
+    site = build_options_url(ticker)
+    
+    html = client.get(site).text
+    
+    return _parse_expiration_dates(html)
+
+
+def _parse_expiration_dates(html):
+    
+    splits = html.split("</option>")
+    
+    dates = [elt[elt.rfind(">"):].strip(">") for elt in splits]
+    
+    dates = [elt for elt in dates if elt != '']
+    
+    return dates
+
+
+@instrumented
+def get_options_surface(ticker, raw = True, max_workers = 8,
+                        headers = {'User-agent': 'Mozilla/5.0'}, greeks = False,
+                        spot = None, rate = 0.0, dividend_yield = 0.0):
+
+    """Downloads the option chains of every expiration date for input ticker
+       and returns them as one data frame, with Expiration and Type ("call" /
+       "put") columns in front of the chain columns.  The default options
+       page supplies both the list of expiration dates and the nearest chain;
+       the other expirations are fetched concurrently.
+    
+       With greeks = True the chains are cleaned as with raw = False and
+       greeks are computed over the whole surface at once (see add_greeks).
+    
+       @param: ticker
+       @param: raw = True
+       @param: max_workers = 8
+       @param: greeks = False
+       @param: spot = None, defaults to the live price of ticker
+       @param: rate = 0.0
+       @param: dividend_yield = 0.0"""
+    
+    site = build_options_url(ticker)
+    
+    html = client.get(site, headers = headers).text
+    
+    dates = _parse_expiration_dates(html)
+    
+    if not dates:
+        return pd.DataFrame()
+    
+    raw = raw and not greeks
+    
+    chains, errors = client.map_concurrent(
+        lambda date: get_options_chain(ticker, date, raw, headers), dates[1:],
+        max_workers)
+    
+    with instrument.phase("read_html"):
+        tables = read_tables(html, _chain_tables)
+    
+    chains[dates[0]] = _parse_options_chain(tables, raw)
+    
+    if errors:
+        warnings.warn("Could not get option chains for: " + ", ".join(errors))
+    
+    frames = []
+    
+    for date in dates:
+        
+        if date not in chains:
+            continue
+        
+        for option_type in ("calls", "puts"):
+            
+            frame = chains[date][option_type].copy()
+            
+            frame.insert(0, "Type", option_type[:-1])
+            frame.insert(0, "Expiration", pd.Timestamp(date))
+            
+            frames.append(frame)
+    
+    surface = pd.concat(frames, ignore_index = True)
+    
+    if greeks:
+        
+        if spot is None:
+            spot = get_live_price(ticker)
+            
+        surface = add_greeks(surface, spot, rate, dividend_yield)
+    
+    return surface
+    
+
+
+
+    
+    
+    
+    
+    
+    
+    
+    
+
+    
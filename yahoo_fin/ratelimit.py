@@ -0,0 +1,261 @@
+'''Process-wide request throttling shared by the sync and async clients.
+
+Every request first takes a token from a token bucket (which caps the
+request rate) and a slot from an adaptive concurrency limit.  The limit
+grows by about one slot per round of successful requests and is cut in half
+whenever Yahoo answers 429 (additive increase / multiplicative decrease), so
+large batches slow down instead of failing.  Responses with a 429 or 5xx
+status are retried with jittered exponential backoff, waiting at least as
+long as the server's Retry-After header asks for.
+
+The default limiter allows 10 requests per second; disable_rate_limit()
+sends requests straight away, without retries.
+'''
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+
+from . import instrument
+
+
+retry_statuses = (429, 500, 502, 503, 504)
+
+
+class RateLimiter(object):
+
+    '''Token bucket plus AIMD concurrency limit, safe to share between
+       threads and asyncio tasks.
+
+       @param: rate = 10, requests per second; None removes the rate cap
+       @param: burst = 20, requests that may be sent back to back
+       @param: max_concurrency = 32, ceiling of the adaptive concurrency limit
+       @param: min_concurrency = 1
+       @param: max_retries = 3, retries of a 429 / 5xx response; 0 disables them
+       @param: backoff_base = 0.5, in seconds, doubled on every retry
+       @param: backoff_max = 30, in seconds
+    '''
+
+    def __init__(self, rate = 10, burst = 20, max_concurrency = 32, min_concurrency = 1,
+                 max_retries = 3, backoff_base = 0.5, backoff_max = 30):
+
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise AssertionError("need 1 <= min_concurrency <= max_concurrency")
+
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.limit = float(max_concurrency)
+        self.active = 0
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+
+    def _try_acquire(self):
+
+        '''Takes a token and a slot if both are available and returns 0,
+           otherwise returns how long to wait before trying again'''
+
+        with self._cond:
+
+            now = time.monotonic()
+
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self.active >= int(self.limit):
+                return None
+
+            if self.rate is not None and self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+
+            if self.rate is not None:
+                self._tokens -= 1
+
+            self.active += 1
+
+            return 0
+
+
+    def acquire(self):
+
+        while True:
+
+            wait = self._try_acquire()
+
+            if wait == 0:
+                return
+
+            with self._cond:
+                # None means every slot is taken; release() wakes us up, the
+                # timeout only guards against a release we raced past
+                self._cond.wait(0.05 if wait is None else wait)
+
+
+    async def acquire_async(self):
+
+        while True:
+
+            wait = self._try_acquire()
+
+            if wait == 0:
+                return
+
+            await asyncio.sleep(0.01 if wait is None else wait)
+
+
+    def release(self, throttled = False):
+
+        with self._cond:
+
+            self.active -= 1
+
+            if throttled:
+                self.limit = max(self.min_concurrency, self.limit / 2)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+            self._cond.notify_all()
+
+
+    def backoff(self, attempt, retry_after = None):
+
+        '''Seconds to wait before retry number attempt (starting at 0):
+           a random fraction of the exponential backoff ("full jitter"),
+           but never less than the server's Retry-After'''
+
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+
+def parse_retry_after(value):
+
+    '''Returns the number of seconds a Retry-After header (delta-seconds or
+       HTTP-date) asks for, or None if it is missing or malformed'''
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if when is None:
+        return None
+
+    return max(0.0, when.timestamp() - time.time())
+
+
+_limiter = RateLimiter()
+
+
+def get_rate_limiter():
+
+    return _limiter
+
+
+def configure_rate_limit(**kwargs):
+
+    '''Replaces the process-wide rate limiter, e.g.
+       configure_rate_limit(rate = 5, max_concurrency = 8, max_retries = 5).
+       Takes the same arguments as RateLimiter.'''
+
+    global _limiter
+
+    _limiter = RateLimiter(**kwargs)
+
+    return _limiter
+
+
+def disable_rate_limit():
+
+    '''Turns off throttling and retries'''
+
+    return configure_rate_limit(rate = None, max_concurrency = 10 ** 6,
+                                min_concurrency = 10 ** 6, max_retries = 0)
+
+
+def _retry_delay(limiter, resp, attempt, url):
+
+    delay = limiter.backoff(attempt, parse_retry_after(resp.headers.get("Retry-After")))
+
+    instrument.emit("retry", url = url, status = resp.status_code, attempt = attempt,
+                    delay = delay)
+
+    return delay
+
+
+def send(request, url = None):
+
+    '''Calls request() (which sends one HTTP request and returns the
+       response) under the rate limiter, retrying 429 and 5xx responses.
+       The last response is returned once the retries are used up.'''
+
+    limiter = _limiter
+    attempt = 0
+
+    while True:
+
+        limiter.acquire()
+
+        try:
+            resp = request()
+        except BaseException:
+            limiter.release()
+            raise
+
+        throttled = resp.status_code == 429
+        limiter.release(throttled)
+
+        if resp.status_code not in retry_statuses or attempt >= limiter.max_retries:
+            return resp
+
+        time.sleep(_retry_delay(limiter, resp, attempt, url))
+        attempt += 1
+
+
+async def asend(request, url = None):
+
+    '''Async version of send; request() must return an awaitable'''
+
+    limiter = _limiter
+    attempt = 0
+
+    while True:
+
+        await limiter.acquire_async()
+
+        try:
+            resp = await request()
+        except BaseException:
+            limiter.release()
+            raise
+
+        throttled = resp.status_code == 429
+        limiter.release(throttled)
+
+        if resp.status_code not in retry_statuses or attempt >= limiter.max_retries:
+            return resp
+
+        await asyncio.sleep(_retry_delay(limiter, resp, attempt, url))
+        attempt += 1
@@ -0,0 +1,172 @@
+'''Coalescing of identical concurrent calls ("single flight").
+
+While a call for some key is running, every other caller asking for the same
+key waits for it and receives its result (or exception) instead of doing the
+work again.  Nothing is kept once the call finishes; caching is left to
+yahoo_fin.cache.
+'''
+
+import asyncio
+import threading
+
+from . import instrument
+
+
+class _Call(object):
+
+    def __init__(self):
+
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.shared = False
+
+
+class SingleFlight(object):
+
+    '''Thread-safe single flight group'''
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._calls = {}
+
+
+    def do(self, key, func):
+
+        '''Runs func() unless a call for key is already running, in which
+           case it waits for that one.  Returns a (result, shared) tuple,
+           where shared is True if the same result object was handed to more
+           than one caller (the one that ran func included), so callers that
+           may modify it must take a copy.'''
+
+        with self._lock:
+
+            call = self._calls.get(key)
+
+            if call is not None:
+                leader = False
+                call.shared = True
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+
+            instrument.emit("cache", name = "singleflight", hit = True)
+
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        # no one can join once the call is removed, so shared is final here
+        return call.result, call.shared
+
+
+    def __len__(self):
+
+        return len(self._calls)
+
+
+class _AsyncCall(object):
+
+    def __init__(self):
+
+        self.task = None
+        self.waiters = 0
+        self.shared = False
+
+
+class AsyncSingleFlight(object):
+
+    '''Single flight group for coroutines running on one event loop.  The
+       work runs in a task of its own, so a caller that is cancelled (or
+       times out) does not cancel it for the others; it is only cancelled
+       once every caller waiting for it has gone.'''
+
+    def __init__(self):
+
+        self._calls = {}
+
+
+    async def do(self, key, func):
+
+        '''Awaits func() unless a call for key is already pending.  Returns
+           a (result, shared) tuple like SingleFlight.do.'''
+
+        call = self._calls.get(key)
+
+        if call is not None:
+            instrument.emit("cache", name = "singleflight", hit = True)
+            call.shared = True
+        else:
+            call = self._calls[key] = _AsyncCall()
+            call.task = asyncio.ensure_future(self._run(key, call, func))
+            # retrieve the outcome so a task nobody awaits any more logs nothing
+            call.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        call.waiters += 1
+
+        try:
+            result = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # every caller gave up: stop the work, and let the next caller
+                # start afresh rather than join a cancelled call
+                self._forget(key, call)
+                call.task.cancel()
+
+        return result, call.shared
+
+
+    async def _run(self, key, call, func):
+
+        try:
+            return await func()
+        finally:
+            # forgotten before any waiter resumes, so no one can join a call
+            # whose result was already handed out
+            self._forget(key, call)
+
+
+    def _forget(self, key, call):
+
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+    def __len__(self):
+
+        return len(self._calls)
+
+
+def request_key(url, params = None, headers = None, **kwargs):
+
+    '''Hashable key identifying a GET request, or None if the request
+       should not be coalesced (e.g. streamed responses)'''
+
+    if kwargs.get("stream"):
+        return None
+
+    if isinstance(params, dict):
+        params = sorted(params.items())
+
+    if headers is not None:
+        headers = sorted(headers.items())
+
+    return (url, repr(params), repr(headers),
+            repr(sorted((k, v) for k, v in kwargs.items() if k != "timeout")))
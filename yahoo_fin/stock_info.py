@@ -1,1126 +1,1950 @@
-import requests
-import pandas as pd
-import ftplib
-import io
-import re
-import json
-import datetime
-# Needed for decrypting
-import base64
-import hashlib
-# Need to install pycryptodome package
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import unpad
-# For pretty print
-from pprint import pp
-
-
-try:
-    from requests_html import HTMLSession
-except Exception:
-    print("""Warning - Certain functionality 
-             requires requests_html, which is not installed.
-             
-             Install using:
-             pip install requests_html
-
-             After installation, you may have to restart your Python session.""")
-
-
-base_url = "https://query1.finance.yahoo.com/v8/finance/chart/"
-default_headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.95 Safari/537.36'}
-
-def build_url(ticker, start_date = None, end_date = None, interval = "1d"):
-    
-    if end_date is None:  
-        end_seconds = int(pd.Timestamp("now").timestamp())
-        
-    else:
-        end_seconds = int(pd.Timestamp(end_date).timestamp())
-        
-    if start_date is None:
-        start_seconds = 7223400    
-        
-    else:
-        start_seconds = int(pd.Timestamp(start_date).timestamp())
-    
-    site = base_url + ticker
-    
-    params = {"period1": start_seconds, "period2": end_seconds,
-              "interval": interval.lower(), "events": "div,splits"}
-    
-    
-    return site, params
-
-
-def force_float(elt):
-    
-    try:
-        return float(elt)
-    except:
-        return elt
-    
-def _convert_to_numeric(s):
-
-    if "M" in s:
-        s = s.strip("M")
-        return force_float(s) * 1_000_000
-
-    if "B" in s:
-        s = s.strip("B")
-        return force_float(s) * 1_000_000_000
-
-    return force_float(s)
-
-
-def get_data(ticker, start_date = None, end_date = None, index_as_date = True,
-             interval = "1d", headers = default_headers
-):
-    '''Downloads historical stock price data into a pandas data frame.  Interval
-       must be "1d", "1wk", "1mo", or "1m" for daily, weekly, monthly, or minute data.
-       Intraday minute data is limited to 7 days.
-    
-       @param: ticker
-       @param: start_date = None
-       @param: end_date = None
-       @param: index_as_date = True
-       @param: interval = "1d"
-    '''
-    
-    if interval not in ("1d", "1wk", "1mo", "1m"):
-        raise AssertionError("interval must be of of '1d', '1wk', '1mo', or '1m'")
-    
-    
-    # build and connect to URL
-    site, params = build_url(ticker, start_date, end_date, interval)
-    resp = requests.get(site, params = params, headers = headers)
-    
-    
-    if not resp.ok:
-        raise AssertionError(resp.json())
-        
-    
-    # get JSON response
-    data = resp.json()
-    
-    # get open / high / low / close data
-    frame = pd.DataFrame(data["chart"]["result"][0]["indicators"]["quote"][0])
-
-    # get the date info
-    temp_time = data["chart"]["result"][0]["timestamp"]
-
-    if interval != "1m":
-    
-        # add in adjclose
-        frame["adjclose"] = data["chart"]["result"][0]["indicators"]["adjclose"][0]["adjclose"]   
-        frame.index = pd.to_datetime(temp_time, unit = "s")
-        frame.index = frame.index.map(lambda dt: dt.floor("d"))
-        frame = frame[["open", "high", "low", "close", "adjclose", "volume"]]
-            
-    else:
-
-        frame.index = pd.to_datetime(temp_time, unit = "s")
-        frame = frame[["open", "high", "low", "close", "volume"]]
-        
-        
-    frame['ticker'] = ticker.upper()
-    
-    if not index_as_date:  
-        frame = frame.reset_index()
-        frame.rename(columns = {"index": "date"}, inplace = True)
-        
-    return frame
-
-
-
-def tickers_sp500(include_company_data = False):
-    '''Downloads list of tickers currently listed in the S&P 500 '''
-    # get list of all S&P 500 stocks
-    sp500 = pd.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")[0]
-    sp500["Symbol"] = sp500["Symbol"].str.replace(".", "-")
-
-    if include_company_data:
-        return sp500
-
-    sp_tickers = sp500.Symbol.tolist()
-    sp_tickers = sorted(sp_tickers)
-    
-    return sp_tickers
-
-
-def tickers_nasdaq(include_company_data = False):
-    
-    '''Downloads list of tickers currently listed in the NASDAQ'''
-    
-    ftp = ftplib.FTP("ftp.nasdaqtrader.com")
-    ftp.login()
-    ftp.cwd("SymbolDirectory")
-    
-    r = io.BytesIO()
-    ftp.retrbinary('RETR nasdaqlisted.txt', r.write)
-    
-    if include_company_data:
-        r.seek(0)
-        data = pd.read_csv(r, sep = "|")
-        return data
-    
-    info = r.getvalue().decode()
-    splits = info.split("|")
-    
-    
-    tickers = [x for x in splits if "\r\n" in x]
-    tickers = [x.split("\r\n")[1] for x in tickers if "NASDAQ" not in x != "\r\n"]
-    tickers = [ticker for ticker in tickers if "File" not in ticker]    
-    
-    ftp.close()    
-
-    return tickers
-    
-    
-
-def tickers_other(include_company_data = False):
-    '''Downloads list of tickers currently listed in the "otherlisted.txt"
-       file on "ftp.nasdaqtrader.com" '''
-    ftp = ftplib.FTP("ftp.nasdaqtrader.com")
-    ftp.login()
-    ftp.cwd("SymbolDirectory")
-    
-    r = io.BytesIO()
-    ftp.retrbinary('RETR otherlisted.txt', r.write)
-    
-    if include_company_data:
-        r.seek(0)
-        data = pd.read_csv(r, sep = "|")
-        return data
-    
-    info = r.getvalue().decode()
-    splits = info.split("|")    
-    
-    tickers = [x for x in splits if "\r\n" in x]
-    tickers = [x.split("\r\n")[1] for x in tickers]
-    tickers = [ticker for ticker in tickers if "File" not in ticker]        
-    
-    ftp.close()    
-
-    return tickers
-    
-    
-def tickers_dow(include_company_data = False):
-    
-    '''Downloads list of currently traded tickers on the Dow'''
-
-    site = "https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average"
-    
-    table = pd.read_html(site, attrs = {"id":"constituents"})[0]
-    
-    if include_company_data:
-        return table
-
-    dow_tickers = sorted(table['Symbol'].tolist())
-    
-    return dow_tickers    
-    
-
-def tickers_ibovespa(include_company_data = False):
-    
-    '''Downloads list of currently traded tickers on the Ibovespa, Brazil'''
-
-    table = pd.read_html("https://pt.wikipedia.org/wiki/Lista_de_companhias_citadas_no_Ibovespa")[0]
-    table.columns = ["Symbol", "Share", "Sector", "Type", "Site"]
-    
-    if include_company_data:
-        return table
-    
-    ibovespa_tickers = sorted(table.Symbol.tolist())
-    
-    return ibovespa_tickers 
-
-
-
-def tickers_nifty50(include_company_data = False, headers = {'User-agent': 'Mozilla/5.0'}):
-
-    '''Downloads list of currently traded tickers on the NIFTY 50, India'''
-
-    site = "https://finance.yahoo.com/quote/%5ENSEI/components?p=%5ENSEI"
-    table = pd.read_html(requests.get(site, headers=headers).text)[0]
-    
-    if include_company_data:
-        return table
-    
-    nifty50 = sorted(table['Symbol'].tolist())
-
-    return nifty50
-
-def tickers_niftybank():
-    ''' Currently traded tickers on the NIFTY BANK, India '''
-    
-    niftybank = ['AXISBANK', 'KOTAKBANK', 'HDFCBANK', 'SBIN', 'BANKBARODA', 'INDUSINDBK', 'PNB', 'IDFCFIRSTB', 'ICICIBANK', 'RBLBANK', 'FEDERALBNK', 'BANDHANBNK']
-    
-    return niftybank
-
-
-
-def tickers_ftse100(include_company_data = False):
-    
-    '''Downloads a list of the tickers traded on the FTSE 100 index'''
-    
-    table = pd.read_html("https://en.wikipedia.org/wiki/FTSE_100_Index", attrs = {"id": "constituents"})[0]
-    
-    if include_company_data:
-        return table
-    
-    return sorted(table.EPIC.tolist())
-    
-
-def tickers_ftse250(include_company_data = False):
-    
-    
-    '''Downloads a list of the tickers traded on the FTSE 250 index'''
-    
-    table = pd.read_html("https://en.wikipedia.org/wiki/FTSE_250_Index", attrs = {"id": "constituents"})[0]
-    
-    table.columns = ["Company", "Ticker"]
-    
-    if include_company_data:
-        return table
-    
-    return sorted(table.Ticker.tolist())
-    
-
-
-
-def get_quote_table(ticker , dict_result = True, headers = {'User-agent': 'Mozilla/5.0'}): 
-    
-    '''Scrapes data elements found on Yahoo Finance's quote page 
-       of input ticker
-    
-       @param: ticker
-       @param: dict_result = True
-    '''
-
-    site = "https://finance.yahoo.com/quote/" + ticker + "?p=" + ticker
-    
-    tables = pd.read_html(requests.get(site, headers=headers).text)
-    
-    data = pd.concat([tables[0], tables[1]])
-    
-
-    data.columns = ["attribute" , "value"]
-    
-    quote_price = pd.DataFrame(["Quote Price", get_live_price(ticker)]).transpose()
-    quote_price.columns = data.columns.copy()
-    
-    data = pd.concat([data, quote_price])
-    
-    data = data.sort_values("attribute")
-    
-    data = data.drop_duplicates().reset_index(drop = True)
-    
-    data["value"] = data.value.map(force_float)
-
-    if dict_result:
-        
-        result = {key : val for key,val in zip(data.attribute , data.value)}
-        return result
-        
-    return data    
-    
-    
-def get_stats(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Scrapes information from the statistics tab on Yahoo Finance 
-       for an input ticker 
-    
-       @param: ticker
-    '''
-
-    stats_site = "https://finance.yahoo.com/quote/" + ticker + \
-                 "/key-statistics?p=" + ticker
-    
-
-    tables = pd.read_html(requests.get(stats_site, headers=headers).text)
-    
-    tables = [table for table in tables[1:] if table.shape[1] == 2]
-    
-    table = tables[0]
-    for elt in tables[1:]:
-        table = pd.concat([table, elt])
-
-    table.columns = ["Attribute" , "Value"]
-    
-    table = table.reset_index(drop = True)
-    
-    return table
-
-
-def get_stats_valuation(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Scrapes Valuation Measures table from the statistics tab on Yahoo Finance 
-       for an input ticker 
-    
-       @param: ticker
-    '''
-
-    stats_site = "https://finance.yahoo.com/quote/" + ticker + \
-                 "/key-statistics?p=" + ticker
-    
-    
-    tables = pd.read_html(requests.get(stats_site, headers=headers).text)
-    
-    tables = [table for table in tables if "Trailing P/E" in table.iloc[:,0].tolist()]
-    
-    
-    table = tables[0].reset_index(drop = True)
-    
-    return table
-
-
-def _decrypt_yblob_aes(data):
-    '''From pydata/pandas-datareader PR#953 - https://github.com/pydata/pandas-datareader/pull/953/commits/ea66d6b981554f9d0262038aef2106dda7138316 '''
-    encrypted_stores = data['context']['dispatcher']['stores']
-    _cs = data["_cs"]
-    _cr = data["_cr"]
-
-    _cr = b"".join(int.to_bytes(i, length=4, byteorder="big", signed=True) for i in json.loads(_cr)["words"])
-    password = hashlib.pbkdf2_hmac("sha1", _cs.encode("utf8"), _cr, 1, dklen=32).hex()
-
-    encrypted_stores = base64.b64decode(encrypted_stores)
-    assert encrypted_stores[0:8] == b"Salted__"
-    salt = encrypted_stores[8:16]
-    encrypted_stores = encrypted_stores[16:]
-
-    def EVPKDF(
-            password,
-            salt,
-            keySize=32,
-            ivSize=16,
-            iterations=1,
-            hashAlgorithm="md5",
-    ) -> tuple:
-        """OpenSSL EVP Key Derivation Function
-        Args:
-            password (Union[str, bytes, bytearray]): Password to generate key from.
-            salt (Union[bytes, bytearray]): Salt to use.
-            keySize (int, optional): Output key length in bytes. Defaults to 32.
-            ivSize (int, optional): Output Initialization Vector (IV) length in bytes. Defaults to 16.
-            iterations (int, optional): Number of iterations to perform. Defaults to 1.
-            hashAlgorithm (str, optional): Hash algorithm to use for the KDF. Defaults to 'md5'.
-        Returns:
-            key, iv: Derived key and Initialization Vector (IV) bytes.
-        Taken from: https://gist.github.com/rafiibrahim8/0cd0f8c46896cafef6486cb1a50a16d3
-        OpenSSL original code: https://github.com/openssl/openssl/blob/master/crypto/evp/evp_key.c#L78
-        """
-
-        assert iterations > 0, "Iterations can not be less than 1."
-
-        if isinstance(password, str):
-            password = password.encode("utf-8")
-
-        final_length = keySize + ivSize
-        key_iv = b""
-        block = None
-
-        while len(key_iv) < final_length:
-            hasher = hashlib.new(hashAlgorithm)
-            if block:
-                hasher.update(block)
-            hasher.update(password)
-            hasher.update(salt)
-            block = hasher.digest()
-            for _ in range(1, iterations):
-                block = hashlib.new(hashAlgorithm, block).digest()
-            key_iv += block
-
-        key, iv = key_iv[:keySize], key_iv[keySize:final_length]
-        return key, iv
-
-    key, iv = EVPKDF(password, salt, keySize=32, ivSize=16, iterations=1, hashAlgorithm="md5")
-
-    cipher = AES.new(key, AES.MODE_CBC, iv=iv)
-    plaintext = cipher.decrypt(encrypted_stores)
-    plaintext = unpad(plaintext, 16, style="pkcs7")
-    decoded_stores = json.loads(plaintext)
-    return decoded_stores
-
-def _parse_json(url, headers = {'User-agent': 'Mozilla/5.0'}):
-
-    html = requests.get(url=url, headers = headers).text
-
-    json_str = html.split('root.App.main =')[1].split('(this)')[0].split(';\n}')[0].strip()
-
-    try:
-        data = json.loads(json_str)
-        #print("type of json_str :", type(data))
-        unencrypted_stores = _decrypt_yblob_aes(data)
-        json_info = unencrypted_stores['QuoteSummaryStore']
-        #print("json_info :", json_info)
-    except:
-        return '{}'
-    #else:
-        # return data
-        #new_data = json.dumps(data).replace('{}', 'null')
-        #new_data = re.sub(r'\{[\'|\"]raw[\'|\"]:(.*?),(.*?)\}', r'\1', new_data)
-        #json_info = json.loads(new_data)
-        #print("json info :", json_info)
-    return json_info
-
-
-def _parse_table(json_info):
-
-    df = pd.DataFrame(json_info)
-    
-    if df.empty:
-        return df
-    
-    del df["maxAge"]
-
-    df.set_index("endDate", inplace=True)
-    df.index = pd.to_datetime(df.index, unit="s")
- 
-    df = df.transpose()
-    df.index.name = "Breakdown"
-
-    return df
-
-
-def get_income_statement(ticker, yearly = True):
-    
-    '''Scrape income statement from Yahoo Finance for a given ticker
-    
-       @param: ticker
-    '''
-    
-    income_site = "https://finance.yahoo.com/quote/" + ticker + \
-            "/financials?p=" + ticker
-
-    json_info = _parse_json(income_site)
-    try:
-        if yearly:
-            temp = json_info["incomeStatementHistory"]["incomeStatementHistory"]
-        else:
-            temp = json_info["incomeStatementHistoryQuarterly"]["incomeStatementHistory"]
-    except:
-        temp = []
-    
-    return _parse_table(temp)      
-        
-
-def get_balance_sheet(ticker, yearly = True):
-    
-    '''Scrapes balance sheet from Yahoo Finance for an input ticker 
-    
-       @param: ticker
-    '''    
-    
-    balance_sheet_site = "https://finance.yahoo.com/quote/" + ticker + \
-                         "/balance-sheet?p=" + ticker
-    
-
-    json_info = _parse_json(balance_sheet_site)
-    
-    try:
-        if yearly:
-            temp = json_info["balanceSheetHistory"]["balanceSheetStatements"]
-        else:
-            temp = json_info["balanceSheetHistoryQuarterly"]["balanceSheetStatements"]
-    except:
-        temp = []
-        
-    return _parse_table(temp)      
-
-
-def get_cash_flow(ticker, yearly = True):
-    
-    '''Scrapes the cash flow statement from Yahoo Finance for an input ticker 
-    
-       @param: ticker
-    '''
-    
-    cash_flow_site = "https://finance.yahoo.com/quote/" + \
-            ticker + "/cash-flow?p=" + ticker
-    
-    
-    json_info = _parse_json(cash_flow_site)
-    
-    if yearly:
-        temp = json_info["cashflowStatementHistory"]["cashflowStatements"]
-    else:
-        temp = json_info["cashflowStatementHistoryQuarterly"]["cashflowStatements"]
-        
-    return _parse_table(temp)      
-
-
-def get_financials(ticker, yearly = True, quarterly = True):
-
-    '''Scrapes financials data from Yahoo Finance for an input ticker, including
-       balance sheet, cash flow statement, and income statement.  Returns dictionary
-       of results.
-    
-       @param: ticker
-       @param: yearly = True
-       @param: quarterly = True
-    '''
-
-    if not yearly and not quarterly:
-        raise AssertionError("yearly or quarterly must be True")
-    
-    financials_site = "https://finance.yahoo.com/quote/" + ticker + \
-            "/financials?p=" + ticker
-            
-    json_info = _parse_json(financials_site)
-    
-    result = {}
-    
-    if yearly:
-
-        temp = json_info["incomeStatementHistory"]["incomeStatementHistory"]
-        table = _parse_table(temp)
-        result["yearly_income_statement"] = table
-    
-        temp = json_info["balanceSheetHistory"]["balanceSheetStatements"]
-        table = _parse_table(temp)
-        result["yearly_balance_sheet"] = table
-        
-        temp = json_info["cashflowStatementHistory"]["cashflowStatements"]
-        table = _parse_table(temp)
-        result["yearly_cash_flow"] = table
-
-    if quarterly:
-        temp = json_info["incomeStatementHistoryQuarterly"]["incomeStatementHistory"]
-        table = _parse_table(temp)
-        result["quarterly_income_statement"] = table
-    
-        temp = json_info["balanceSheetHistoryQuarterly"]["balanceSheetStatements"]
-        table = _parse_table(temp)
-        result["quarterly_balance_sheet"] = table
-        
-        temp = json_info["cashflowStatementHistoryQuarterly"]["cashflowStatements"]
-        table = _parse_table(temp)
-        result["quarterly_cash_flow"] = table
-
-        
-    return result
-
-
-def get_holders(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Scrapes the Holders page from Yahoo Finance for an input ticker 
-    
-       @param: ticker
-    '''    
-    
-    holders_site = "https://finance.yahoo.com/quote/" + \
-                    ticker + "/holders?p=" + ticker
-    
-        
-    tables = pd.read_html(requests.get(holders_site, headers=headers).text)
-    
-       
-    table_names = ["Major Holders" , "Direct Holders (Forms 3 and 4)" ,
-                   "Top Institutional Holders" , "Top Mutual Fund Holders"]
-     
-    
-    table_mapper = {key : val for key,val in zip(table_names , tables)}
-                   
-                   
-    return table_mapper       
-
-def get_analysts_info(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Scrapes the Analysts page from Yahoo Finance for an input ticker 
-    
-       @param: ticker
-    '''    
-    
-    
-    analysts_site = "https://finance.yahoo.com/quote/" + ticker + \
-                     "/analysts?p=" + ticker
-    
-    tables = pd.read_html(requests.get(analysts_site, headers=headers).text)
-    
-    table_names = [table.columns[0] for table in tables]
-
-    table_mapper = {key : val for key , val in zip(table_names , tables)}
-    
-
-    return table_mapper
-        
-
-def get_live_price(ticker):
-    
-    '''Gets the live price of input ticker
-    
-       @param: ticker
-    '''    
-    
-    df = get_data(ticker, end_date = pd.Timestamp.today() + pd.DateOffset(10))
-    
-    
-    return df.close[-1]
-
-def get_live_prices(ticker_list):
-    base_quotes_url = 'https://query1.finance.yahoo.com/v7/finance/quote?symbols='
-    new_url = base_quotes_url + ','.join(ticker_list)
-    resp = requests.get(new_url, headers=default_headers)
-    # get JSON response
-    data = resp.json()
-    results = {result['symbol'] : result['regularMarketPrice'] 
-               for result in data['quoteResponse']['result']}
-    return results
-
-def _raw_get_daily_info(site):
-       
-    session = HTMLSession()
-    
-    resp = session.get(site)
-    
-    tables = pd.read_html(resp.html.raw_html)  
-    
-    df = tables[0].copy()
-    
-    df.columns = tables[0].columns
-    
-    del df["52 Week Range"]
-    
-    df["% Change"] = df["% Change"].map(lambda x: float(x.strip("%+").replace(",", "")))
-     
-
-    fields_to_change = [x for x in df.columns.tolist() if "Vol" in x \
-                        or x == "Market Cap"]
-    
-    for field in fields_to_change:
-        
-        if type(df[field][0]) == str:
-            df[field] = df[field].map(_convert_to_numeric)
-            
-    session.close()
-    
-    return df
-    
-
-def get_day_most_active(count: int = 100):
-
-    return _raw_get_daily_info(f"https://finance.yahoo.com/most-active?offset=0&count={count}")
-
-
-def get_day_gainers(count: int = 100):
-
-    return _raw_get_daily_info(f"https://finance.yahoo.com/gainers?offset=0&count={count}")
-
-
-def get_day_losers(count: int = 100):
-
-    return _raw_get_daily_info(f"https://finance.yahoo.com/losers?offset=0&count={count}")
-
-
-def get_top_crypto():
-    
-    '''Gets the top 100 Cryptocurrencies by Market Cap'''      
-
-    session = HTMLSession()
-    
-    resp = session.get("https://finance.yahoo.com/cryptocurrencies?offset=0&count=100")
-    
-    tables = pd.read_html(resp.html.raw_html)               
-                    
-    df = tables[0].copy()
-
-    
-    df["% Change"] = df["% Change"].map(lambda x: float(str(x).strip("%").\
-                                                               strip("+").\
-                                                               replace(",", "")))
-    del df["52 Week Range"]
-    del df["Day Chart"]
-    
-    fields_to_change = [x for x in df.columns.tolist() if "Volume" in x \
-                        or x == "Market Cap" or x == "Circulating Supply"]
-    
-    for field in fields_to_change:
-        
-        if type(df[field][0]) == str:
-            df[field] = df[field].map(lambda x: _convert_to_numeric(str(x)))
-            
-            
-    session.close()        
-                
-    return df
-                    
-        
-def get_dividends(ticker, start_date = None, end_date = None, index_as_date = True, 
-                  headers = default_headers
-):
-    '''Downloads historical dividend data into a pandas data frame.
-    
-       @param: ticker
-       @param: start_date = None
-       @param: end_date = None
-       @param: index_as_date = True
-    '''
-    
-    # build and connect to URL
-    site, params = build_url(ticker, start_date, end_date, "1d")
-    resp = requests.get(site, params = params, headers = headers)
-    
-    
-    if not resp.ok:
-        return pd.DataFrame()
-        
-    
-    # get JSON response
-    data = resp.json()
-    
-    # check if there is data available for dividends
-    if "events" not in data["chart"]["result"][0] or "dividends" not in data["chart"]["result"][0]['events']:
-        return pd.DataFrame()
-    
-    # get the dividend data
-    frame = pd.DataFrame(data["chart"]["result"][0]['events']['dividends'])
-    
-    frame = frame.transpose()
-        
-    frame.index = pd.to_datetime(frame.index, unit = "s")
-    frame.index = frame.index.map(lambda dt: dt.floor("d"))
-    
-    # sort in chronological order
-    frame = frame.sort_index()
-        
-    frame['ticker'] = ticker.upper()
-    
-    # remove old date column
-    frame = frame.drop(columns='date')
-    
-    frame = frame.rename({'amount': 'dividend'}, axis = 'columns')
-    
-    if not index_as_date:  
-        frame = frame.reset_index()
-        frame.rename(columns = {"index": "date"}, inplace = True)
-        
-    return frame
-
-
-
-def get_splits(ticker, start_date = None, end_date = None, index_as_date = True,
-               headers = default_headers
-):
-    '''Downloads historical stock split data into a pandas data frame.
-    
-       @param: ticker
-       @param: start_date = None
-       @param: end_date = None
-       @param: index_as_date = True
-    '''
-    
-    # build and connect to URL
-    site, params = build_url(ticker, start_date, end_date, "1d")
-    resp = requests.get(site, params = params, headers = headers)
-    
-    
-    if not resp.ok:
-        raise AssertionError(resp.json())
-        
-    
-    # get JSON response
-    data = resp.json()
-    
-    # check if there is data available for events
-    if "events" not in data["chart"]["result"][0]:
-        raise AssertionError("There is no data available on stock events, or none have occured") 
-
-    # check if there is data available for splits
-    if "splits" not in data["chart"]["result"][0]['events']:
-        raise AssertionError("There is no data available on stock splits, or none have occured")
-    
-    # get the split data
-    frame = pd.DataFrame(data["chart"]["result"][0]['events']['splits'])
-    
-    frame = frame.transpose()
-        
-    frame.index = pd.to_datetime(frame.index, unit = "s")
-    frame.index = frame.index.map(lambda dt: dt.floor("d"))
-    
-    # sort in to chronological order
-    frame = frame.sort_index()
-        
-    frame['ticker'] = ticker.upper()
-    
-    # remove unnecessary columns
-    frame = frame.drop(columns=['date', 'denominator', 'numerator'])
-    
-    if not index_as_date:  
-        frame = frame.reset_index()
-        frame.rename(columns = {"index": "date"}, inplace = True)
-        
-    return frame
-        
-        
-
-
-def get_earnings(ticker):
-    
-    '''Scrapes earnings data from Yahoo Finance for an input ticker 
-    
-       @param: ticker
-    '''
-
-    result = {
-        "quarterly_results": pd.DataFrame(),
-        "yearly_revenue_earnings": pd.DataFrame(),
-        "quarterly_revenue_earnings": pd.DataFrame()
-    }
-
-    financials_site = "https://finance.yahoo.com/quote/" + ticker + \
-        "/financials?p=" + ticker
-
-    json_info = _parse_json(financials_site)
-
-    if "earnings" not in json_info:
-        return result
-
-    temp = json_info["earnings"]
-
-    if temp == None:
-        return result
-    
-    result["quarterly_results"] = pd.DataFrame.from_dict(temp["earningsChart"]["quarterly"])
-    
-    result["yearly_revenue_earnings"] = pd.DataFrame.from_dict(temp["financialsChart"]["yearly"])
-    
-    result["quarterly_revenue_earnings"] = pd.DataFrame.from_dict(temp["financialsChart"]["quarterly"])
-    
-    return (pp(result))
-
-
-
-### Earnings functions
-def _parse_earnings_json(url, headers = default_headers
-):
-        resp = requests.get(url, headers = headers)
-        
-        content = resp.content.decode(encoding='utf-8', errors='strict')
-        
-        page_data = [row for row in content.split(
-            '\n') if row.startswith('root.App.main = ')][0][:-1]
-        
-        page_data = page_data.split('root.App.main = ', 1)[1]
-        
-        return json.loads(page_data)
-
-def get_next_earnings_date(ticker):
-        
-    base_earnings_url = 'https://finance.yahoo.com/quote'
-    new_url = base_earnings_url + "/" + ticker
-
-    parsed_result = _parse_earnings_json(new_url)
-    
-    temp = parsed_result['context']['dispatcher']['stores']['QuoteSummaryStore']['calendarEvents']['earnings']['earningsDate'][0]['raw']
-
-    return datetime.datetime.fromtimestamp(temp)
-
-
-def get_earnings_history(ticker):
-    
-        '''Inputs: @ticker
-           Returns the earnings calendar history of the input ticker with 
-           EPS actual vs. expected data.'''
-
-        url = 'https://finance.yahoo.com/calendar/earnings?symbol=' + ticker
-         
-        result = _parse_earnings_json(url)
-        
-        return result["context"]["dispatcher"]["stores"]["ScreenerResultsStore"]["results"]["rows"]
-
-
-
-def get_earnings_for_date(date, offset = 0, count = 1):
-
-    '''Inputs: @date
-       Returns a dictionary of stock tickers with earnings expected on the
-       input date.  The dictionary contains the expected EPS values for each
-       stock if available.'''
-    
-    base_earnings_url = 'https://finance.yahoo.com/calendar/earnings'
-    
-    if offset >= count:
-        return []
-    
-    temp = pd.Timestamp(date)
-    date = temp.strftime("%Y-%m-%d")
-
-    dated_url = '{0}?day={1}&offset={2}&size={3}'.format(
-        base_earnings_url, date, offset, 100)
-    
-    result = _parse_earnings_json(dated_url)
-    
-    stores = result['context']['dispatcher']['stores']
-    
-    earnings_count = stores['ScreenerCriteriaStore']['meta']['total']
-
-    new_offset = offset + 100
-    
-    more_earnings = get_earnings_for_date(date, new_offset, earnings_count)
-    
-    current_earnings = stores['ScreenerResultsStore']['results']['rows']
-
-    total_earnings = current_earnings + more_earnings
-
-    return total_earnings
-
-
-def get_earnings_in_date_range(start_date, end_date):
-
-        '''Inputs: @start_date
-                   @end_date
-                   
-           Returns the stock tickers with expected EPS data for all dates in the
-           input range (inclusive of the start_date and end_date.'''
-    
-        earnings_data = []
-
-        days_diff = pd.Timestamp(end_date) - pd.Timestamp(start_date)
-        days_diff = days_diff.days
-
-        
-        current_date = pd.Timestamp(start_date)
-        
-        dates = [current_date + datetime.timedelta(diff) for diff in range(days_diff + 1)]
-        dates = [d.strftime("%Y-%m-%d") for d in dates]
- 
-        i = 0
-        while i < len(dates):
-            try:
-                earnings_data += get_earnings_for_date(dates[i])
-            except Exception:
-                pass
-            
-            i += 1
-            
-        return earnings_data
-
-
-def get_currencies(headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Returns the currencies table from Yahoo Finance'''
-    
-    site = "https://finance.yahoo.com/currencies"
-    tables = pd.read_html(requests.get(site, headers=headers).text)
-    
-    result = tables[0]
-    
-    return result
-
-
-def get_futures(headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Returns the futures table from Yahoo Finance'''
-    
-    site = "https://finance.yahoo.com/commodities"
-    tables = pd.read_html(requests.get(site, headers=headers).text)
-    
-    result = tables[0]
-    
-    return result
-
-
-def get_undervalued_large_caps(headers = {'User-agent': 'Mozilla/5.0'}):
-    
-    '''Returns the undervalued large caps table from Yahoo Finance'''
-    
-    site = "https://finance.yahoo.com/screener/predefined/undervalued_large_caps?offset=0&count=100"
-    
-    tables = pd.read_html(requests.get(site, headers=headers).text)
-    
-    result = tables[0]
-    
-    return result
-
-
-def get_quote_data(ticker, headers = default_headers
-):
-    
-    '''Inputs: @ticker
-    
-       Returns a dictionary containing over 70 elements corresponding to the 
-       input ticker, including company name, book value, moving average data,
-       pre-market / post-market price (when applicable), and more.'''
-    
-    site = "https://query1.finance.yahoo.com/v7/finance/quote?symbols=" + ticker
-    
-    resp = requests.get(site, headers = default_headers
-)
-    
-    if not resp.ok:
-        raise AssertionError("""Invalid response from server.  Check if ticker is
-                              valid.""")
-    
-    
-    json_result = resp.json()
-    info = json_result["quoteResponse"]["result"]
-    
-    return info[0]
-    
-
-def get_market_status():
-    
-    '''Returns the current state of the market - PRE, POST, OPEN, or CLOSED'''
-    
-    quote_data = get_quote_data("^dji")
-
-    return quote_data["marketState"]
-
-def get_premarket_price(ticker):
-
-    '''Inputs: @ticker
-    
-       Returns the current pre-market price of the input ticker
-       (returns value if pre-market price is available.'''
-    
-    quote_data = get_quote_data(ticker)
-    
-    if "preMarketPrice" in quote_data:
-        return quote_data["preMarketPrice"]
-        
-    raise AssertionError("Premarket price not currently available.")
-
-def get_postmarket_price(ticker):
-
-    '''Inputs: @ticker
-    
-       Returns the current post-market price of the input ticker
-       (returns value if pre-market price is available.'''
-    
-    quote_data = get_quote_data(ticker)
-    
-    if "postMarketPrice" in quote_data:
-        return quote_data["postMarketPrice"]
-    
-    raise AssertionError("Postmarket price not currently available.")
-    
-
-# Company Information Functions
-def get_company_info(ticker):
-    '''Scrape the company information for a ticker
-
-       @param: ticker
-    '''
-    site = f"https://finance.yahoo.com/quote/{ticker}/profile?p={ticker}"
-    json_info = _parse_json(site)
-    json_info = json_info["assetProfile"]
-    info_frame = pd.DataFrame.from_dict(json_info,
-                                        orient="index",
-                                        columns=["Value"])
-    info_frame = info_frame.drop("companyOfficers", axis="index")
-    info_frame.index.name = "Breakdown"
-    return info_frame
-
-
-def get_company_officers(ticker):
-    '''Scrape the company information and return a table of the officers
-
-       @param: ticker
-    '''
-    site = f"https://finance.yahoo.com/quote/{ticker}/profile?p={ticker}"
-    json_info = _parse_json(site)
-    json_info = json_info["assetProfile"]["companyOfficers"]
-    info_frame = pd.DataFrame.from_dict(json_info)
-    info_frame = info_frame.set_index("name")
-    return info_frame
+import numpy as np
+import pandas as pd
+import ftplib
+import io
+import re
+import json
+import datetime
+import time
+import warnings
+# Needed for decrypting
+import base64
+import hashlib
+
+from . import client, instrument
+from .cache import chart_cache, get_earnings_cache, get_price_cache, \
+                   get_tickers_cache, page_store_cache
+from .client import default_headers
+from .instrument import instrumented
+from .singleflight import SingleFlight
+from .tables import first_column, n_columns
+
+
+base_url = "https://query1.finance.yahoo.com/v8/finance/chart/"
+quotes_url = "https://query1.finance.yahoo.com/v7/finance/quote?symbols="
+summary_url = "https://query2.finance.yahoo.com/v10/finance/quoteSummary/"
+
+# backend used by the financials, earnings and company profile functions
+summary_backend = "api"
+
+# concurrent calls for the same chart, quote or page share one download and
+# one parse
+_parse_flight = SingleFlight()
+
+# quoteSummary modules requested for each quote page.  The statement pages
+# share one module list so a fundamentals pass costs a single request.
+_statement_modules = ["incomeStatementHistory", "incomeStatementHistoryQuarterly",
+                      "balanceSheetHistory", "balanceSheetHistoryQuarterly",
+                      "cashflowStatementHistory", "cashflowStatementHistoryQuarterly",
+                      "earnings"]
+
+summary_modules = {"financials": _statement_modules,
+                   "balance-sheet": _statement_modules,
+                   "cash-flow": _statement_modules,
+                   "profile": ["assetProfile"]}
+
+def build_url(ticker, start_date = None, end_date = None, interval = "1d"):
+    
+    if end_date is None:  
+        end_seconds = int(pd.Timestamp("now").timestamp())
+        
+    else:
+        end_seconds = int(pd.Timestamp(end_date).timestamp())
+        
+    if start_date is None:
+        start_seconds = 7223400    
+        
+    else:
+        start_seconds = int(pd.Timestamp(start_date).timestamp())
+    
+    site = base_url + ticker
+    
+    params = {"period1": start_seconds, "period2": end_seconds,
+              "interval": interval.lower(), "events": "div,splits"}
+    
+    
+    return site, params
+
+
+def force_float(elt):
+    
+    '''Returns elt as a float, or unchanged if it is not a number.  Kept for
+       code that imported it; the scraping functions use _parse_numeric,
+       which also handles "1,234", "5.5%" and "2.41T".'''
+    
+    try:
+        return float(elt)
+    except (TypeError, ValueError):
+        return elt
+
+
+_numeric_suffixes = {"": 1, "K": 1e3, "k": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+_missing_values = ["N/A", "-", "--", ""]
+
+
+def _parse_numeric(series, keep_unparsed = False):
+    
+    '''Vectorized conversion of scraped values such as "1,234", "+5.5%",
+       "2.41T", "1.2k" or "N/A" to floats.  Percentages keep their percent
+       units ("5.5%" becomes 5.5).  Values that cannot be parsed become NaN,
+       or are left as they are with keep_unparsed = True.'''
+    
+    if series.dtype.kind in "iuf":
+        return series.astype(float)
+    
+    text = series.astype(str).str.strip().str.replace(r"[,+%]", "", regex = True)
+    parts = text.str.extract(r"^(-?\d*\.?\d+)([KkMBT]?)$")
+    
+    numbers = pd.to_numeric(parts[0], errors = "coerce") * \
+              parts[1].map(_numeric_suffixes).astype(float)
+    
+    if keep_unparsed:
+        return numbers.astype(object).where(numbers.notna(), series)
+    
+    return numbers
+
+
+def _convert_numeric_columns(df, skip = ("Symbol", "Name")):
+    
+    '''Converts each column of a scraped table whose values all parse as
+       numbers (apart from placeholders like "N/A" or "-")'''
+    
+    for column in df.columns:
+        
+        if column in skip:
+            continue
+        
+        numbers = _parse_numeric(df[column])
+        
+        parsed = numbers.notna() | df[column].isna() | df[column].isin(_missing_values)
+        
+        if numbers.notna().any() and parsed.all():
+            df[column] = numbers
+            
+    return df
+
+
+@instrumented
+def get_data(ticker, start_date = None, end_date = None, index_as_date = True,
+             interval = "1d", headers = default_headers, cache = None
+):
+    '''Downloads historical stock price data into a pandas data frame.  Interval
+       must be "1d", "1wk", "1mo", or "1m" for daily, weekly, monthly, or minute data.
+       Intraday minute data is limited to 7 days.
+       
+       If a price cache is enabled (see yahoo_fin.cache.enable_price_cache) or
+       passed in, history already on disk is reused and only the bars after
+       the last stored one are downloaded.
+    
+       @param: ticker
+       @param: start_date = None
+       @param: end_date = None
+       @param: index_as_date = True
+       @param: interval = "1d"
+       @param: cache = None, a directory or PriceCache; False skips the global cache
+    '''
+    
+    if interval not in ("1d", "1wk", "1mo", "1m"):
+        raise AssertionError("interval must be of of '1d', '1wk', '1mo', or '1m'")
+    
+    price_cache = get_price_cache(cache)
+    
+    if price_cache is not None:
+        frame = _get_cached_data(price_cache, ticker, start_date, end_date,
+                                 interval, headers)
+        
+        if not index_as_date:  
+            frame = frame.reset_index()
+            frame.rename(columns = {"index": "date"}, inplace = True)
+            
+        return frame
+    
+    def download():
+        
+        ok, data = _get_chart_json(ticker, start_date, end_date, interval, headers)
+        
+        if not ok:
+            raise AssertionError(data)
+        
+        with instrument.phase("frame"):
+            return _parse_chart_data(data, ticker, interval, index_as_date)
+    
+    key = ("chart", ticker.upper(), str(start_date), str(end_date), interval,
+           index_as_date)
+    frame, shared = _parse_flight.do(key, download)
+    
+    # callers are free to modify what they get back, so when several of them
+    # received the same frame each one (the downloading caller too) copies it
+    return frame.copy() if shared else frame
+
+
+def _get_cached_data(price_cache, ticker, start_date, end_date, interval, headers):
+    
+    '''Serves get_data from the price cache, downloading only the date
+       ranges the stored series does not cover yet'''
+    
+    # same default as build_url when no start date is given
+    if start_date is None:
+        start = pd.Timestamp(7223400, unit = "s")
+    else:
+        start = pd.Timestamp(start_date)
+        
+    end = None if end_date is None else pd.Timestamp(end_date)
+    
+    def download(period_start, period_end):
+        return get_data(ticker, period_start, period_end, interval = interval,
+                        headers = headers, cache = False)
+    
+    frame, covered_from = price_cache.load(ticker, interval)
+    
+    instrument.emit("cache", name = "price", hit = frame is not None)
+    
+    if frame is None:
+        
+        frame = download(start, end_date)
+        covered_from = start
+        price_cache.save(ticker, interval, frame, covered_from)
+        
+    else:
+        
+        changed = False
+        
+        # history requested from before what is stored
+        if start < covered_from:
+            head = download(start, covered_from)
+            frame = pd.concat([head, frame])
+            covered_from = start
+            changed = True
+        
+        # refresh from the last stored bar onwards, which may have been partial
+        last_bar = frame.index[-1] if len(frame) else covered_from
+        
+        if end is None or end > last_bar:
+            
+            tail = download(last_bar, end_date)
+            
+            # a dividend or split since the last refresh rescales the whole
+            # adjusted close series, so download it again in full
+            if "adjclose" in frame.columns and len(frame) and last_bar in tail.index:
+                
+                old_ratio = frame.adjclose.iloc[-1] / frame.close.iloc[-1]
+                new_ratio = tail.adjclose[last_bar] / tail.close[last_bar]
+                
+                if abs(old_ratio - new_ratio) > 1e-6 * abs(old_ratio):
+                    frame = download(covered_from, end_date)
+                    tail = frame.iloc[:0]
+                    
+            frame = pd.concat([frame, tail])
+            changed = True
+            
+        if changed:
+            frame = frame[~frame.index.duplicated(keep = "last")].sort_index()
+            price_cache.save(ticker, interval, frame, covered_from)
+        
+    # daily and longer bars are indexed by their floored date
+    if interval != "1m":
+        start = start.floor("D")
+        
+    frame = frame[frame.index >= start]
+    
+    if end is not None:
+        frame = frame[frame.index < end]
+        
+    return frame
+
+
+def _get_chart_json(ticker, start_date, end_date, interval, headers):
+    
+    '''Returns (ok, JSON response) of the chart endpoint request for the
+       given range.  Concurrent requests share one download, and with
+       cache.enable_chart_cache successful responses are also reused for a
+       short while, so get_data, get_dividends, get_splits and get_chart for
+       the same range cost a single request.  The returned data must not be
+       modified.'''
+    
+    key = (ticker.upper(), str(start_date), str(end_date), interval)
+    
+    if chart_cache.ttl > 0:
+        
+        data = chart_cache.get(key)
+        
+        instrument.emit("cache", name = "chart", hit = data is not None)
+        
+        if data is not None:
+            return True, data
+    
+    def download():
+        
+        # build and connect to URL
+        site, params = build_url(ticker, start_date, end_date, interval)
+        resp = client.get(site, params = params, headers = headers)
+        
+        # get JSON response
+        with instrument.phase("json"):
+            data = resp.json()
+        
+        if resp.ok:
+            chart_cache.set(key, data)
+        
+        return resp.ok, data
+    
+    return _parse_flight.do(("chart_json",) + key, download)[0]
+
+
+def _parse_chart_data(data, ticker, interval = "1d", index_as_date = True):
+    
+    '''Converts a chart endpoint JSON response into the data frame
+       returned by get_data'''
+    
+    result = data["chart"]["result"][0]
+    
+    if interval != "1m":
+        columns = ["open", "high", "low", "close", "adjclose", "volume"]
+    else:
+        columns = ["open", "high", "low", "close", "volume"]
+    
+    # no bars in the requested range
+    if "timestamp" not in result:
+        
+        frame = pd.DataFrame(columns = columns, index = pd.DatetimeIndex([]),
+                             dtype = float)
+        
+    else:
+        
+        # build the frame straight from the timestamp / quote arrays
+        quote = result["indicators"]["quote"][0]
+        index = pd.to_datetime(np.asarray(result["timestamp"], dtype = "int64"), unit = "s")
+        
+        if interval != "1m":
+            
+            # add in adjclose
+            quote = dict(quote, adjclose = result["indicators"]["adjclose"][0]["adjclose"])
+            index = index.floor("D")
+        
+        frame = pd.DataFrame({col: quote[col] for col in columns}, index = index)
+        
+    frame['ticker'] = ticker.upper()
+    
+    if not index_as_date:  
+        frame = frame.reset_index()
+        frame.rename(columns = {"index": "date"}, inplace = True)
+        
+    return frame
+
+
+@instrumented
+def get_data_many(tickers, start_date = None, end_date = None, index_as_date = True,
+                  interval = "1d", headers = default_headers, max_workers = 8,
+                  as_dict = False
+):
+    '''Downloads historical stock price data for several tickers concurrently.
+       Returns a (data, errors) tuple.  data is one long data frame with a
+       ticker column, or a dictionary of data frames keyed by ticker if
+       as_dict = True.  errors maps each ticker that could not be downloaded
+       to the exception it raised, so one bad symbol does not sink the batch.
+    
+       @param: tickers
+       @param: start_date = None
+       @param: end_date = None
+       @param: index_as_date = True
+       @param: interval = "1d"
+       @param: max_workers = 8
+       @param: as_dict = False
+    '''
+    
+    if interval not in ("1d", "1wk", "1mo", "1m"):
+        raise AssertionError("interval must be of of '1d', '1wk', '1mo', or '1m'")
+    
+    def fetch(ticker):
+        return get_data(ticker, start_date = start_date, end_date = end_date,
+                        index_as_date = index_as_date, interval = interval,
+                        headers = headers)
+    
+    frames, errors = client.map_concurrent(fetch, tickers, max_workers)
+    
+    if as_dict:
+        return frames, errors
+    
+    if not frames:
+        return pd.DataFrame(), errors
+    
+    data = pd.concat(frames.values(), ignore_index = not index_as_date)
+        
+    return data, errors
+
+
+
+def _cached_table(key, download, refresh = False):
+    
+    '''Returns the table stored under key in the tickers cache, calling
+       download (and storing its result) if it is missing, stale or refresh
+       is True'''
+    
+    tickers_cache = get_tickers_cache()
+    
+    if tickers_cache is not None and not refresh:
+        
+        table = tickers_cache.get(key)
+        
+        instrument.emit("cache", name = "tickers", hit = table is not None)
+        
+        if table is not None:
+            return table
+        
+    table = download()
+    
+    if tickers_cache is not None:
+        tickers_cache.set(key, table)
+        
+    return table
+
+
+@instrumented
+def tickers_sp500(include_company_data = False, refresh = False):
+    '''Downloads list of tickers currently listed in the S&P 500 '''
+    # get list of all S&P 500 stocks
+    sp500 = _cached_table("sp500", lambda: client.read_html("https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")[0],
+                          refresh)
+    sp500["Symbol"] = sp500["Symbol"].str.replace(".", "-")
+
+    if include_company_data:
+        return sp500
+
+    sp_tickers = sp500.Symbol.tolist()
+    sp_tickers = sorted(sp_tickers)
+    
+    return sp_tickers
+
+
+def _download_nasdaq_files(file_names):
+    
+    '''Retrieves files from the SymbolDirectory on "ftp.nasdaqtrader.com"
+       over a single FTP session'''
+    
+    ftp = ftplib.FTP("ftp.nasdaqtrader.com")
+    ftp.login()
+    ftp.cwd("SymbolDirectory")
+    
+    files = {}
+    
+    for file_name in file_names:
+        r = io.BytesIO()
+        ftp.retrbinary('RETR ' + file_name, r.write)
+        files[file_name] = r.getvalue()
+    
+    ftp.close()
+    
+    return files
+
+
+_nasdaq_file_names = ["nasdaqlisted.txt", "otherlisted.txt"]
+
+
+def _nasdaq_files(file_names, refresh = False):
+    
+    '''Returns the contents of the SymbolDirectory files by name, taking
+       them from the tickers cache where possible and downloading the rest
+       over one FTP session'''
+    
+    tickers_cache = get_tickers_cache()
+    
+    files = {}
+    
+    if tickers_cache is not None and not refresh:
+        
+        for file_name in file_names:
+            
+            data = tickers_cache.get(file_name)
+            
+            instrument.emit("cache", name = "tickers", hit = data is not None)
+            
+            if data is not None:
+                files[file_name] = data
+    
+    missing = [file_name for file_name in file_names if file_name not in files]
+    
+    if not missing:
+        return files
+    
+    # with a cache, grab both symbol files in the same session, since
+    # tickers_nasdaq and tickers_other are usually needed together
+    if tickers_cache is not None:
+        missing = sorted(set(missing) | set(_nasdaq_file_names))
+        
+    downloaded = _download_nasdaq_files(missing)
+    
+    if tickers_cache is not None:
+        for name, data in downloaded.items():
+            tickers_cache.set(name, data)
+    
+    files.update(downloaded)
+    
+    return {file_name: files[file_name] for file_name in file_names}
+
+
+@instrumented
+def tickers_nasdaq(include_company_data = False, refresh = False):
+    
+    '''Downloads list of tickers currently listed in the NASDAQ.  Each call
+       logs in to the FTP server unless the tickers cache is enabled; use
+       tickers_nasdaq_and_other to get both NASDAQ lists over one session.'''
+    
+    data = _nasdaq_files(["nasdaqlisted.txt"], refresh)["nasdaqlisted.txt"]
+    
+    return _parse_nasdaq_listed(data, include_company_data)
+
+
+def _parse_nasdaq_listed(data, include_company_data = False):
+    
+    r = io.BytesIO(data)
+    
+    if include_company_data:
+        r.seek(0)
+        data = pd.read_csv(r, sep = "|")
+        return data
+    
+    info = r.getvalue().decode()
+    splits = info.split("|")
+    
+    
+    tickers = [x for x in splits if "\r\n" in x]
+    tickers = [x.split("\r\n")[1] for x in tickers if "NASDAQ" not in x != "\r\n"]
+    tickers = [ticker for ticker in tickers if "File" not in ticker]    
+
+    return tickers
+    
+    
+
+@instrumented
+def tickers_other(include_company_data = False, refresh = False):
+    '''Downloads list of tickers currently listed in the "otherlisted.txt"
+       file on "ftp.nasdaqtrader.com".  See tickers_nasdaq about FTP
+       sessions.'''
+    
+    data = _nasdaq_files(["otherlisted.txt"], refresh)["otherlisted.txt"]
+    
+    return _parse_other_listed(data, include_company_data)
+
+
+def _parse_other_listed(data, include_company_data = False):
+    
+    r = io.BytesIO(data)
+    
+    if include_company_data:
+        r.seek(0)
+        data = pd.read_csv(r, sep = "|")
+        return data
+    
+    info = r.getvalue().decode()
+    splits = info.split("|")    
+    
+    tickers = [x for x in splits if "\r\n" in x]
+    tickers = [x.split("\r\n")[1] for x in tickers]
+    tickers = [ticker for ticker in tickers if "File" not in ticker]        
+
+    return tickers
+
+
+@instrumented
+def tickers_nasdaq_and_other(include_company_data = False, refresh = False):
+    
+    '''Downloads both symbol files from "ftp.nasdaqtrader.com" over a single
+       FTP session, with or without the tickers cache.  Returns a tuple of
+       the tickers_nasdaq and tickers_other results.
+    
+       @param: include_company_data = False
+       @param: refresh = False
+    '''
+    
+    files = _nasdaq_files(_nasdaq_file_names, refresh)
+    
+    return (_parse_nasdaq_listed(files["nasdaqlisted.txt"], include_company_data),
+            _parse_other_listed(files["otherlisted.txt"], include_company_data))
+    
+    
+@instrumented
+def tickers_dow(include_company_data = False, refresh = False):
+    
+    '''Downloads list of currently traded tickers on the Dow'''
+
+    site = "https://en.wikipedia.org/wiki/Dow_Jones_Industrial_Average"
+    
+    table = _cached_table("dow", lambda: client.read_html(site, attrs = {"id":"constituents"})[0],
+                          refresh)
+    
+    if include_company_data:
+        return table
+
+    dow_tickers = sorted(table['Symbol'].tolist())
+    
+    return dow_tickers    
+    
+
+@instrumented
+def tickers_ibovespa(include_company_data = False, refresh = False):
+    
+    '''Downloads list of currently traded tickers on the Ibovespa, Brazil'''
+
+    table = _cached_table("ibovespa", lambda: client.read_html("https://pt.wikipedia.org/wiki/Lista_de_companhias_citadas_no_Ibovespa")[0],
+                          refresh)
+    table.columns = ["Symbol", "Share", "Sector", "Type", "Site"]
+    
+    if include_company_data:
+        return table
+    
+    ibovespa_tickers = sorted(table.Symbol.tolist())
+    
+    return ibovespa_tickers 
+
+
+
+@instrumented
+def tickers_nifty50(include_company_data = False, headers = {'User-agent': 'Mozilla/5.0'},
+                    refresh = False):
+
+    '''Downloads list of currently traded tickers on the NIFTY 50, India'''
+
+    site = "https://finance.yahoo.com/quote/%5ENSEI/components?p=%5ENSEI"
+    table = _cached_table("nifty50", lambda: client.read_html(site, headers = headers)[0],
+                          refresh)
+    
+    if include_company_data:
+        return table
+    
+    nifty50 = sorted(table['Symbol'].tolist())
+
+    return nifty50
+
+def tickers_niftybank():
+    ''' Currently traded tickers on the NIFTY BANK, India '''
+    
+    niftybank = ['AXISBANK', 'KOTAKBANK', 'HDFCBANK', 'SBIN', 'BANKBARODA', 'INDUSINDBK', 'PNB', 'IDFCFIRSTB', 'ICICIBANK', 'RBLBANK', 'FEDERALBNK', 'BANDHANBNK']
+    
+    return niftybank
+
+
+
+@instrumented
+def tickers_ftse100(include_company_data = False, refresh = False):
+    
+    '''Downloads a list of the tickers traded on the FTSE 100 index'''
+    
+    table = _cached_table("ftse100", lambda: client.read_html("https://en.wikipedia.org/wiki/FTSE_100_Index", attrs = {"id": "constituents"})[0],
+                          refresh)
+    
+    if include_company_data:
+        return table
+    
+    return sorted(table.EPIC.tolist())
+    
+
+@instrumented
+def tickers_ftse250(include_company_data = False, refresh = False):
+    
+    
+    '''Downloads a list of the tickers traded on the FTSE 250 index'''
+    
+    table = _cached_table("ftse250", lambda: client.read_html("https://en.wikipedia.org/wiki/FTSE_250_Index", attrs = {"id": "constituents"})[0],
+                          refresh)
+    
+    table.columns = ["Company", "Ticker"]
+    
+    if include_company_data:
+        return table
+    
+    return sorted(table.Ticker.tolist())
+    
+
+
+
+# table selectors for client.read_tables: each picks the tables a function
+# uses from the ones on its page, so the rest are never converted
+
+def _summary_tables(tables):
+    
+    return tables[:2]
+
+
+def _stats_tables(tables):
+    
+    # the valuation measures table comes first; the rest are attribute / value
+    return [table for table in tables[1:] if n_columns(table) == 2]
+
+
+def _valuation_tables(tables):
+    
+    return [table for table in tables if "Trailing P/E" in first_column(table)][:1]
+
+
+def _holders_tables(tables):
+    
+    return tables[:4]
+
+
+def _first_table(tables):
+    
+    return tables[:1]
+
+
+@instrumented
+def get_quote_table(ticker , dict_result = True, headers = {'User-agent': 'Mozilla/5.0'}): 
+    
+    '''Scrapes data elements found on Yahoo Finance's quote page 
+       of input ticker
+    
+       @param: ticker
+       @param: dict_result = True
+    '''
+
+    site = "https://finance.yahoo.com/quote/" + ticker + "?p=" + ticker
+    
+    tables = client.read_tables(site, _summary_tables, headers = headers)
+    
+    data = pd.concat([tables[0], tables[1]])
+    
+
+    data.columns = ["attribute" , "value"]
+    
+    quote_price = pd.DataFrame(["Quote Price", get_live_price(ticker)]).transpose()
+    quote_price.columns = data.columns.copy()
+    
+    data = pd.concat([data, quote_price])
+    
+    data = data.sort_values("attribute")
+    
+    data = data.drop_duplicates().reset_index(drop = True)
+    
+    data["value"] = _parse_numeric(data.value, keep_unparsed = True)
+
+    if dict_result:
+        
+        result = {key : val for key,val in zip(data.attribute , data.value)}
+        return result
+        
+    return data    
+    
+    
+@instrumented
+def get_stats(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Scrapes information from the statistics tab on Yahoo Finance 
+       for an input ticker 
+    
+       @param: ticker
+    '''
+
+    stats_site = "https://finance.yahoo.com/quote/" + ticker + \
+                 "/key-statistics?p=" + ticker
+    
+
+    tables = client.read_tables(stats_site, _stats_tables, headers = headers)
+    
+    table = tables[0]
+    for elt in tables[1:]:
+        table = pd.concat([table, elt])
+
+    table.columns = ["Attribute" , "Value"]
+    
+    table = table.reset_index(drop = True)
+    
+    table["Value"] = _parse_numeric(table["Value"], keep_unparsed = True)
+    
+    return table
+
+
+@instrumented
+def get_stats_valuation(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Scrapes Valuation Measures table from the statistics tab on Yahoo Finance 
+       for an input ticker 
+    
+       @param: ticker
+    '''
+
+    stats_site = "https://finance.yahoo.com/quote/" + ticker + \
+                 "/key-statistics?p=" + ticker
+    
+    
+    tables = client.read_tables(stats_site, _valuation_tables, headers = headers)
+    
+    
+    table = tables[0].reset_index(drop = True)
+    
+    table = _convert_numeric_columns(table, skip = table.columns[:1])
+    
+    return table
+
+
+def _decrypt_yblob_aes(data):
+    '''From pydata/pandas-datareader PR#953 - https://github.com/pydata/pandas-datareader/pull/953/commits/ea66d6b981554f9d0262038aef2106dda7138316 '''
+    # Need to install pycryptodome package; imported here since only the
+    # page scraping functions need it
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import unpad
+    
+    encrypted_stores = data['context']['dispatcher']['stores']
+    _cs = data["_cs"]
+    _cr = data["_cr"]
+
+    _cr = b"".join(int.to_bytes(i, length=4, byteorder="big", signed=True) for i in json.loads(_cr)["words"])
+    password = hashlib.pbkdf2_hmac("sha1", _cs.encode("utf8"), _cr, 1, dklen=32).hex()
+
+    encrypted_stores = base64.b64decode(encrypted_stores)
+    assert encrypted_stores[0:8] == b"Salted__"
+    salt = encrypted_stores[8:16]
+    encrypted_stores = encrypted_stores[16:]
+
+    def EVPKDF(
+            password,
+            salt,
+            keySize=32,
+            ivSize=16,
+            iterations=1,
+            hashAlgorithm="md5",
+    ) -> tuple:
+        """OpenSSL EVP Key Derivation Function
+        Args:
+            password (Union[str, bytes, bytearray]): Password to generate key from.
+            salt (Union[bytes, bytearray]): Salt to use.
+            keySize (int, optional): Output key length in bytes. Defaults to 32.
+            ivSize (int, optional): Output Initialization Vector (IV) length in bytes. Defaults to 16.
+            iterations (int, optional): Number of iterations to perform. Defaults to 1.
+            hashAlgorithm (str, optional): Hash algorithm to use for the KDF. Defaults to 'md5'.
+        Returns:
+            key, iv: Derived key and Initialization Vector (IV) bytes.
+        Taken from: https://gist.github.com/rafiibrahim8/0cd0f8c46896cafef6486cb1a50a16d3
+        OpenSSL original code: https://github.com/openssl/openssl/blob/master/crypto/evp/evp_key.c#L78
+        """
+
+        assert iterations > 0, "Iterations can not be less than 1."
+
+        if isinstance(password, str):
+            password = password.encode("utf-8")
+
+        final_length = keySize + ivSize
+        key_iv = b""
+        block = None
+
+        while len(key_iv) < final_length:
+            hasher = hashlib.new(hashAlgorithm)
+            if block:
+                hasher.update(block)
+            hasher.update(password)
+            hasher.update(salt)
+            block = hasher.digest()
+            for _ in range(1, iterations):
+                block = hashlib.new(hashAlgorithm, block).digest()
+            key_iv += block
+
+        key, iv = key_iv[:keySize], key_iv[keySize:final_length]
+        return key, iv
+
+    key, iv = EVPKDF(password, salt, keySize=32, ivSize=16, iterations=1, hashAlgorithm="md5")
+
+    cipher = AES.new(key, AES.MODE_CBC, iv=iv)
+    plaintext = cipher.decrypt(encrypted_stores)
+    plaintext = unpad(plaintext, 16, style="pkcs7")
+    decoded_stores = json.loads(plaintext)
+    return decoded_stores
+
+def _parse_json(url, headers = {'User-agent': 'Mozilla/5.0'}):
+
+    # the financials / profile functions often hit the same page back to
+    # back, so reuse a recently decrypted store instead of refetching it
+    json_info = page_store_cache.get(url)
+    
+    instrument.emit("cache", name = "page_store", hit = json_info is not None)
+    
+    if json_info is not None:
+        return json_info
+
+    return _parse_flight.do(("page", url), lambda: _load_page_store(url, headers))[0]
+
+
+def _load_page_store(url, headers):
+
+    json_info = client.get_parsed(url, lambda resp: _parse_page_store(resp.text),
+                                  headers = headers)
+    
+    if isinstance(json_info, dict):
+        page_store_cache.set(url, json_info)
+        
+    return json_info
+
+
+def _parse_page_store(html):
+
+    with instrument.phase("split"):
+        json_str = html.split('root.App.main =')[1].split('(this)')[0].split(';\n}')[0].strip()
+
+    try:
+        with instrument.phase("json"):
+            data = json.loads(json_str)
+        #print("type of json_str :", type(data))
+        with instrument.phase("decrypt"):
+            unencrypted_stores = _decrypt_yblob_aes(data)
+        json_info = unencrypted_stores['QuoteSummaryStore']
+        #print("json_info :", json_info)
+    except:
+        return '{}'
+    
+    #else:
+        # return data
+        #new_data = json.dumps(data).replace('{}', 'null')
+        #new_data = re.sub(r'\{[\'|\"]raw[\'|\"]:(.*?),(.*?)\}', r'\1', new_data)
+        #json_info = json.loads(new_data)
+        #print("json info :", json_info)
+    return json_info
+
+
+def set_summary_backend(backend):
+    
+    '''Chooses how the financials, earnings and company profile functions
+       get their data.  "api" (the default) requests just the needed modules
+       as JSON from the quoteSummary endpoint, falling back on scraping the
+       quote page if that fails.  "scrape" always downloads and decrypts the
+       quote page.
+    
+       @param: backend
+    '''
+    
+    global summary_backend
+    
+    if backend not in ("api", "scrape"):
+        raise AssertionError("backend must be one of 'api' or 'scrape'")
+        
+    summary_backend = backend
+
+
+def _get_quote_summary(ticker, page, backend = None):
+    
+    '''Returns the QuoteSummaryStore-style dictionary for the given quote
+       page of ticker using the selected backend'''
+    
+    if backend is None:
+        backend = summary_backend
+        
+    if backend not in ("api", "scrape"):
+        raise AssertionError("backend must be one of 'api' or 'scrape'")
+    
+    if backend == "api":
+        
+        try:
+            json_info = _get_summary_modules(ticker, summary_modules[page])
+        except Exception:
+            json_info = None
+            
+        # a response missing any requested module falls back on the page too
+        if _has_summary_modules(json_info, page):
+            return json_info
+    
+    return _parse_json(_summary_page_url(ticker, page))
+
+
+def _summary_page_url(ticker, page):
+    
+    return "https://finance.yahoo.com/quote/" + ticker + "/" + page + "?p=" + ticker
+
+
+def _has_summary_modules(json_info, page):
+    
+    return bool(json_info) and all(module in json_info for module in summary_modules[page])
+
+
+def _get_summary_modules(ticker, modules, headers = default_headers):
+    
+    key = (ticker.upper(), tuple(modules))
+    json_info = page_store_cache.get(key)
+    
+    instrument.emit("cache", name = "page_store", hit = json_info is not None)
+    
+    if json_info is not None:
+        return json_info
+    
+    return _parse_flight.do(("summary",) + key,
+                            lambda: _load_summary_modules(ticker, modules, headers))[0]
+
+
+def _load_summary_modules(ticker, modules, headers):
+    
+    key = (ticker.upper(), tuple(modules))
+    
+    resp = client.get(summary_url + ticker, params = {"modules": ",".join(modules)},
+                      headers = headers)
+    
+    if not resp.ok:
+        raise AssertionError(resp.json())
+        
+    with instrument.phase("json"):
+        json_info = _parse_summary_modules(resp.json())
+    
+    if json_info:
+        page_store_cache.set(key, json_info)
+    
+    return json_info
+
+
+def _parse_summary_modules(data):
+    
+    '''Converts a quoteSummary endpoint JSON response into the flattened
+       module dictionary, or {} if it holds no result'''
+    
+    result = data["quoteSummary"]["result"]
+    
+    if not result:
+        return {}
+    
+    return _flatten_raw(result[0])
+
+
+def _flatten_raw(obj):
+    
+    '''Replaces the {"raw": ..., "fmt": ...} values returned by the
+       quoteSummary endpoint with their raw values, and empty objects with
+       None'''
+    
+    if isinstance(obj, dict):
+        
+        if "raw" in obj:
+            return obj["raw"]
+        
+        if not obj:
+            return None
+        
+        return {key: _flatten_raw(val) for key, val in obj.items()}
+    
+    if isinstance(obj, list):
+        return [_flatten_raw(elt) for elt in obj]
+    
+    return obj
+
+
+def _parse_table(json_info):
+
+    df = pd.DataFrame(json_info)
+    
+    if df.empty:
+        return df
+    
+    del df["maxAge"]
+
+    df.set_index("endDate", inplace=True)
+    df.index = pd.to_datetime(df.index, unit="s")
+ 
+    df = df.transpose()
+    df.index.name = "Breakdown"
+
+    return df
+
+
+@instrumented
+def get_income_statement(ticker, yearly = True, backend = None):
+    
+    '''Scrape income statement from Yahoo Finance for a given ticker
+    
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''
+    
+    json_info = _get_quote_summary(ticker, "financials", backend)
+    try:
+        if yearly:
+            temp = json_info["incomeStatementHistory"]["incomeStatementHistory"]
+        else:
+            temp = json_info["incomeStatementHistoryQuarterly"]["incomeStatementHistory"]
+    except:
+        temp = []
+    
+    return _parse_table(temp)      
+        
+
+@instrumented
+def get_balance_sheet(ticker, yearly = True, backend = None):
+    
+    '''Scrapes balance sheet from Yahoo Finance for an input ticker 
+    
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''    
+    
+    json_info = _get_quote_summary(ticker, "balance-sheet", backend)
+    
+    try:
+        if yearly:
+            temp = json_info["balanceSheetHistory"]["balanceSheetStatements"]
+        else:
+            temp = json_info["balanceSheetHistoryQuarterly"]["balanceSheetStatements"]
+    except:
+        temp = []
+        
+    return _parse_table(temp)      
+
+
+@instrumented
+def get_cash_flow(ticker, yearly = True, backend = None):
+    
+    '''Scrapes the cash flow statement from Yahoo Finance for an input ticker 
+    
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''
+    
+    json_info = _get_quote_summary(ticker, "cash-flow", backend)
+    
+    if yearly:
+        temp = json_info["cashflowStatementHistory"]["cashflowStatements"]
+    else:
+        temp = json_info["cashflowStatementHistoryQuarterly"]["cashflowStatements"]
+        
+    return _parse_table(temp)      
+
+
+@instrumented
+def get_financials(ticker, yearly = True, quarterly = True, backend = None):
+
+    '''Scrapes financials data from Yahoo Finance for an input ticker, including
+       balance sheet, cash flow statement, and income statement.  Returns dictionary
+       of results.
+    
+       @param: ticker
+       @param: yearly = True
+       @param: quarterly = True
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''
+
+    if not yearly and not quarterly:
+        raise AssertionError("yearly or quarterly must be True")
+    
+    json_info = _get_quote_summary(ticker, "financials", backend)
+    
+    return _parse_financials(json_info, yearly, quarterly)
+
+
+def _parse_financials(json_info, yearly = True, quarterly = True):
+    
+    '''Builds the get_financials result from the statement modules'''
+    
+    result = {}
+    
+    if yearly:
+
+        temp = json_info["incomeStatementHistory"]["incomeStatementHistory"]
+        table = _parse_table(temp)
+        result["yearly_income_statement"] = table
+    
+        temp = json_info["balanceSheetHistory"]["balanceSheetStatements"]
+        table = _parse_table(temp)
+        result["yearly_balance_sheet"] = table
+        
+        temp = json_info["cashflowStatementHistory"]["cashflowStatements"]
+        table = _parse_table(temp)
+        result["yearly_cash_flow"] = table
+
+    if quarterly:
+        temp = json_info["incomeStatementHistoryQuarterly"]["incomeStatementHistory"]
+        table = _parse_table(temp)
+        result["quarterly_income_statement"] = table
+    
+        temp = json_info["balanceSheetHistoryQuarterly"]["balanceSheetStatements"]
+        table = _parse_table(temp)
+        result["quarterly_balance_sheet"] = table
+        
+        temp = json_info["cashflowStatementHistoryQuarterly"]["cashflowStatements"]
+        table = _parse_table(temp)
+        result["quarterly_cash_flow"] = table
+
+        
+    return result
+
+
+@instrumented
+def get_holders(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Scrapes the Holders page from Yahoo Finance for an input ticker 
+    
+       @param: ticker
+    '''    
+    
+    holders_site = "https://finance.yahoo.com/quote/" + \
+                    ticker + "/holders?p=" + ticker
+    
+        
+    tables = client.read_tables(holders_site, _holders_tables, headers = headers)
+    
+       
+    table_names = ["Major Holders" , "Direct Holders (Forms 3 and 4)" ,
+                   "Top Institutional Holders" , "Top Mutual Fund Holders"]
+     
+    
+    table_mapper = {key : val for key,val in zip(table_names , tables)}
+                   
+                   
+    return table_mapper       
+
+@instrumented
+def get_analysts_info(ticker, headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Scrapes the Analysts page from Yahoo Finance for an input ticker 
+    
+       @param: ticker
+    '''    
+    
+    
+    analysts_site = "https://finance.yahoo.com/quote/" + ticker + \
+                     "/analysts?p=" + ticker
+    
+    tables = client.read_tables(analysts_site, headers = headers)
+    
+    table_names = [table.columns[0] for table in tables]
+
+    table_mapper = {key : val for key , val in zip(table_names , tables)}
+    
+
+    return table_mapper
+        
+
+@instrumented
+def get_live_price(ticker, headers = default_headers):
+    
+    '''Gets the live price of input ticker
+    
+       @param: ticker
+    '''    
+    
+    # only ask for the last few daily bars rather than the full history;
+    # the current price comes back in the response metadata
+    site = base_url + ticker
+    params = {"range": "5d", "interval": "1d"}
+    
+    resp = client.get(site, params = params, headers = headers)
+    
+    if not resp.ok:
+        raise AssertionError(resp.json())
+    
+    with instrument.phase("json"):
+        data = resp.json()
+    
+    return _parse_live_price(data)
+
+
+def _parse_live_price(data):
+    
+    result = data["chart"]["result"][0]
+    
+    price = result.get("meta", {}).get("regularMarketPrice")
+    
+    # fall back on the latest close if the metadata has no price
+    if price is None:
+        closes = result["indicators"]["quote"][0]["close"]
+        price = [close for close in closes if close is not None][-1]
+        
+    return price
+
+@instrumented
+def get_live_prices(ticker_list, chunk_size = 200, max_workers = 8,
+                    headers = default_headers):
+    
+    '''Gets the live prices of a list of tickers from the quote endpoint.
+       Long lists are split into chunks of chunk_size symbols, which are
+       fetched concurrently and merged into one dictionary.  Symbols that are
+       missing from the responses are reported with a warning.
+    
+       @param: ticker_list
+       @param: chunk_size = 200
+       @param: max_workers = 8
+    '''
+    
+    quotes = _get_quotes(ticker_list, chunk_size, max_workers, headers)
+    
+    results = _parse_live_prices(quotes)
+        
+    _report_missing_symbols(ticker_list, results)
+    
+    return results
+
+
+@instrumented
+def stream_quotes(ticker_list, interval_s = 5, fields = None, max_polls = None,
+                  chunk_size = 200, max_workers = 8, headers = default_headers):
+    
+    '''Polls the quote endpoint every interval_s seconds and yields only what
+       changed.  Each item is a dictionary mapping the symbols whose quotes
+       moved since the previous poll to a dictionary of the changed fields
+       and their new values; the first poll yields every field.  Polls with
+       no changes yield nothing.
+    
+       @param: ticker_list
+       @param: interval_s = 5
+       @param: fields = None, e.g. ["regularMarketPrice", "regularMarketVolume"]
+               to only watch (and return) a subset of the quote fields
+       @param: max_polls = None, poll forever by default
+    
+       A poll where every request fails is reported with a warning and
+       yields nothing; the stream carries on with the next poll.
+    '''
+    
+    previous = {}
+    polls = 0
+    next_poll = time.monotonic()
+    
+    while max_polls is None or polls < max_polls:
+        
+        try:
+            quotes = _get_quotes(ticker_list, chunk_size, max_workers, headers)
+        except Exception as error:
+            # every chunk failed (e.g. a network blip outlasting the retries):
+            # keep the previous snapshot and try again on the next poll
+            warnings.warn("Quote poll failed, keeping the previous quotes: %r" % (error,))
+            quotes = {}
+            
+        polls += 1
+        
+        changes = _diff_quotes(previous, quotes, fields)
+        previous.update(quotes)
+        
+        if changes:
+            yield changes
+        
+        if max_polls is not None and polls >= max_polls:
+            break
+            
+        # keep a fixed cadence regardless of how long the poll took, but
+        # after a slow poll or consumer start again from now rather than
+        # firing a burst of catch-up polls
+        next_poll = max(next_poll + interval_s, time.monotonic())
+        time.sleep(max(0, next_poll - time.monotonic()))
+
+
+def _get_quotes(ticker_list, chunk_size = 200, max_workers = 8,
+                headers = default_headers):
+    
+    '''Fetches full quote records for ticker_list in concurrent chunks,
+       returned as a dictionary keyed by symbol'''
+    
+    chunks = _chunk_symbols(ticker_list, chunk_size)
+    
+    def fetch(chunk):
+        resp = client.get(quotes_url + ','.join(chunk), headers = headers)
+        
+        if not resp.ok:
+            raise AssertionError(resp.json())
+            
+        # get JSON response
+        with instrument.phase("json"):
+            return _parse_quotes(resp.json())
+    
+    quotes, errors = client.map_concurrent(fetch, chunks, max_workers)
+    
+    if errors and not quotes:
+        raise next(iter(errors.values()))
+    
+    results = {}
+    
+    for chunk_quotes in quotes.values():
+        results.update(chunk_quotes)
+        
+    return results
+
+
+def _chunk_symbols(ticker_list, chunk_size):
+    
+    ticker_list = list(dict.fromkeys(ticker_list))
+    
+    return [tuple(ticker_list[i:i + chunk_size])
+            for i in range(0, len(ticker_list), chunk_size)]
+
+
+def _report_missing_symbols(ticker_list, results):
+    
+    returned = {symbol.upper() for symbol in results}
+    missing = [ticker for ticker in ticker_list if ticker.upper() not in returned]
+    
+    if missing:
+        warnings.warn("No quote returned for: " + ", ".join(missing))
+        
+    return missing
+
+
+def _diff_quotes(previous, current, fields = None):
+    
+    '''Returns the fields of each quote in current that differ from the
+       same symbol's quote in previous'''
+    
+    changes = {}
+    
+    for symbol, quote in current.items():
+        
+        old = previous.get(symbol, {})
+        keys = quote.keys() if fields is None else [key for key in fields if key in quote]
+        
+        changed = {key: quote[key] for key in keys
+                   if key not in old or old[key] != quote[key]}
+        
+        if changed:
+            changes[symbol] = changed
+            
+    return changes
+
+
+def _parse_quotes(data):
+    return {result['symbol'] : result for result in data['quoteResponse']['result']}
+
+
+def _parse_live_prices(quotes):
+    results = {symbol : quote['regularMarketPrice'] 
+               for symbol, quote in quotes.items()
+               if 'regularMarketPrice' in quote}
+    return results
+
+def _raw_get_daily_info(site):
+       
+    tables = client.read_tables(site, _first_table)
+    
+    df = tables[0].copy()
+    
+    df.columns = tables[0].columns
+    
+    del df["52 Week Range"]
+    
+    df = _convert_numeric_columns(df)
+    
+    return df
+    
+
+@instrumented
+def get_day_most_active(count: int = 100):
+
+    return _raw_get_daily_info(f"https://finance.yahoo.com/most-active?offset=0&count={count}")
+
+
+@instrumented
+def get_day_gainers(count: int = 100):
+
+    return _raw_get_daily_info(f"https://finance.yahoo.com/gainers?offset=0&count={count}")
+
+
+@instrumented
+def get_day_losers(count: int = 100):
+
+    return _raw_get_daily_info(f"https://finance.yahoo.com/losers?offset=0&count={count}")
+
+
+@instrumented
+def get_top_crypto():
+    
+    '''Gets the top 100 Cryptocurrencies by Market Cap'''      
+
+    tables = client.read_tables("https://finance.yahoo.com/cryptocurrencies?offset=0&count=100",
+                                _first_table)
+                    
+    df = tables[0].copy()
+
+    
+    del df["52 Week Range"]
+    del df["Day Chart"]
+    
+    df = _convert_numeric_columns(df)
+                
+    return df
+                    
+        
+@instrumented
+def get_dividends(ticker, start_date = None, end_date = None, index_as_date = True, 
+                  headers = default_headers
+):
+    '''Downloads historical dividend data into a pandas data frame.
+    
+       @param: ticker
+       @param: start_date = None
+       @param: end_date = None
+       @param: index_as_date = True
+    '''
+    
+    ok, data = _get_chart_json(ticker, start_date, end_date, "1d", headers)
+    
+    if not ok:
+        return pd.DataFrame()
+    
+    with instrument.phase("frame"):
+        return _parse_dividends(data, ticker, index_as_date)
+
+
+def _parse_dividends(data, ticker, index_as_date = True):
+    
+    '''Extracts the dividend events from a chart endpoint JSON response'''
+    
+    # check if there is data available for dividends
+    if "events" not in data["chart"]["result"][0] or "dividends" not in data["chart"]["result"][0]['events']:
+        return pd.DataFrame()
+    
+    # get the dividend data
+    frame = pd.DataFrame(data["chart"]["result"][0]['events']['dividends'])
+    
+    frame = frame.transpose()
+        
+    frame.index = pd.to_datetime(frame.index.astype("int64"), unit = "s").floor("D")
+    
+    # sort in chronological order
+    frame = frame.sort_index()
+        
+    frame['ticker'] = ticker.upper()
+    
+    # remove old date column
+    frame = frame.drop(columns='date')
+    
+    frame = frame.rename({'amount': 'dividend'}, axis = 'columns')
+    
+    if not index_as_date:  
+        frame = frame.reset_index()
+        frame.rename(columns = {"index": "date"}, inplace = True)
+        
+    return frame
+
+
+
+@instrumented
+def get_splits(ticker, start_date = None, end_date = None, index_as_date = True,
+               headers = default_headers
+):
+    '''Downloads historical stock split data into a pandas data frame.
+    
+       @param: ticker
+       @param: start_date = None
+       @param: end_date = None
+       @param: index_as_date = True
+    '''
+    
+    ok, data = _get_chart_json(ticker, start_date, end_date, "1d", headers)
+    
+    if not ok:
+        raise AssertionError(data)
+    
+    # check if there is data available for events
+    if "events" not in data["chart"]["result"][0]:
+        raise AssertionError("There is no data available on stock events, or none have occured") 
+
+    # check if there is data available for splits
+    if "splits" not in data["chart"]["result"][0]['events']:
+        raise AssertionError("There is no data available on stock splits, or none have occured")
+    
+    with instrument.phase("frame"):
+        return _parse_splits(data, ticker, index_as_date)
+
+
+def _parse_splits(data, ticker, index_as_date = True):
+    
+    '''Extracts the split events from a chart endpoint JSON response'''
+    
+    # check if there is data available for splits
+    if "events" not in data["chart"]["result"][0] or "splits" not in data["chart"]["result"][0]['events']:
+        return pd.DataFrame()
+    
+    # get the split data
+    frame = pd.DataFrame(data["chart"]["result"][0]['events']['splits'])
+    
+    frame = frame.transpose()
+        
+    frame.index = pd.to_datetime(frame.index.astype("int64"), unit = "s").floor("D")
+    
+    # sort in to chronological order
+    frame = frame.sort_index()
+        
+    frame['ticker'] = ticker.upper()
+    
+    # remove unnecessary columns
+    frame = frame.drop(columns=['date', 'denominator', 'numerator'])
+    
+    if not index_as_date:  
+        frame = frame.reset_index()
+        frame.rename(columns = {"index": "date"}, inplace = True)
+        
+    return frame
+
+
+@instrumented
+def get_chart(ticker, start_date = None, end_date = None, index_as_date = True,
+              interval = "1d", headers = default_headers
+):
+    '''Downloads price history, dividends and stock splits with a single
+       request to the chart endpoint.  Returns a dictionary with "prices",
+       "dividends" and "splits" data frames, in the same formats as get_data,
+       get_dividends and get_splits (dividends / splits are empty data
+       frames when there are none in the date range).
+    
+       @param: ticker
+       @param: start_date = None
+       @param: end_date = None
+       @param: index_as_date = True
+       @param: interval = "1d"
+    '''
+    
+    if interval not in ("1d", "1wk", "1mo", "1m"):
+        raise AssertionError("interval must be of of '1d', '1wk', '1mo', or '1m'")
+    
+    ok, data = _get_chart_json(ticker, start_date, end_date, interval, headers)
+    
+    if not ok:
+        raise AssertionError(data)
+    
+    with instrument.phase("frame"):
+        result = {"prices": _parse_chart_data(data, ticker, interval, index_as_date),
+                  "dividends": _parse_dividends(data, ticker, index_as_date),
+                  "splits": _parse_splits(data, ticker, index_as_date)}
+    
+    return result
+        
+        
+
+
+@instrumented
+def get_earnings(ticker, backend = None):
+    
+    '''Scrapes earnings data from Yahoo Finance for an input ticker 
+    
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''
+
+    result = {
+        "quarterly_results": pd.DataFrame(),
+        "yearly_revenue_earnings": pd.DataFrame(),
+        "quarterly_revenue_earnings": pd.DataFrame()
+    }
+
+    json_info = _get_quote_summary(ticker, "financials", backend)
+
+    if "earnings" not in json_info:
+        return result
+
+    temp = json_info["earnings"]
+
+    if temp == None:
+        return result
+    
+    result["quarterly_results"] = pd.DataFrame.from_dict(temp["earningsChart"]["quarterly"])
+    
+    result["yearly_revenue_earnings"] = pd.DataFrame.from_dict(temp["financialsChart"]["yearly"])
+    
+    result["quarterly_revenue_earnings"] = pd.DataFrame.from_dict(temp["financialsChart"]["quarterly"])
+    
+    # For pretty print
+    from pprint import pp
+    
+    return (pp(result))
+
+
+
+### Earnings functions
+def _parse_earnings_json(url, headers = default_headers
+):
+        resp = client.get(url, headers = headers)
+        
+        content = resp.content.decode(encoding='utf-8', errors='strict')
+        
+        page_data = [row for row in content.split(
+            '\n') if row.startswith('root.App.main = ')][0][:-1]
+        
+        page_data = page_data.split('root.App.main = ', 1)[1]
+        
+        with instrument.phase("json"):
+            return json.loads(page_data)
+
+@instrumented
+def get_next_earnings_date(ticker):
+        
+    base_earnings_url = 'https://finance.yahoo.com/quote'
+    new_url = base_earnings_url + "/" + ticker
+
+    parsed_result = _parse_earnings_json(new_url)
+    
+    temp = parsed_result['context']['dispatcher']['stores']['QuoteSummaryStore']['calendarEvents']['earnings']['earningsDate'][0]['raw']
+
+    return datetime.datetime.fromtimestamp(temp)
+
+
+@instrumented
+def get_earnings_history(ticker):
+    
+        '''Inputs: @ticker
+           Returns the earnings calendar history of the input ticker with 
+           EPS actual vs. expected data.'''
+
+        url = 'https://finance.yahoo.com/calendar/earnings?symbol=' + ticker
+         
+        result = _parse_earnings_json(url)
+        
+        return result["context"]["dispatcher"]["stores"]["ScreenerResultsStore"]["results"]["rows"]
+
+
+
+@instrumented
+def get_earnings_for_date(date, offset = 0, count = 1, max_workers = 8):
+
+    '''Inputs: @date
+       Returns a dictionary of stock tickers with earnings expected on the
+       input date.  The dictionary contains the expected EPS values for each
+       stock if available.
+       
+       Results come in pages of 100 rows; once the first page reveals the
+       total, the remaining pages are fetched concurrently.'''
+    
+    base_earnings_url = 'https://finance.yahoo.com/calendar/earnings'
+    page_size = 100
+    
+    if offset >= count:
+        return []
+    
+    temp = pd.Timestamp(date)
+    date = temp.strftime("%Y-%m-%d")
+    
+    def fetch_page(page_offset):
+        
+        dated_url = '{0}?day={1}&offset={2}&size={3}'.format(
+            base_earnings_url, date, page_offset, page_size)
+        
+        result = _parse_earnings_json(dated_url)
+        
+        return result['context']['dispatcher']['stores']
+    
+    stores = fetch_page(offset)
+    
+    earnings_count = stores['ScreenerCriteriaStore']['meta']['total']
+    
+    total_earnings = stores['ScreenerResultsStore']['results']['rows']
+    
+    offsets = list(range(offset + page_size, earnings_count, page_size))
+    
+    pages, errors = client.map_concurrent(
+        lambda page_offset: fetch_page(page_offset)['ScreenerResultsStore']['results']['rows'],
+        offsets, max_workers)
+    
+    if errors:
+        raise next(iter(errors.values()))
+    
+    # concatenate in offset order
+    for page_offset in offsets:
+        total_earnings = total_earnings + pages[page_offset]
+
+    return total_earnings
+
+
+@instrumented
+def get_earnings_in_date_range(start_date, end_date, max_workers = 8, cache = None):
+
+        '''Inputs: @start_date
+                   @end_date
+                   
+           Returns the stock tickers with expected EPS data for all dates in the
+           input range (inclusive of the start_date and end_date.
+           
+           Dates are fetched concurrently.  With an earnings cache enabled (see
+           yahoo_fin.cache.enable_earnings_cache) or passed in, results for
+           past dates are stored on disk and not downloaded again.  Dates that
+           fail are reported with a warning.'''
+    
+        earnings_cache = get_earnings_cache(cache)
+
+        days_diff = pd.Timestamp(end_date) - pd.Timestamp(start_date)
+        days_diff = days_diff.days
+
+        
+        current_date = pd.Timestamp(start_date)
+        
+        dates = [current_date + datetime.timedelta(diff) for diff in range(days_diff + 1)]
+        dates = [d.strftime("%Y-%m-%d") for d in dates]
+        
+        # earnings for dates before today will not change anymore
+        today = pd.Timestamp.today().strftime("%Y-%m-%d")
+        
+        results = {}
+        
+        for date in dates:
+            if earnings_cache is not None and date < today:
+                rows = earnings_cache.get(date)
+                
+                instrument.emit("cache", name = "earnings", hit = rows is not None)
+                
+                if rows is not None:
+                    results[date] = rows
+        
+        to_fetch = [date for date in dates if date not in results]
+        
+        fetched, errors = client.map_concurrent(get_earnings_for_date, to_fetch,
+                                                max_workers)
+        
+        for date, rows in fetched.items():
+            
+            results[date] = rows
+            
+            if earnings_cache is not None and date < today:
+                earnings_cache.set(date, rows)
+                
+        if errors:
+            warnings.warn("Could not get earnings for: " + 
+                          ", ".join("%s (%r)" % (date, errors[date]) for date in sorted(errors)))
+        
+        earnings_data = []
+        
+        for date in dates:
+            earnings_data += results.get(date, [])
+            
+        return earnings_data
+
+
+@instrumented
+def get_currencies(headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Returns the currencies table from Yahoo Finance'''
+    
+    site = "https://finance.yahoo.com/currencies"
+    tables = client.read_tables(site, _first_table, headers = headers)
+    
+    result = _convert_numeric_columns(tables[0])
+    
+    return result
+
+
+@instrumented
+def get_futures(headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Returns the futures table from Yahoo Finance'''
+    
+    site = "https://finance.yahoo.com/commodities"
+    tables = client.read_tables(site, _first_table, headers = headers)
+    
+    result = _convert_numeric_columns(tables[0])
+    
+    return result
+
+
+@instrumented
+def get_undervalued_large_caps(headers = {'User-agent': 'Mozilla/5.0'}):
+    
+    '''Returns the undervalued large caps table from Yahoo Finance'''
+    
+    site = "https://finance.yahoo.com/screener/predefined/undervalued_large_caps?offset=0&count=100"
+    
+    tables = client.read_tables(site, _first_table, headers = headers)
+    
+    result = _convert_numeric_columns(tables[0])
+    
+    return result
+
+
+@instrumented
+def get_quote_data(ticker, headers = default_headers
+):
+    
+    '''Inputs: @ticker
+    
+       Returns a dictionary containing over 70 elements corresponding to the 
+       input ticker, including company name, book value, moving average data,
+       pre-market / post-market price (when applicable), and more.'''
+    
+    site = quotes_url + ticker
+    
+    def download():
+        
+        resp = client.get(site, headers = headers)
+        
+        if not resp.ok:
+            raise AssertionError("""Invalid response from server.  Check if ticker is
+                                  valid.""")
+        
+        
+        with instrument.phase("json"):
+            json_result = resp.json()
+        
+        return _parse_quote_data(json_result)
+    
+    quote, shared = _parse_flight.do(("quote", ticker.upper()), download)
+    
+    # see get_data
+    return dict(quote) if shared else quote
+
+
+def _parse_quote_data(json_result):
+    
+    info = json_result["quoteResponse"]["result"]
+    
+    return info[0]
+    
+
+@instrumented
+def get_market_status():
+    
+    '''Returns the current state of the market - PRE, POST, OPEN, or CLOSED'''
+    
+    quote_data = get_quote_data("^dji")
+
+    return quote_data["marketState"]
+
+@instrumented
+def get_premarket_price(ticker):
+
+    '''Inputs: @ticker
+    
+       Returns the current pre-market price of the input ticker
+       (returns value if pre-market price is available.'''
+    
+    quote_data = get_quote_data(ticker)
+    
+    if "preMarketPrice" in quote_data:
+        return quote_data["preMarketPrice"]
+        
+    raise AssertionError("Premarket price not currently available.")
+
+@instrumented
+def get_postmarket_price(ticker):
+
+    '''Inputs: @ticker
+    
+       Returns the current post-market price of the input ticker
+       (returns value if pre-market price is available.'''
+    
+    quote_data = get_quote_data(ticker)
+    
+    if "postMarketPrice" in quote_data:
+        return quote_data["postMarketPrice"]
+    
+    raise AssertionError("Postmarket price not currently available.")
+    
+
+# Company Information Functions
+@instrumented
+def get_company_info(ticker, backend = None):
+    '''Scrape the company information for a ticker
+
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''
+    json_info = _get_quote_summary(ticker, "profile", backend)
+    return _parse_company_info(json_info)
+
+
+def _parse_company_info(json_info):
+    json_info = json_info["assetProfile"]
+    info_frame = pd.DataFrame.from_dict(json_info,
+                                        orient="index",
+                                        columns=["Value"])
+    info_frame = info_frame.drop("companyOfficers", axis="index")
+    info_frame.index.name = "Breakdown"
+    return info_frame
+
+
+@instrumented
+def get_company_officers(ticker, backend = None):
+    '''Scrape the company information and return a table of the officers
+
+       @param: ticker
+       @param: backend = None, "api" or "scrape" (see set_summary_backend)
+    '''
+    json_info = _get_quote_summary(ticker, "profile", backend)
+    return _parse_company_officers(json_info)
+
+
+def _parse_company_officers(json_info):
+    json_info = json_info["assetProfile"]["companyOfficers"]
+    info_frame = pd.DataFrame.from_dict(json_info)
+    info_frame = info_frame.set_index("name")
+    return info_frame
@@ -0,0 +1,220 @@
+'''Targeted HTML table extraction.
+
+pandas.read_html turns every <table> on a page into a data frame, even
+though most functions only need one or two of them.  Here the page is parsed
+once with lxml, tables are picked by looking at the elements (position,
+column count, first column text), and only the chosen ones are converted.
+Conversion follows pandas.read_html: the same header detection, colspan /
+rowspan expansion, whitespace clean-up and TextParser type inference, so the
+frames are identical to the ones read_html returns.
+'''
+
+import re
+
+from pandas.io.parsers import TextParser
+
+
+_whitespace = re.compile(r"[\r\n]+|\s{2,}")
+
+
+def parse_tables(html):
+
+    '''Parses html and returns its <table> elements in document order,
+       skipping the tables pandas.read_html would skip (hidden or without
+       any text)'''
+
+    # lxml is only needed once a page is scraped
+    from lxml import html as lxml_html
+
+    if not html.strip():
+        return []
+
+    doc = lxml_html.fromstring(html)
+
+    for br in doc.xpath("*//br"):
+        br.tail = "\n" + (br.tail or "")
+
+    tables = []
+
+    for table in doc.xpath("//table"):
+
+        if "display:none" in table.get("style", "").replace(" ", ""):
+            continue
+
+        for elem in table.xpath(".//style"):
+            elem.drop_tree()
+
+        for elem in table.xpath(".//*[@style]"):
+            if "display:none" in elem.get("style").replace(" ", ""):
+                elem.drop_tree()
+
+        if any(text.strip("\n") for text in table.xpath(".//text()")):
+            tables.append(table)
+
+    return tables
+
+
+def _text(cell):
+
+    # same text as cell.text_content(), without going through XPath
+    return _whitespace.sub(" ", "".join(cell.itertext()).strip())
+
+
+def _cells(row):
+
+    return [child for child in row if child.tag == "td" or child.tag == "th"]
+
+
+def _rows(table):
+
+    '''Returns the (head, body, foot) <tr> lists of a table the way
+       pandas.read_html splits them'''
+
+    head = []
+
+    for thead in table.xpath(".//thead"):
+        head.extend(thead.xpath("./tr"))
+        # lxml keeps a <thead> holding cells without a <tr>; treat it as a row
+        if thead.xpath("./td|./th"):
+            head.append(thead)
+
+    body = table.xpath(".//tbody//tr") + table.xpath("./tr")
+    foot = table.xpath(".//tfoot//tr")
+
+    if not head:
+        # leading rows of <th> cells only are header rows
+        while body and all(cell.tag == "th" for cell in _cells(body[0])):
+            head.append(body.pop(0))
+
+    return head, body, foot
+
+
+def _expand(rows, remainder = None, overflow = True):
+
+    '''Row texts with colspan / rowspan cells repeated, as read_html does.
+       Returns the rows and the rowspans left over for the next section, or
+       appends the left over rows if overflow is False.'''
+
+    texts_by_row = []
+    remainder = remainder or []
+
+    for row in rows:
+
+        cells = _cells(row)
+
+        if not remainder and not any(cell.get("rowspan") or cell.get("colspan")
+                                     for cell in cells):
+            texts_by_row.append([_text(cell) for cell in cells])
+            continue
+
+        texts = []
+        next_remainder = []
+        index = 0
+
+        for cell in cells:
+
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+
+            text = _text(cell)
+            rowspan = int(cell.get("rowspan") or 1)
+            colspan = int(cell.get("colspan") or 1)
+
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+
+        texts_by_row.append(texts)
+        remainder = next_remainder
+
+    if not overflow:
+        while remainder:
+            texts_by_row.append([text for _, text, _ in remainder])
+            remainder = [(i, text, span - 1) for i, text, span in remainder if span > 1]
+
+    return texts_by_row, remainder
+
+
+def to_frame(table):
+
+    '''Converts one <table> element into a data frame'''
+
+    head, body, foot = _rows(table)
+
+    head, remainder = _expand(head)
+    body, remainder = _expand(body, remainder, overflow = len(foot) > 0)
+    foot, _ = _expand(foot, remainder, overflow = False)
+
+    header = None
+
+    if head:
+        body = head + body
+        if len(head) == 1:
+            header = 0
+        else:
+            header = [i for i, row in enumerate(head) if any(text for text in row)]
+
+    body += foot
+
+    # pad ragged rows
+    width = max((len(row) for row in body), default = 0)
+    body = [row + [""] * (width - len(row)) for row in body]
+
+    # thousands = "," is the read_html default
+    with TextParser(body, header = header, thousands = ",") as parser:
+        return parser.read()
+
+
+def n_columns(table):
+
+    '''Width of the widest row of a table (the width of its data frame),
+       without converting it'''
+
+    widths = [sum(int(cell.get("colspan") or 1) for cell in _cells(row))
+              for row in table.xpath(".//tr")]
+
+    return max(widths, default = 0)
+
+
+def first_column(table):
+
+    '''Texts of the first cell of every body row of a table'''
+
+    texts = []
+
+    for row in _rows(table)[1]:
+        cells = _cells(row)
+        if cells:
+            texts.append(_text(cells[0]))
+
+    return texts
+
+
+def read_tables(html, select = None):
+
+    '''Parses html once and converts the tables chosen by select into data
+       frames.  select is a function of the list of table elements that
+       returns the ones to keep; all tables are converted if it is None.
+       Raises ValueError like pandas.read_html if the page has no tables
+       (e.g. the lookup page shown for an invalid ticker).'''
+
+    tables = parse_tables(html)
+
+    if not tables:
+        raise ValueError("No tables found")
+
+    if select is not None:
+        tables = select(tables)
+
+    return [to_frame(table) for table in tables]